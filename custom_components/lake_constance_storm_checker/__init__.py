@@ -1,26 +1,40 @@
-"""The Lake Constance Storm Checker integration."""
-import logging
-from datetime import timedelta
-from typing import Any, Dict
+"""The Lake Constance Storm Checker integration.
 
-import aiohttp
+Only lightweight modules are imported here. The coordinator, its HTTP
+stack and the scheduler are loaded when the first config entry is set up,
+so Home Assistant's startup does not pay for them before that. Services
+and the metrics view are imported in the executor by ``async_setup``.
+"""
+import logging
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryNotReady
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
 from .const import (
     DOMAIN,
     CONF_BASE_URL,
     CONF_API_CODE,
-    DEFAULT_SCAN_INTERVAL,
+    CONF_PARTITION_KEY,
+    CONF_DROP_DIRECTORY,
+    CONF_RICH_PAYLOAD,
+    CONF_TRACKERS,
+    CONF_BACKGROUND_REFRESH,
+    CONF_COMPACT,
+    CONF_EXPOSURE,
+    CONF_NOWCAST_HORIZON,
+    DEFAULT_NOWCAST_HORIZON,
+    NOWCAST_STORAGE_VERSION,
     PARTITION_KEY,
-    API_ENDPOINT,
+    RECORDINGS_DIR,
+    TRACES_DIR,
 )
 
+if TYPE_CHECKING:
+    from .coordinator import LakeConstanceStormCheckerCoordinator
+
 _LOGGER = logging.getLogger(__name__)
 
 PLATFORMS: list[Platform] = [Platform.SENSOR, Platform.BINARY_SENSOR]
@@ -30,10 +44,53 @@ async def async_setup(hass: HomeAssistant, config: Dict[str, Any]) -> bool:
     """Set up the Lake Constance Storm Checker component."""
     _LOGGER.info("Setting up Lake Constance Storm Checker component")
     hass.data.setdefault(DOMAIN, {})
+    services, view = await hass.async_add_import_executor_job(_import_services_and_view)
+    services.async_setup_services(hass)
+    hass.http.register_view(view.LakeConstanceMetricsView())
     _LOGGER.debug("Component setup completed successfully")
     return True
 
 
+def _import_services_and_view() -> Tuple[Any, Any]:
+    """Import the service handlers and the metrics view."""
+    from . import services, view  # pylint: disable=import-outside-toplevel
+
+    return services, view
+
+
+def _get_coordinator_class() -> type["LakeConstanceStormCheckerCoordinator"]:
+    """Import and return the coordinator class."""
+    from .coordinator import (  # pylint: disable=import-outside-toplevel
+        LakeConstanceStormCheckerCoordinator,
+    )
+
+    return LakeConstanceStormCheckerCoordinator
+
+
+def _exposure_key(entry: ConfigEntry) -> str:
+    """Return the storage key of an entry's warning exposure."""
+    return f"{DOMAIN}.exposure.{entry.entry_id}"
+
+
+def _nowcast_key(entry: ConfigEntry) -> str:
+    """Return the storage key of an entry's storm warning nowcast."""
+    return f"{DOMAIN}.nowcast.{entry.entry_id}"
+
+
+def _import_nowcast() -> Any:
+    """Import the nowcast module, which pulls in NumPy."""
+    from . import nowcast  # pylint: disable=import-outside-toplevel
+
+    return nowcast
+
+
+def __getattr__(name: str) -> Any:
+    """Import the coordinator on first attribute access (PEP 562)."""
+    if name == "LakeConstanceStormCheckerCoordinator":
+        return _get_coordinator_class()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Lake Constance Storm Checker from a config entry."""
     _LOGGER.info("Setting up Lake Constance Storm Checker from config entry: %s", entry.entry_id)
@@ -42,6 +99,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     # Get configuration
     base_url = entry.data[CONF_BASE_URL]
     api_code = entry.data[CONF_API_CODE]
+    partition_key = entry.data.get(CONF_PARTITION_KEY, PARTITION_KEY)
     
     # Log the full configuration for debugging
     _LOGGER.info("Full config entry data: %s", {k: v if k != CONF_API_CODE else "***" for k, v in entry.data.items()})
@@ -62,21 +120,43 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         _LOGGER.error("API code is empty or invalid")
         return False
 
-    # Create coordinator
-    _LOGGER.debug("Creating coordinator with scan interval: %s seconds", DEFAULT_SCAN_INTERVAL)
-    coordinator = LakeConstanceStormCheckerCoordinator(
-        hass, base_url, api_code
+    # Create coordinator; its module pulls in aiohttp and the coordinator stack
+    coordinator_cls = await hass.async_add_import_executor_job(_get_coordinator_class)
+    if entry.options.get(CONF_NOWCAST_HORIZON, DEFAULT_NOWCAST_HORIZON):
+        await hass.async_add_import_executor_job(_import_nowcast)
+    _LOGGER.debug("Creating coordinator with options: %s", dict(entry.options))
+    coordinator = coordinator_cls(
+        hass,
+        base_url,
+        api_code,
+        entry.options,
+        partition_key=partition_key,
+        recording_path=hass.config.path(RECORDINGS_DIR, f"{entry.entry_id}.jsonl"),
+        trace_path=hass.config.path(TRACES_DIR, f"{entry.entry_id}.jsonl"),
+        drop_directory=entry.data.get(CONF_DROP_DIRECTORY),
+        exposure_key=_exposure_key(entry),
+        nowcast_key=_nowcast_key(entry),
     )
+    if coordinator.exposure is not None:
+        # Before the first refresh, which credits the time since the last stored update
+        await coordinator.exposure.async_load()
+    if coordinator.nowcast is not None:
+        await coordinator.nowcast.async_load()
 
     # Fetch initial data
-    try:
-        _LOGGER.debug("Fetching initial data")
-        await coordinator.async_config_entry_first_refresh()
-        _LOGGER.info("Initial data fetch completed successfully")
-    except ConfigEntryNotReady:
-        _LOGGER.error("Failed to fetch initial data, config entry not ready")
-        await coordinator.async_shutdown()
-        raise
+    background_refresh = entry.options.get(CONF_BACKGROUND_REFRESH, False)
+    if background_refresh:
+        # Entities are set up right away and stay unavailable until data arrives
+        _LOGGER.debug("Deferring initial data fetch to a background task")
+    else:
+        try:
+            _LOGGER.debug("Fetching initial data")
+            await coordinator.async_config_entry_first_refresh()
+            _LOGGER.info("Initial data fetch completed successfully")
+        except ConfigEntryNotReady:
+            _LOGGER.error("Failed to fetch initial data, config entry not ready")
+            await coordinator.async_shutdown()
+            raise
 
     # Store coordinator
     hass.data[DOMAIN][entry.entry_id] = coordinator
@@ -87,9 +167,76 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     _LOGGER.info("Platform setup completed successfully")
 
+    if coordinator.file_drop is not None:
+        # Dropped files are read as they land; the coordinator stops watching on shutdown
+        await coordinator.file_drop.async_start()
+    else:
+        # Polls are timed by the shared scheduler so entries do not poll in lockstep
+        from .scheduler import async_get_poll_scheduler  # pylint: disable=import-outside-toplevel
+
+        entry.async_on_unload(async_get_poll_scheduler(hass).async_register(entry.entry_id, coordinator))
+
+    if background_refresh:
+        coordinator.async_start_background_refresh()
+
+    # Apply option changes to the running coordinator instead of reloading
+    entry.async_on_unload(entry.add_update_listener(async_update_options))
+
     return True
 
 
+async def async_migrate_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Migrate an old config entry."""
+    _LOGGER.info("Migrating config entry %s from version %s", entry.entry_id, entry.version)
+
+    if entry.version < 6:
+        from homeassistant.helpers import entity_registry as er  # pylint: disable=import-outside-toplevel
+
+        # Unique IDs were global per domain, which broke multiple entries
+        legacy_prefix = f"{DOMAIN}_"
+
+        @callback
+        def _migrate_unique_id(entity_entry: er.RegistryEntry) -> Optional[Dict[str, Any]]:
+            if not entity_entry.unique_id.startswith(legacy_prefix):
+                return None
+            suffix = entity_entry.unique_id[len(legacy_prefix):]
+            return {"new_unique_id": f"{entry.entry_id}_{suffix}"}
+
+        await er.async_migrate_entries(hass, entry.entry_id, _migrate_unique_id)
+        hass.config_entries.async_update_entry(entry, version=6)
+
+    _LOGGER.info("Migration of config entry %s to version %s successful", entry.entry_id, entry.version)
+    return True
+
+
+async def async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apply updated options to the running coordinator."""
+    _LOGGER.info("Options updated for entry: %s", entry.entry_id)
+    coordinator = hass.data[DOMAIN].get(entry.entry_id)
+    if coordinator is None:
+        _LOGGER.debug("No running coordinator for entry %s, nothing to update", entry.entry_id)
+        return
+
+    if (
+        entry.options.get(CONF_RICH_PAYLOAD, False) != coordinator.rich_payload
+        or entry.options.get(CONF_TRACKERS, []) != coordinator.trackers
+        or entry.options.get(CONF_COMPACT, False) != coordinator.compact
+        or entry.options.get(CONF_EXPOSURE, False) != (coordinator.exposure is not None)
+        or entry.options.get(CONF_NOWCAST_HORIZON, DEFAULT_NOWCAST_HORIZON) != coordinator.nowcast_horizon
+    ):
+        # Payload mode, trackers, compact mode, exposure and nowcast sensors add or remove entities
+        _LOGGER.info("Entity-defining options changed, reloading entry %s", entry.entry_id)
+        await hass.config_entries.async_reload(entry.entry_id)
+        return
+
+    coordinator.async_apply_options(entry.options)
+    if coordinator.file_drop is not None:
+        return
+    from .scheduler import async_get_poll_scheduler  # pylint: disable=import-outside-toplevel
+
+    async_get_poll_scheduler(hass).async_reschedule(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     _LOGGER.info("Unloading Lake Constance Storm Checker config entry: %s", entry.entry_id)
@@ -105,92 +252,12 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     return unload_ok
 
 
-class LakeConstanceStormCheckerCoordinator(DataUpdateCoordinator):
-    """Class to manage fetching Lake Constance Storm Checker data."""
-
-    def __init__(
-        self, hass: HomeAssistant, base_url: str, api_code: str
-    ) -> None:
-        """Initialize."""
-        _LOGGER.debug("Initializing LakeConstanceStormCheckerCoordinator")
-        self.base_url = base_url
-        self.api_code = api_code
-        self.session = async_get_clientsession(hass)
-        _LOGGER.debug("Coordinator initialized with base_url: %s", base_url)
-
-        super().__init__(
-            hass,
-            _LOGGER,
-            name=DOMAIN,
-            update_interval=timedelta(seconds=DEFAULT_SCAN_INTERVAL),
-        )
-
-    async def _async_update_data(self) -> Dict[str, Any]:
-        """Update data via API."""
-        url = f"{self.base_url}{API_ENDPOINT}"
-        params = {
-            "code": self.api_code,
-            "partitionKey": PARTITION_KEY,
-            "simple": "true",
-        }
-
-        _LOGGER.debug("Fetching data from API - URL: %s", url)
-        _LOGGER.debug("Request parameters: %s", {k: v if k != "code" else "***" for k, v in params.items()})
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the stored warning exposure and nowcast history of a removed config entry."""
+    from homeassistant.helpers.storage import Store  # pylint: disable=import-outside-toplevel
 
-        try:
-            async with self.session.get(url, params=params, timeout=10) as response:
-                _LOGGER.debug("API response status: %s", response.status)
-                _LOGGER.debug("API response headers: %s", dict(response.headers))
-                
-                if response.status == 401 or response.status == 403:
-                    _LOGGER.error("Authentication failed - API returned status %s", response.status)
-                    raise UpdateFailed("Invalid API code")
-                elif response.status != 200:
-                    _LOGGER.error("API request failed - Status: %s", response.status)
-                    # Try to get response text for debugging
-                    try:
-                        response_text = await response.text()
-                        _LOGGER.error("Response content: %s", response_text[:500])  # Log first 500 chars
-                    except Exception as text_err:
-                        _LOGGER.error("Could not read response text: %s", text_err)
-                    raise UpdateFailed(f"API returned status {response.status}")
-
-                # Check content type before parsing JSON
-                content_type = response.headers.get('content-type', '').lower()
-                _LOGGER.debug("Response content-type: %s", content_type)
-                
-                if 'application/json' not in content_type and 'json' not in content_type:
-                    _LOGGER.error("API returned non-JSON content type: %s", content_type)
-                    try:
-                        response_text = await response.text()
-                        _LOGGER.error("Response content (first 1000 chars): %s", response_text[:1000])
-                    except Exception as text_err:
-                        _LOGGER.error("Could not read response text: %s", text_err)
-                    raise UpdateFailed(f"API returned non-JSON content type: {content_type}")
-
-                try:
-                    data = await response.json()
-                    _LOGGER.debug("Successfully received data from API: %s", data)
-                    return data
-                except Exception as json_err:
-                    _LOGGER.error("Failed to parse JSON response: %s", json_err)
-                    try:
-                        response_text = await response.text()
-                        _LOGGER.error("Raw response content: %s", response_text[:1000])
-                    except Exception as text_err:
-                        _LOGGER.error("Could not read response text: %s", text_err)
-                    raise UpdateFailed(f"Failed to parse JSON response: {json_err}")
-
-        except aiohttp.ClientError as err:
-            _LOGGER.error("Connection error during API request: %s", err)
-            raise UpdateFailed(f"Connection error: {err}") from err
-        except Exception as err:
-            _LOGGER.error("Unexpected error during API request: %s", err, exc_info=True)
-            raise UpdateFailed(f"Unexpected error: {err}") from err
-
-    async def async_shutdown(self) -> None:
-        """Shutdown the coordinator."""
-        _LOGGER.debug("Shutting down coordinator")
-        if hasattr(self, "session"):
-            await self.session.close()
-            _LOGGER.debug("Session closed successfully") 
\ No newline at end of file
+    from .exposure import async_remove_exposure  # pylint: disable=import-outside-toplevel
+
+    await async_remove_exposure(hass, _exposure_key(entry))
+    # Without importing the nowcast module and NumPy
+    await Store(hass, NOWCAST_STORAGE_VERSION, _nowcast_key(entry)).async_remove()
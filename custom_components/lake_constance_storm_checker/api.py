@@ -0,0 +1,339 @@
+"""Async client for the Lake Constance Storm Checker API.
+
+The client itself only uses asyncio and aiohttp and needs no running
+Home Assistant instance. Importing it still imports the integration
+package, and with it Home Assistant, which must be installed.
+"""
+import json
+import logging
+import time
+from dataclasses import dataclass, field, replace
+from typing import AbstractSet, Any, Dict, Mapping, Optional, Protocol
+
+import aiohttp
+
+from .const import (
+    API_ENDPOINT,
+    AREAS,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_MAX_BODY_SIZE,
+    DEFAULT_READ_TIMEOUT,
+    DEFAULT_TOTAL_TIMEOUT,
+    PARTITION_KEY,
+)
+from .ratelimit import DEFAULT_MAX_WAIT, RateLimitedError, TokenBucket
+from .schema import PayloadSchema, SchemaViolation
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class ApiError(Exception):
+    """Base error of the API client."""
+
+
+class ApiConnectionError(ApiError):
+    """Error to indicate the API could not be reached."""
+
+
+class ApiAuthError(ApiError):
+    """Error to indicate the API code was rejected."""
+
+
+class ApiRateLimitedError(ApiError):
+    """Error to indicate the request was rate limited."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None) -> None:
+        """Initialize the error."""
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class ApiResponseError(ApiError):
+    """Error to indicate the API returned an unusable response."""
+
+
+class ApiPayloadError(ApiResponseError):
+    """Error to indicate a decoded payload has a shape no entity can show."""
+
+    def __init__(self, message: str, payload: Any) -> None:
+        """Initialize the error with the offending payload."""
+        super().__init__(message)
+        self.payload = payload
+
+
+# Compiled once; validates every decoded payload
+PAYLOAD_SCHEMA = PayloadSchema()
+
+
+@dataclass(frozen=True)
+class ApiRequest:
+    """Parameters of one status request."""
+
+    base_url: str
+    api_code: str
+    partition_key: str = PARTITION_KEY
+    simple: bool = True
+
+    @property
+    def url(self) -> str:
+        """Return the full endpoint URL."""
+        return f"{self.base_url}{API_ENDPOINT}"
+
+    @property
+    def params(self) -> Dict[str, str]:
+        """Return the query parameters."""
+        return {
+            "code": self.api_code,
+            "partitionKey": self.partition_key,
+            "simple": "true" if self.simple else "false",
+        }
+
+
+@dataclass(frozen=True)
+class RawResponse:
+    """A raw API response as received from the wire."""
+
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+    received_at: float = field(default_factory=time.time)
+
+    @property
+    def content_type(self) -> str:
+        """Return the lower-cased content type header."""
+        for key, value in self.headers.items():
+            if key.lower() == "content-type":
+                return value.lower()
+        return ""
+
+
+@dataclass(frozen=True)
+class StatusResult:
+    """Decoded status of one partition.
+
+    With a projection, ``payload`` only holds the requested area fields;
+    ``full_payload()`` decodes everything else from ``raw`` on demand.
+    """
+
+    payload: Dict[str, Any]
+    statuses: Dict[str, str]
+    timestamp: Optional[str]
+    received_at: float
+    decode_seconds: float
+    raw: bytes = field(default=b"", repr=False, compare=False)
+
+    def full_payload(self) -> Any:
+        """Decode and return the complete payload."""
+        return json.loads(self.raw) if self.raw else self.payload
+
+    def project(self, fields: AbstractSet[str]) -> "StatusResult":
+        """Return this result projected to other fields, re-decoding ``raw``."""
+        decode_start = time.perf_counter()
+        payload = project_payload(self.full_payload(), fields)
+        return replace(self, payload=payload, decode_seconds=time.perf_counter() - decode_start)
+
+
+class Transport(Protocol):
+    """Source of raw API responses."""
+
+    async def async_fetch(self, request: ApiRequest) -> RawResponse:
+        """Return the raw response for a request."""
+
+
+class AiohttpTransport:
+    """Fetch responses over HTTP with an aiohttp session."""
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        rate_limiter: Optional[TokenBucket] = None,
+        timeout: Optional[aiohttp.ClientTimeout] = None,
+        max_body_size: int = DEFAULT_MAX_BODY_SIZE,
+        max_wait: float = DEFAULT_MAX_WAIT,
+    ) -> None:
+        """Initialize the transport."""
+        self.session = session
+        self.rate_limiter = rate_limiter
+        # Seconds a request may wait for a token of the rate limiter
+        self.max_wait = max_wait
+        self.timeout = timeout or aiohttp.ClientTimeout(
+            total=DEFAULT_TOTAL_TIMEOUT,
+            connect=DEFAULT_CONNECT_TIMEOUT,
+            sock_read=DEFAULT_READ_TIMEOUT,
+        )
+        self.max_body_size = max_body_size
+
+    async def async_fetch(self, request: ApiRequest) -> RawResponse:
+        """Fetch a raw response, honouring the rate limiter."""
+        _LOGGER.debug("Fetching data from API - URL: %s", request.url)
+        _LOGGER.debug(
+            "Request parameters: %s", {k: v if k != "code" else "***" for k, v in request.params.items()}
+        )
+
+        if self.rate_limiter is not None:
+            try:
+                await self.rate_limiter.async_acquire(self.max_wait)
+            except RateLimitedError as err:
+                _LOGGER.warning("Skipping API request: %s", err)
+                raise ApiRateLimitedError(str(err), err.retry_after) from err
+
+        try:
+            async with self.session.get(request.url, params=request.params, timeout=self.timeout) as response:
+                _LOGGER.debug("API response status: %s", response.status)
+                _LOGGER.debug("API response headers: %s", dict(response.headers))
+                headers = dict(response.headers)
+                if self.rate_limiter is not None:
+                    self.rate_limiter.update_from_response(response.status, headers)
+                body = await self._async_read_body(response)
+                return RawResponse(status=response.status, headers=headers, body=body)
+        except aiohttp.ClientError as err:
+            _LOGGER.error("Connection error during API request: %s", err)
+            raise ApiConnectionError(f"Connection error: {err}") from err
+        except TimeoutError as err:
+            _LOGGER.error("Timeout during API request")
+            raise ApiConnectionError("Timeout while fetching data") from err
+
+    async def _async_read_body(self, response: aiohttp.ClientResponse) -> bytes:
+        """Read the response body, refusing anything above the size limit."""
+        if response.content_length is not None and response.content_length > self.max_body_size:
+            _LOGGER.error(
+                "Response body too large - Content-Length: %s, limit: %s",
+                response.content_length, self.max_body_size,
+            )
+            raise ApiResponseError(f"Response body exceeds {self.max_body_size} bytes")
+
+        body = bytearray()
+        async for chunk in response.content.iter_chunked(8192):
+            body.extend(chunk)
+            if len(body) > self.max_body_size:
+                _LOGGER.error("Response body exceeded limit of %s bytes while reading", self.max_body_size)
+                raise ApiResponseError(f"Response body exceeds {self.max_body_size} bytes")
+        return bytes(body)
+
+
+def area_status(area_data: Any) -> str:
+    """Return the status string of a simple or dict-per-area payload entry."""
+    if isinstance(area_data, Mapping):
+        return area_data.get("status", "UnknownStatus")
+    if isinstance(area_data, str):
+        return area_data
+    return "UnknownStatus"
+
+
+def project_payload(payload: Mapping[str, Any], fields: AbstractSet[str]) -> Dict[str, Any]:
+    """Keep the status and ``fields`` of each area and the scalar top-level values.
+
+    Simple payloads have plain status strings per area and pass through.
+    """
+    projected: Dict[str, Any] = {}
+    for key, value in payload.items():
+        if key in AREAS:
+            if isinstance(value, Mapping):
+                projected[key] = {
+                    name: value[name] for name in value if name == "status" or name in fields
+                }
+            else:
+                projected[key] = value
+        elif not isinstance(value, (dict, list)):
+            projected[key] = value
+    return projected
+
+
+def decode_response(
+    response: RawResponse, fields: Optional[AbstractSet[str]] = None, schema: PayloadSchema = PAYLOAD_SCHEMA
+) -> StatusResult:
+    """Validate a raw response and decode its JSON payload.
+
+    ``fields`` projects rich area objects down to the named fields; ``None``
+    keeps the payload as received. Payloads that do not match ``schema``
+    raise ApiPayloadError.
+    """
+    decode_start = time.perf_counter()
+
+    if response.status == 401 or response.status == 403:
+        _LOGGER.error("Authentication failed - API returned status %s", response.status)
+        raise ApiAuthError("Invalid API code")
+    elif response.status == 429:
+        _LOGGER.warning("API rate limit exceeded - Status: %s", response.status)
+        raise ApiRateLimitedError("API rate limit exceeded")
+    elif response.status != 200:
+        _LOGGER.error("API request failed - Status: %s", response.status)
+        _LOGGER.error("Response content: %s", response.body[:500])  # Log first 500 bytes
+        raise ApiResponseError(f"API returned status {response.status}")
+
+    # Check content type before parsing JSON
+    content_type = response.content_type
+    _LOGGER.debug("Response content-type: %s", content_type)
+
+    if 'application/json' not in content_type and 'json' not in content_type:
+        _LOGGER.error("API returned non-JSON content type: %s", content_type)
+        _LOGGER.error("Response content (first 1000 bytes): %s", response.body[:1000])
+        raise ApiResponseError(f"API returned non-JSON content type: {content_type}")
+
+    try:
+        payload = json.loads(response.body)
+    except ValueError as json_err:
+        _LOGGER.error("Failed to parse JSON response: %s", json_err)
+        _LOGGER.error("Raw response content: %s", response.body[:1000])
+        raise ApiResponseError(f"Failed to parse JSON response: {json_err}") from json_err
+
+    if not isinstance(payload, dict):
+        _LOGGER.error("API returned a JSON %s instead of an object", type(payload).__name__)
+        raise ApiPayloadError("API returned a JSON value that is not an object", payload)
+
+    try:
+        statuses = schema.statuses(payload)
+    except SchemaViolation as err:
+        _LOGGER.error("Malformed payload: %s", err)
+        raise ApiPayloadError(f"Malformed payload: {err}", payload) from err
+
+    if fields is not None:
+        payload = project_payload(payload, fields)
+
+    _LOGGER.debug("Successfully received data from API: %s", payload)
+    return StatusResult(
+        payload=payload,
+        statuses=statuses,
+        timestamp=payload.get("timestamp") or payload.get("lastUpdate"),
+        received_at=response.received_at,
+        decode_seconds=time.perf_counter() - decode_start,
+        raw=response.body if fields is not None else b"",
+    )
+
+
+class LakeConstanceApiClient:
+    """Client for the ``get-latest-status`` endpoint of one partition."""
+
+    def __init__(
+        self,
+        base_url: str,
+        api_code: str,
+        transport: Transport,
+        partition_key: str = PARTITION_KEY,
+        simple: bool = True,
+    ) -> None:
+        """Initialize the client.
+
+        ``simple=False`` requests the rich payload with per-area objects.
+        """
+        self.transport = transport
+        self.request = ApiRequest(
+            base_url=base_url.rstrip("/"),
+            api_code=api_code,
+            partition_key=partition_key,
+            simple=simple,
+        )
+
+    async def async_fetch_raw(self) -> RawResponse:
+        """Fetch the raw response through the transport."""
+        try:
+            return await self.transport.async_fetch(self.request)
+        except ApiError:
+            raise
+        except Exception as err:
+            _LOGGER.error("Unexpected error during API request: %s", err, exc_info=True)
+            raise ApiError(f"Unexpected error: {err}") from err
+
+    async def async_get_status(self, fields: Optional[AbstractSet[str]] = None) -> StatusResult:
+        """Fetch and decode the latest status."""
+        return decode_response(await self.async_fetch_raw(), fields)
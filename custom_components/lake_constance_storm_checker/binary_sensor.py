@@ -1,14 +1,20 @@
 """Binary sensor platform for Lake Constance Storm Checker."""
 import logging
-from typing import Any, Dict
+from typing import TYPE_CHECKING, Any, Mapping, Optional, Tuple
 
 from homeassistant.components.binary_sensor import BinarySensorEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.const import ATTR_LATITUDE, ATTR_LONGITUDE
+from homeassistant.core import Event, HomeAssistant, State, callback, split_entity_id
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.helpers.event import async_track_state_change_event
 
-from .const import DOMAIN
+from .const import DOMAIN, AREAS
+from .entity import LakeConstanceAreaEntity, LakeConstanceEntity
+from .snapshot import EMPTY_ATTRIBUTES, WARNING_STATUSES
+
+if TYPE_CHECKING:
+    from .geo import AreaIndex
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -24,116 +30,52 @@ async def async_setup_entry(
     coordinator = hass.data[DOMAIN][config_entry.entry_id]
     _LOGGER.debug("Retrieved coordinator for binary sensor setup")
 
-    entities = [
-        LakeConstanceWestWarningBinarySensor(coordinator),
-        LakeConstanceCenterWarningBinarySensor(coordinator),
-        LakeConstanceEastWarningBinarySensor(coordinator),
-        LakeConstanceStormWarningBinarySensor(coordinator),
-        LakeConstanceStrongWindWarningBinarySensor(coordinator),
-    ]
+    entities = [LakeConstanceAreaWarningBinarySensor(coordinator, area) for area in AREAS]
+    entities.extend(
+        [
+            LakeConstanceStormWarningBinarySensor(coordinator),
+            LakeConstanceStrongWindWarningBinarySensor(coordinator),
+        ]
+    )
+    if coordinator.trackers:
+        # The spatial index is imported and built once per process, off the event loop
+        index = await hass.async_add_import_executor_job(_get_area_index)
+        entities.extend(
+            LakeConstanceTrackerWarningBinarySensor(coordinator, tracker, index)
+            for tracker in coordinator.trackers
+        )
     _LOGGER.debug("Created %d binary sensor entities", len(entities))
     
     async_add_entities(entities)
     _LOGGER.info("Binary sensor setup completed successfully")
 
 
-class LakeConstanceWestWarningBinarySensor(CoordinatorEntity, BinarySensorEntity):
-    """Representation of a Lake Constance West area warning binary sensor."""
+def _get_area_index() -> "AreaIndex":
+    """Import the geo module and return the shared area index."""
+    from .geo import get_area_index  # pylint: disable=import-outside-toplevel
 
-    def __init__(self, coordinator: CoordinatorEntity) -> None:
-        """Initialize the binary sensor."""
-        _LOGGER.debug("Initializing LakeConstanceWestWarningBinarySensor")
-        super().__init__(coordinator)
-        self._attr_unique_id = f"{DOMAIN}_west_warning"
-        self._attr_name = "Lake Constance West Warning"
-        _LOGGER.debug("Binary sensor initialized with unique_id: %s, name: %s", 
-                      self._attr_unique_id, self._attr_name)
+    return get_area_index()
 
-    @property
-    def is_on(self) -> bool:
-        """Return true if any warning is active for the west area."""
-        if not self.coordinator.data:
-            _LOGGER.debug("No coordinator data available, returning False")
-            return False
-        
-        try:
-            west_data = self.coordinator.data.get("west")
-            if isinstance(west_data, dict):
-                status = west_data.get("status", "UnknownStatus")
-            elif isinstance(west_data, str):
-                status = west_data
-            else:
-                status = "UnknownStatus"
-            
-            is_warning = status in ["StrongWindWarning", "StormWarning"]
-            _LOGGER.debug("West area warning status: %s (is_warning: %s)", status, is_warning)
-            return is_warning
-        except Exception as e:
-            _LOGGER.error("Error getting west warning status: %s", e)
-            return False
 
-    @property
-    def icon(self) -> str:
-        """Return the icon of the binary sensor."""
-        return "mdi:weather-windy" if self.is_on else "mdi:weather-sunny"
+class LakeConstanceAreaWarningBinarySensor(LakeConstanceAreaEntity, BinarySensorEntity):
+    """Representation of a Lake Constance area warning binary sensor."""
 
-    @property
-    def extra_state_attributes(self) -> Dict[str, Any]:
-        """Return entity specific state attributes."""
-        if not self.coordinator.data:
-            _LOGGER.debug("No coordinator data available for west warning attributes")
-            return {}
-
-        try:
-            west_data = self.coordinator.data.get("west")
-            if isinstance(west_data, dict):
-                _LOGGER.debug("Returning west data as extra state attributes")
-                return west_data
-            elif isinstance(west_data, str):
-                _LOGGER.debug("West data is string, returning as status")
-                return {"status": west_data}
-            else:
-                _LOGGER.debug("West data is unknown type, returning empty")
-                return {}
-        except Exception as e:
-            _LOGGER.error("Error getting west warning attributes: %s", e)
-            return {}
-
-
-class LakeConstanceCenterWarningBinarySensor(CoordinatorEntity, BinarySensorEntity):
-    """Representation of a Lake Constance Center area warning binary sensor."""
-
-    def __init__(self, coordinator: CoordinatorEntity) -> None:
+    def __init__(self, coordinator, area: str) -> None:
         """Initialize the binary sensor."""
-        _LOGGER.debug("Initializing LakeConstanceCenterWarningBinarySensor")
-        super().__init__(coordinator)
-        self._attr_unique_id = f"{DOMAIN}_center_warning"
-        self._attr_name = "Lake Constance Center Warning"
+        _LOGGER.debug("Initializing LakeConstanceAreaWarningBinarySensor for area: %s", area)
+        super().__init__(coordinator, area, "warning")
+        self._attr_name = f"Lake Constance {area.capitalize()} Warning"
         _LOGGER.debug("Binary sensor initialized with unique_id: %s, name: %s", 
                       self._attr_unique_id, self._attr_name)
 
     @property
     def is_on(self) -> bool:
-        """Return true if any warning is active for the center area."""
-        if not self.coordinator.data:
+        """Return true if any warning is active for the area."""
+        snapshot = self.snapshot
+        if snapshot is None:
             _LOGGER.debug("No coordinator data available, returning False")
             return False
-        
-        try:
-            center_data = self.coordinator.data.get("center")
-            if isinstance(center_data, dict):
-                status = center_data.get("status", "UnknownStatus")
-            elif isinstance(center_data, str):
-                status = center_data
-            else:
-                status = "UnknownStatus"
-            
-            is_warning = status in ["StrongWindWarning", "StormWarning"]
-            _LOGGER.debug("Center area warning status: %s (is_warning: %s)", status, is_warning)
-            return is_warning
-        except Exception as e:
-            _LOGGER.error("Error getting center warning status: %s", e)
-            return False
+        return snapshot.statuses[self.area] in WARNING_STATUSES
 
     @property
     def icon(self) -> str:
@@ -141,99 +83,21 @@ class LakeConstanceCenterWarningBinarySensor(CoordinatorEntity, BinarySensorEnti
         return "mdi:weather-windy" if self.is_on else "mdi:weather-sunny"
 
     @property
-    def extra_state_attributes(self) -> Dict[str, Any]:
+    def extra_state_attributes(self) -> Mapping[str, Any]:
         """Return entity specific state attributes."""
-        if not self.coordinator.data:
-            _LOGGER.debug("No coordinator data available for center warning attributes")
-            return {}
-
-        try:
-            center_data = self.coordinator.data.get("center")
-            if isinstance(center_data, dict):
-                _LOGGER.debug("Returning center data as extra state attributes")
-                return center_data
-            elif isinstance(center_data, str):
-                _LOGGER.debug("Center data is string, returning as status")
-                return {"status": center_data}
-            else:
-                _LOGGER.debug("Center data is unknown type, returning empty")
-                return {}
-        except Exception as e:
-            _LOGGER.error("Error getting center warning attributes: %s", e)
-            return {}
-
-
-class LakeConstanceEastWarningBinarySensor(CoordinatorEntity, BinarySensorEntity):
-    """Representation of a Lake Constance East area warning binary sensor."""
-
-    def __init__(self, coordinator: CoordinatorEntity) -> None:
-        """Initialize the binary sensor."""
-        _LOGGER.debug("Initializing LakeConstanceEastWarningBinarySensor")
-        super().__init__(coordinator)
-        self._attr_unique_id = f"{DOMAIN}_east_warning"
-        self._attr_name = "Lake Constance East Warning"
-        _LOGGER.debug("Binary sensor initialized with unique_id: %s, name: %s", 
-                      self._attr_unique_id, self._attr_name)
+        snapshot = self.snapshot
+        if snapshot is None:
+            return EMPTY_ATTRIBUTES
+        return snapshot.area_attributes[self.area]
 
-    @property
-    def is_on(self) -> bool:
-        """Return true if any warning is active for the east area."""
-        if not self.coordinator.data:
-            _LOGGER.debug("No coordinator data available, returning False")
-            return False
-        
-        try:
-            east_data = self.coordinator.data.get("east")
-            if isinstance(east_data, dict):
-                status = east_data.get("status", "UnknownStatus")
-            elif isinstance(east_data, str):
-                status = east_data
-            else:
-                status = "UnknownStatus"
-            
-            is_warning = status in ["StrongWindWarning", "StormWarning"]
-            _LOGGER.debug("East area warning status: %s (is_warning: %s)", status, is_warning)
-            return is_warning
-        except Exception as e:
-            _LOGGER.error("Error getting east warning status: %s", e)
-            return False
-
-    @property
-    def icon(self) -> str:
-        """Return the icon of the binary sensor."""
-        return "mdi:weather-windy" if self.is_on else "mdi:weather-sunny"
 
-    @property
-    def extra_state_attributes(self) -> Dict[str, Any]:
-        """Return entity specific state attributes."""
-        if not self.coordinator.data:
-            _LOGGER.debug("No coordinator data available for east warning attributes")
-            return {}
-
-        try:
-            east_data = self.coordinator.data.get("east")
-            if isinstance(east_data, dict):
-                _LOGGER.debug("Returning east data as extra state attributes")
-                return east_data
-            elif isinstance(east_data, str):
-                _LOGGER.debug("East data is string, returning as status")
-                return {"status": east_data}
-            else:
-                _LOGGER.debug("East data is unknown type, returning empty")
-                return {}
-        except Exception as e:
-            _LOGGER.error("Error getting east warning attributes: %s", e)
-            return {}
-
-
-class LakeConstanceStormWarningBinarySensor(CoordinatorEntity, BinarySensorEntity):
+class LakeConstanceStormWarningBinarySensor(LakeConstanceEntity, BinarySensorEntity):
     """Representation of a Lake Constance storm warning binary sensor."""
 
-    def __init__(self, coordinator: CoordinatorEntity) -> None:
+    def __init__(self, coordinator) -> None:
         """Initialize the binary sensor."""
         _LOGGER.debug("Initializing LakeConstanceStormWarningBinarySensor")
-        super().__init__(coordinator)
-        self._attr_unique_id = f"{DOMAIN}_storm_warning"
+        super().__init__(coordinator, "storm_warning")
         self._attr_name = "Lake Constance Storm Warning"
         _LOGGER.debug("Binary sensor initialized with unique_id: %s, name: %s", 
                       self._attr_unique_id, self._attr_name)
@@ -241,30 +105,11 @@ class LakeConstanceStormWarningBinarySensor(CoordinatorEntity, BinarySensorEntit
     @property
     def is_on(self) -> bool:
         """Return true if any area has a storm warning."""
-        if not self.coordinator.data:
+        snapshot = self.snapshot
+        if snapshot is None:
             _LOGGER.debug("No coordinator data available, returning False")
             return False
-        
-        try:
-            areas = ["west", "center", "east"]
-            for area in areas:
-                area_data = self.coordinator.data.get(area)
-                if isinstance(area_data, dict):
-                    status = area_data.get("status", "UnknownStatus")
-                elif isinstance(area_data, str):
-                    status = area_data
-                else:
-                    status = "UnknownStatus"
-                
-                if status == "StormWarning":
-                    _LOGGER.debug("Storm warning detected in %s area", area)
-                    return True
-            
-            _LOGGER.debug("No storm warnings detected in any area")
-            return False
-        except Exception as e:
-            _LOGGER.error("Error checking for storm warnings: %s", e)
-            return False
+        return bool(snapshot.areas_with_storm_warning)
 
     @property
     def icon(self) -> str:
@@ -272,47 +117,21 @@ class LakeConstanceStormWarningBinarySensor(CoordinatorEntity, BinarySensorEntit
         return "mdi:weather-lightning" if self.is_on else "mdi:weather-sunny"
 
     @property
-    def extra_state_attributes(self) -> Dict[str, Any]:
+    def extra_state_attributes(self) -> Mapping[str, Any]:
         """Return entity specific state attributes."""
-        if not self.coordinator.data:
-            _LOGGER.debug("No coordinator data available for storm warning attributes")
-            return {}
-
-        try:
-            # Return which areas have storm warnings
-            areas_with_storm_warning = []
-            areas = ["west", "center", "east"]
-            
-            for area in areas:
-                area_data = self.coordinator.data.get(area)
-                if isinstance(area_data, dict):
-                    status = area_data.get("status", "UnknownStatus")
-                elif isinstance(area_data, str):
-                    status = area_data
-                else:
-                    status = "UnknownStatus"
-                
-                if status == "StormWarning":
-                    areas_with_storm_warning.append(area)
-            
-            _LOGGER.debug("Areas with storm warning: %s", areas_with_storm_warning)
-            return {
-                "areas_with_storm_warning": areas_with_storm_warning,
-                "full_data": self.coordinator.data
-            }
-        except Exception as e:
-            _LOGGER.error("Error getting storm warning attributes: %s", e)
-            return {}
-
-
-class LakeConstanceStrongWindWarningBinarySensor(CoordinatorEntity, BinarySensorEntity):
+        snapshot = self.snapshot
+        if snapshot is None:
+            return EMPTY_ATTRIBUTES
+        return snapshot.storm_warning_attributes
+
+
+class LakeConstanceStrongWindWarningBinarySensor(LakeConstanceEntity, BinarySensorEntity):
     """Representation of a Lake Constance strong wind warning binary sensor."""
 
-    def __init__(self, coordinator: CoordinatorEntity) -> None:
+    def __init__(self, coordinator) -> None:
         """Initialize the binary sensor."""
         _LOGGER.debug("Initializing LakeConstanceStrongWindWarningBinarySensor")
-        super().__init__(coordinator)
-        self._attr_unique_id = f"{DOMAIN}_strong_wind_warning"
+        super().__init__(coordinator, "strong_wind_warning")
         self._attr_name = "Lake Constance Strong Wind Warning"
         _LOGGER.debug("Binary sensor initialized with unique_id: %s, name: %s", 
                       self._attr_unique_id, self._attr_name)
@@ -320,30 +139,11 @@ class LakeConstanceStrongWindWarningBinarySensor(CoordinatorEntity, BinarySensor
     @property
     def is_on(self) -> bool:
         """Return true if any area has a strong wind warning."""
-        if not self.coordinator.data:
+        snapshot = self.snapshot
+        if snapshot is None:
             _LOGGER.debug("No coordinator data available, returning False")
             return False
-        
-        try:
-            areas = ["west", "center", "east"]
-            for area in areas:
-                area_data = self.coordinator.data.get(area)
-                if isinstance(area_data, dict):
-                    status = area_data.get("status", "UnknownStatus")
-                elif isinstance(area_data, str):
-                    status = area_data
-                else:
-                    status = "UnknownStatus"
-                
-                if status == "StrongWindWarning":
-                    _LOGGER.debug("Strong wind warning detected in %s area", area)
-                    return True
-            
-            _LOGGER.debug("No strong wind warnings detected in any area")
-            return False
-        except Exception as e:
-            _LOGGER.error("Error checking for strong wind warnings: %s", e)
-            return False
+        return bool(snapshot.areas_with_strong_wind_warning)
 
     @property
     def icon(self) -> str:
@@ -351,34 +151,87 @@ class LakeConstanceStrongWindWarningBinarySensor(CoordinatorEntity, BinarySensor
         return "mdi:weather-windy" if self.is_on else "mdi:weather-sunny"
 
     @property
-    def extra_state_attributes(self) -> Dict[str, Any]:
+    def extra_state_attributes(self) -> Mapping[str, Any]:
+        """Return entity specific state attributes."""
+        snapshot = self.snapshot
+        if snapshot is None:
+            return EMPTY_ATTRIBUTES
+        return snapshot.strong_wind_warning_attributes
+
+
+class LakeConstanceTrackerWarningBinarySensor(LakeConstanceAreaEntity, BinarySensorEntity):
+    """Representation of the warning at a tracked device's position.
+
+    The area is looked up only when the tracker moves; status updates just
+    read the cached area's status from the snapshot. The sensor is
+    unavailable while the tracker is in a disabled area.
+    """
+
+    def __init__(self, coordinator, tracker_entity_id: str, index: "AreaIndex") -> None:
+        """Initialize the binary sensor."""
+        _LOGGER.debug("Initializing LakeConstanceTrackerWarningBinarySensor for: %s", tracker_entity_id)
+        super().__init__(coordinator, None, f"tracker_{tracker_entity_id}")
+        # Trackers are selected explicitly, so they stay enabled in compact mode
+        self._attr_entity_registry_enabled_default = True
+        self.tracker_entity_id = tracker_entity_id
+        self._index = index
+        self._position: Optional[Tuple[float, float]] = None
+        self._attr_name = f"Lake Constance Warning {split_entity_id(tracker_entity_id)[1].replace('_', ' ').title()}"
+        _LOGGER.debug("Binary sensor initialized with unique_id: %s, name: %s",
+                      self._attr_unique_id, self._attr_name)
+
+    async def async_added_to_hass(self) -> None:
+        """Start following the tracker."""
+        await super().async_added_to_hass()
+        self._async_update_position(self.hass.states.get(self.tracker_entity_id))
+        self.async_on_remove(
+            async_track_state_change_event(self.hass, [self.tracker_entity_id], self._async_tracker_changed)
+        )
+
+    @callback
+    def _async_update_position(self, state: Optional[State]) -> bool:
+        """Look up the area of the tracker's position and return if the result changed."""
+        position = None
+        if state is not None:
+            try:
+                position = (float(state.attributes[ATTR_LATITUDE]), float(state.attributes[ATTR_LONGITUDE]))
+            except (KeyError, TypeError, ValueError):
+                position = None
+        if position == self._position:
+            return False
+        known_before, area_before = self._position is not None, self.area
+        self._position = position
+        self.area = self._index.lookup(*position) if position is not None else None
+        _LOGGER.debug("Tracker %s at %s is in area %s", self.tracker_entity_id, position, self.area)
+        return (position is not None, self.area) != (known_before, area_before)
+
+    @callback
+    def _async_tracker_changed(self, event: Event) -> None:
+        """Handle tracker movement."""
+        if self._async_update_position(event.data["new_state"]):
+            self.async_write_ha_state()
+
+    @property
+    def is_on(self) -> Optional[bool]:
+        """Return true if a warning is active where the tracker is."""
+        snapshot = self.snapshot
+        if snapshot is None or self._position is None or self.area is None:
+            # Outside every area outline is not known to be safe water
+            return None
+        return snapshot.statuses[self.area] in WARNING_STATUSES
+
+    @property
+    def icon(self) -> str:
+        """Return the icon of the binary sensor."""
+        return "mdi:sail-boat-sink" if self.is_on else "mdi:sail-boat"
+
+    @property
+    def extra_state_attributes(self) -> Mapping[str, Any]:
         """Return entity specific state attributes."""
-        if not self.coordinator.data:
-            _LOGGER.debug("No coordinator data available for strong wind warning attributes")
-            return {}
-
-        try:
-            # Return which areas have strong wind warnings
-            areas_with_strong_wind_warning = []
-            areas = ["west", "center", "east"]
-            
-            for area in areas:
-                area_data = self.coordinator.data.get(area)
-                if isinstance(area_data, dict):
-                    status = area_data.get("status", "UnknownStatus")
-                elif isinstance(area_data, str):
-                    status = area_data
-                else:
-                    status = "UnknownStatus"
-                
-                if status == "StrongWindWarning":
-                    areas_with_strong_wind_warning.append(area)
-            
-            _LOGGER.debug("Areas with strong wind warning: %s", areas_with_strong_wind_warning)
-            return {
-                "areas_with_strong_wind_warning": areas_with_strong_wind_warning,
-                "full_data": self.coordinator.data
-            }
-        except Exception as e:
-            _LOGGER.error("Error getting strong wind warning attributes: %s", e)
-            return {} 
\ No newline at end of file
+        snapshot = self.snapshot
+        return {
+            "tracker": self.tracker_entity_id,
+            "area": self.area,
+            "status": snapshot.statuses[self.area] if snapshot is not None and self.area else None,
+            **(snapshot.stale_attributes if snapshot is not None else EMPTY_ATTRIBUTES),
+        }
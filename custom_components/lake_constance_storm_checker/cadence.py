@@ -0,0 +1,125 @@
+"""Learn the upstream publish cadence from payload timestamps."""
+import logging
+import math
+import statistics
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, Optional
+
+from homeassistant.util import dt as dt_util
+
+from .const import ALIGN_MARGIN, CADENCE_MIN_SAMPLES, CADENCE_SAMPLES
+
+_LOGGER = logging.getLogger(__name__)
+
+# Scales the median absolute deviation to a standard deviation
+MAD_SCALE = 1.4826
+# Largest jitter and gap spread, as a fraction of the period, still taken as a cadence
+MAX_RELATIVE_JITTER = 0.1
+
+
+def parse_published(value: Any) -> Optional[datetime]:
+    """Return the publication time of a payload timestamp, if it parses."""
+    if not value:
+        return None
+    try:
+        return dt_util.parse_datetime(str(value))
+    except ValueError:
+        return None
+
+
+class PublishCadence:
+    """Estimate the period and phase at which upstream publishes new data.
+
+    Only distinct timestamps count as publications. The period is the median
+    gap, with gaps spanning missed publications divided back into single
+    periods; the phase is the median residual against that period. Medians
+    keep a late or early publication from dragging the estimate, and the
+    estimate is only trusted while jitter and gap spread stay small.
+    """
+
+    def __init__(self, max_samples: int = CADENCE_SAMPLES, min_samples: int = CADENCE_MIN_SAMPLES) -> None:
+        """Initialize without any observed publications."""
+        self.min_samples = min_samples
+        self._published: Deque[float] = deque(maxlen=max_samples)
+        self.period: Optional[float] = None
+        self.anchor: Optional[float] = None
+        self.jitter = 0.0
+        self.spread = 0.0
+
+    @property
+    def last_published(self) -> Optional[float]:
+        """Return the epoch time of the newest publication seen."""
+        return self._published[-1] if self._published else None
+
+    @property
+    def confident(self) -> bool:
+        """Return if enough publications were seen to predict the next one."""
+        if self.period is None:
+            return False
+        return max(self.jitter, self.spread) < MAX_RELATIVE_JITTER * self.period
+
+    def observe(self, published: Optional[datetime]) -> bool:
+        """Record a payload timestamp and return if it is a new publication."""
+        if published is None:
+            return False
+        timestamp = published.timestamp()
+        if self._published and timestamp <= self._published[-1]:
+            return False
+        self._published.append(timestamp)
+        self._estimate()
+        return True
+
+    def _estimate(self) -> None:
+        """Re-estimate period, phase and jitter from the kept publications."""
+        samples = list(self._published)
+        if len(samples) < self.min_samples:
+            return
+        gaps = [later - earlier for earlier, later in zip(samples, samples[1:])]
+        typical = statistics.median(gaps)
+        if typical <= 0:
+            return
+        periods = [gap / max(1, round(gap / typical)) for gap in gaps]
+        period = statistics.median(periods)
+        reference = samples[-1]
+        residuals = [(sample - reference + period / 2) % period - period / 2 for sample in samples]
+        offset = statistics.median(residuals)
+        self.period = period
+        self.anchor = reference + offset
+        self.jitter = MAD_SCALE * statistics.median(abs(residual - offset) for residual in residuals)
+        self.spread = MAD_SCALE * statistics.median(abs(gap - period) for gap in periods)
+        _LOGGER.debug(
+            "Estimated publish cadence: period %.0fs, phase %s, jitter %.1fs, gap spread %.1fs",
+            self.period, dt_util.utc_from_timestamp(self.anchor).isoformat(), self.jitter, self.spread,
+        )
+
+    def next_publication(self, after: float) -> Optional[float]:
+        """Return the first expected publication time later than ``after``."""
+        if not self.confident:
+            return None
+        slots = math.floor((after - self.anchor) / self.period) + 1
+        return self.anchor + slots * self.period
+
+    def next_poll(self) -> Optional[float]:
+        """Return when to poll for the first publication not seen yet."""
+        if not self.confident or self.last_published is None:
+            return None
+        # Half a period past the newest one skips its own slot even if it was late
+        expected = self.next_publication(self.last_published + self.period / 2)
+        return expected + 2 * self.jitter + ALIGN_MARGIN
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the estimate for diagnostics."""
+        return {
+            "publications": len(self._published),
+            "confident": self.confident,
+            "period": round(self.period, 1) if self.period is not None else None,
+            "phase": dt_util.utc_from_timestamp(self.anchor).isoformat() if self.anchor is not None else None,
+            "jitter": round(self.jitter, 1),
+            "gap_spread": round(self.spread, 1),
+            "next_poll": (
+                dt_util.utc_from_timestamp(next_poll).isoformat()
+                if (next_poll := self.next_poll()) is not None
+                else None
+            ),
+        }
@@ -1,21 +1,69 @@
-"""Config flow for Lake Constance Storm Checker integration."""
+"""Config flow for Lake Constance Storm Checker integration.
+
+The HTTP client is only imported when a connection is tested, not when
+Home Assistant loads this module.
+"""
 import logging
-import aiohttp
-import voluptuous as vol
+import os
 from typing import Any, Dict, Optional
 
+import voluptuous as vol
+
 from homeassistant import config_entries
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import selector
+import homeassistant.helpers.config_validation as cv
 
 from .const import (
     DOMAIN,
     CONF_BASE_URL,
     CONF_API_CODE,
+    CONF_PARTITION_KEY,
+    CONF_DROP_DIRECTORY,
+    CONF_SCAN_INTERVAL,
+    CONF_CONNECT_TIMEOUT,
+    CONF_READ_TIMEOUT,
+    CONF_TOTAL_TIMEOUT,
+    CONF_MAX_BODY_SIZE,
+    CONF_AREAS,
+    CONF_RECORD_RESPONSES,
+    CONF_RICH_PAYLOAD,
+    CONF_TRACKERS,
+    CONF_BACKGROUND_REFRESH,
+    CONF_MIN_DWELL,
+    CONF_CONFIRM_COUNT,
+    CONF_CONFIRM_WINDOW,
+    CONF_MAX_STALENESS,
+    CONF_COMPACT,
+    CONF_ALIGN_POLLS,
+    CONF_TRACE_FILE,
+    CONF_EXPOSURE,
+    CONF_NOWCAST_HORIZON,
     DEFAULT_BASE_URL,
+    DEFAULT_SCAN_INTERVAL,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_READ_TIMEOUT,
+    DEFAULT_TOTAL_TIMEOUT,
+    DEFAULT_MAX_BODY_SIZE,
+    DEFAULT_MIN_DWELL,
+    DEFAULT_CONFIRM_COUNT,
+    DEFAULT_CONFIRM_WINDOW,
+    DEFAULT_MAX_STALENESS,
+    DEFAULT_NOWCAST_HORIZON,
+    MIN_SCAN_INTERVAL,
+    MAX_SCAN_INTERVAL,
+    MIN_TIMEOUT,
+    MAX_TIMEOUT,
+    MIN_MAX_BODY_SIZE,
+    MAX_MAX_BODY_SIZE,
+    MAX_MIN_DWELL,
+    MAX_CONFIRM_WINDOW,
+    MAX_MAX_STALENESS,
+    MAX_NOWCAST_HORIZON,
+    AREAS,
     PARTITION_KEY,
-    API_ENDPOINT,
 )
 
 _LOGGER = logging.getLogger(__name__)
@@ -24,13 +72,21 @@ _LOGGER = logging.getLogger(__name__)
 class LakeConstanceStormCheckerConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for Lake Constance Storm Checker."""
 
-    VERSION = 5
+    VERSION = 6
 
     def __init__(self) -> None:
         """Initialize the config flow."""
         _LOGGER.debug("Initializing LakeConstanceStormCheckerConfigFlow")
         self._data: Dict[str, Any] = {}
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> "LakeConstanceStormCheckerOptionsFlow":
+        """Get the options flow for this handler."""
+        return LakeConstanceStormCheckerOptionsFlow(config_entry)
+
     async def async_step_user(
         self, user_input: Optional[Dict[str, Any]] = None
     ) -> FlowResult:
@@ -44,6 +100,8 @@ class LakeConstanceStormCheckerConfigFlow(config_entries.ConfigFlow, domain=DOMA
                 # Validate the input
                 base_url = user_input[CONF_BASE_URL].rstrip("/")
                 api_code = user_input[CONF_API_CODE].strip()
+                partition_key = user_input.get(CONF_PARTITION_KEY, PARTITION_KEY).strip()
+                drop_directory = user_input.get(CONF_DROP_DIRECTORY, "").strip()
                 
                 _LOGGER.debug("Validated input - Base URL: %s, API Code: %s", 
                               base_url, "***" if api_code else "None")
@@ -58,21 +116,38 @@ class LakeConstanceStormCheckerConfigFlow(config_entries.ConfigFlow, domain=DOMA
                 elif not api_code:
                     _LOGGER.warning("Empty API code provided")
                     errors["base"] = "invalid_auth"
+                elif not partition_key:
+                    _LOGGER.warning("Empty partition key provided")
+                    errors["base"] = "invalid_partition"
+                elif drop_directory and not await self.hass.async_add_executor_job(os.path.isdir, drop_directory):
+                    _LOGGER.warning("Drop directory %s does not exist", drop_directory)
+                    errors["base"] = "invalid_drop_directory"
                 else:
-                    # Test the connection
-                    _LOGGER.debug("Testing connection to API")
-                    await self._test_connection(base_url, api_code)
-                    _LOGGER.info("Connection test successful")
+                    if drop_directory:
+                        # Relayed sites cannot reach the API; payloads arrive as files
+                        _LOGGER.debug("Skipping connection test, reading files from %s", drop_directory)
+                    else:
+                        # Test the connection
+                        _LOGGER.debug("Testing connection to API")
+                        await self._test_connection(base_url, api_code, partition_key)
+                        _LOGGER.info("Connection test successful")
                     
                     # Create the config entry
                     config_data = {
                         CONF_BASE_URL: base_url,
                         CONF_API_CODE: api_code,
+                        CONF_PARTITION_KEY: partition_key,
                     }
-                    
+                    if drop_directory:
+                        config_data[CONF_DROP_DIRECTORY] = drop_directory
+
+                    title = "Lake Constance Storm Checker"
+                    if partition_key != PARTITION_KEY:
+                        title = f"{title} ({partition_key})"
+
                     _LOGGER.info("Creating config entry with validated data")
                     return self.async_create_entry(
-                        title="Lake Constance Storm Checker",
+                        title=title,
                         data=config_data,
                     )
 
@@ -82,6 +157,9 @@ class LakeConstanceStormCheckerConfigFlow(config_entries.ConfigFlow, domain=DOMA
             except InvalidAuth:
                 _LOGGER.error("Connection test failed - invalid authentication")
                 errors["base"] = "invalid_auth"
+            except RateLimited:
+                _LOGGER.error("Connection test failed - API rate limit in effect")
+                errors["base"] = "rate_limited"
             except Exception:  # pylint: disable=broad-except
                 _LOGGER.exception("Unexpected exception during configuration")
                 errors["base"] = "unknown"
@@ -95,74 +173,184 @@ class LakeConstanceStormCheckerConfigFlow(config_entries.ConfigFlow, domain=DOMA
                         CONF_BASE_URL, default=""
                     ): str,
                     vol.Required(CONF_API_CODE): str,
+                    vol.Optional(
+                        CONF_PARTITION_KEY, default=PARTITION_KEY
+                    ): str,
+                    vol.Optional(
+                        CONF_DROP_DIRECTORY, default=""
+                    ): str,
                 }
             ),
             errors=errors,
         )
 
-    async def _test_connection(self, base_url: str, api_code: str) -> None:
+    async def _test_connection(
+        self, base_url: str, api_code: str, partition_key: str = PARTITION_KEY
+    ) -> None:
         """Test the connection to the API."""
-        url = f"{base_url}{API_ENDPOINT}"
-        params = {
-            "code": api_code,
-            "partitionKey": PARTITION_KEY,
-            "simple": "true",
-        }
+        # pylint: disable=import-outside-toplevel
+        from .api import (
+            AiohttpTransport,
+            ApiAuthError,
+            ApiError,
+            ApiRateLimitedError,
+            LakeConstanceApiClient,
+        )
+        from .ratelimit import async_get_rate_limiter
+        from .session import async_get_session_manager
 
-        _LOGGER.debug("Testing connection to URL: %s", url)
-        _LOGGER.debug("Test parameters: %s", {k: v if k != "code" else "***" for k, v in params.items()})
+        _LOGGER.debug("Testing connection to %s (partition %s)", base_url, partition_key)
 
+        # Validation shares the pool and rate limit with running coordinators;
+        # the session is held only for the test, so it is closed if unused
+        session_manager = async_get_session_manager(self.hass)
+        transport = AiohttpTransport(
+            session_manager.async_acquire(),
+            async_get_rate_limiter(self.hass, base_url),
+        )
+        client = LakeConstanceApiClient(base_url, api_code, transport, partition_key=partition_key)
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, params=params, timeout=10) as response:
-                    _LOGGER.debug("Connection test response status: %s", response.status)
-                    _LOGGER.debug("Connection test response headers: %s", dict(response.headers))
-                    
-                    if response.status == 401 or response.status == 403:
-                        _LOGGER.error("Authentication failed during connection test - Status: %s", response.status)
-                        raise InvalidAuth()
-                    elif response.status != 200:
-                        _LOGGER.error("Connection test failed - Status: %s", response.status)
-                        # Try to get response text for debugging
-                        try:
-                            response_text = await response.text()
-                            _LOGGER.error("Test response content: %s", response_text[:500])
-                        except Exception as text_err:
-                            _LOGGER.error("Could not read test response text: %s", text_err)
-                        raise CannotConnect()
-
-                    # Check content type before attempting to parse
-                    content_type = response.headers.get('content-type', '').lower()
-                    _LOGGER.debug("Test response content-type: %s", content_type)
-                    
-                    if 'application/json' not in content_type and 'json' not in content_type:
-                        _LOGGER.error("Connection test returned non-JSON content type: %s", content_type)
-                        try:
-                            response_text = await response.text()
-                            _LOGGER.error("Test response content (first 1000 chars): %s", response_text[:1000])
-                        except Exception as text_err:
-                            _LOGGER.error("Could not read test response text: %s", text_err)
-                        raise CannotConnect()
-
-                    # Try to parse JSON to ensure it's valid
-                    try:
-                        await response.json()
-                        _LOGGER.info("Connection test successful - Status: %s, Valid JSON received", response.status)
-                    except Exception as json_err:
-                        _LOGGER.error("Connection test failed - Invalid JSON response: %s", json_err)
-                        try:
-                            response_text = await response.text()
-                            _LOGGER.error("Test response raw content: %s", response_text[:1000])
-                        except Exception as text_err:
-                            _LOGGER.error("Could not read test response text: %s", text_err)
-                        raise CannotConnect()
-
-        except aiohttp.ClientError as err:
-            _LOGGER.error("Connection error during test: %s", err)
-            raise CannotConnect() from err
-        except Exception as err:
-            _LOGGER.error("Unexpected error during connection test: %s", err, exc_info=True)
+            await client.async_get_status()
+        except ApiAuthError as err:
+            _LOGGER.error("Authentication failed during connection test: %s", err)
+            raise InvalidAuth() from err
+        except ApiRateLimitedError as err:
+            _LOGGER.error("Connection test rate limited: %s", err)
+            raise RateLimited() from err
+        except ApiError as err:
+            _LOGGER.error("Connection test failed: %s", err)
             raise CannotConnect() from err
+        finally:
+            await session_manager.async_release()
+        _LOGGER.info("Connection test successful - Valid JSON received")
+
+
+class LakeConstanceStormCheckerOptionsFlow(config_entries.OptionsFlow):
+    """Handle options for Lake Constance Storm Checker."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Initialize the options flow."""
+        self._entry = config_entry
+
+    async def async_step_init(
+        self, user_input: Optional[Dict[str, Any]] = None
+    ) -> FlowResult:
+        """Manage the transport and area options."""
+        _LOGGER.debug("Starting options step for entry: %s", self._entry.entry_id)
+        errors = {}
+
+        if user_input is not None:
+            _LOGGER.info("Processing options input")
+            if not user_input[CONF_AREAS]:
+                _LOGGER.warning("No areas selected")
+                errors["base"] = "no_areas"
+            elif (
+                user_input[CONF_CONNECT_TIMEOUT] > user_input[CONF_TOTAL_TIMEOUT]
+                or user_input[CONF_READ_TIMEOUT] > user_input[CONF_TOTAL_TIMEOUT]
+            ):
+                _LOGGER.warning("Connect/read timeout exceeds total timeout")
+                errors["base"] = "invalid_timeouts"
+            elif user_input[CONF_CONFIRM_COUNT] > user_input[CONF_CONFIRM_WINDOW]:
+                _LOGGER.warning("Confirmation count exceeds confirmation window")
+                errors["base"] = "invalid_confirmation"
+            else:
+                _LOGGER.info("Saving options")
+                return self.async_create_entry(title="", data=user_input)
+
+        options = self._entry.options
+        _LOGGER.debug("Showing options form")
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_SCAN_INTERVAL,
+                        default=options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL),
+                    ): vol.All(
+                        vol.Coerce(int),
+                        vol.Range(min=MIN_SCAN_INTERVAL, max=MAX_SCAN_INTERVAL),
+                    ),
+                    vol.Required(
+                        CONF_ALIGN_POLLS,
+                        default=options.get(CONF_ALIGN_POLLS, True),
+                    ): bool,
+                    vol.Required(
+                        CONF_CONNECT_TIMEOUT,
+                        default=options.get(CONF_CONNECT_TIMEOUT, DEFAULT_CONNECT_TIMEOUT),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=MIN_TIMEOUT, max=MAX_TIMEOUT)),
+                    vol.Required(
+                        CONF_READ_TIMEOUT,
+                        default=options.get(CONF_READ_TIMEOUT, DEFAULT_READ_TIMEOUT),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=MIN_TIMEOUT, max=MAX_TIMEOUT)),
+                    vol.Required(
+                        CONF_TOTAL_TIMEOUT,
+                        default=options.get(CONF_TOTAL_TIMEOUT, DEFAULT_TOTAL_TIMEOUT),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=MIN_TIMEOUT, max=MAX_TIMEOUT)),
+                    vol.Required(
+                        CONF_MAX_BODY_SIZE,
+                        default=options.get(CONF_MAX_BODY_SIZE, DEFAULT_MAX_BODY_SIZE),
+                    ): vol.All(
+                        vol.Coerce(int),
+                        vol.Range(min=MIN_MAX_BODY_SIZE, max=MAX_MAX_BODY_SIZE),
+                    ),
+                    vol.Required(
+                        CONF_AREAS,
+                        default=options.get(CONF_AREAS, AREAS),
+                    ): cv.multi_select({area: area.capitalize() for area in AREAS}),
+                    vol.Required(
+                        CONF_MIN_DWELL,
+                        default=options.get(CONF_MIN_DWELL, DEFAULT_MIN_DWELL),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=MAX_MIN_DWELL)),
+                    vol.Required(
+                        CONF_CONFIRM_COUNT,
+                        default=options.get(CONF_CONFIRM_COUNT, DEFAULT_CONFIRM_COUNT),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=MAX_CONFIRM_WINDOW)),
+                    vol.Required(
+                        CONF_CONFIRM_WINDOW,
+                        default=options.get(CONF_CONFIRM_WINDOW, DEFAULT_CONFIRM_WINDOW),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=MAX_CONFIRM_WINDOW)),
+                    vol.Required(
+                        CONF_MAX_STALENESS,
+                        default=options.get(CONF_MAX_STALENESS, DEFAULT_MAX_STALENESS),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=MAX_MAX_STALENESS)),
+                    vol.Required(
+                        CONF_TRACKERS,
+                        default=options.get(CONF_TRACKERS, []),
+                    ): selector.EntitySelector(
+                        selector.EntitySelectorConfig(domain="device_tracker", multiple=True)
+                    ),
+                    vol.Required(
+                        CONF_RICH_PAYLOAD,
+                        default=options.get(CONF_RICH_PAYLOAD, False),
+                    ): bool,
+                    vol.Required(
+                        CONF_COMPACT,
+                        default=options.get(CONF_COMPACT, False),
+                    ): bool,
+                    vol.Required(
+                        CONF_EXPOSURE,
+                        default=options.get(CONF_EXPOSURE, False),
+                    ): bool,
+                    vol.Required(
+                        CONF_NOWCAST_HORIZON,
+                        default=options.get(CONF_NOWCAST_HORIZON, DEFAULT_NOWCAST_HORIZON),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=MAX_NOWCAST_HORIZON)),
+                    vol.Required(
+                        CONF_RECORD_RESPONSES,
+                        default=options.get(CONF_RECORD_RESPONSES, False),
+                    ): bool,
+                    vol.Required(
+                        CONF_TRACE_FILE,
+                        default=options.get(CONF_TRACE_FILE, False),
+                    ): bool,
+                    vol.Required(
+                        CONF_BACKGROUND_REFRESH,
+                        default=options.get(CONF_BACKGROUND_REFRESH, False),
+                    ): bool,
+                }
+            ),
+            errors=errors,
+        )
 
 
 class CannotConnect(HomeAssistantError):
@@ -170,4 +358,8 @@ class CannotConnect(HomeAssistantError):
 
 
 class InvalidAuth(HomeAssistantError):
-    """Error to indicate there is invalid auth.""" 
\ No newline at end of file
+    """Error to indicate there is invalid auth."""
+
+
+class RateLimited(HomeAssistantError):
+    """Error to indicate the API rate limit is in effect."""
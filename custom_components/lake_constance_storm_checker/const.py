@@ -7,15 +7,157 @@ DOMAIN: Final = "lake_constance_storm_checker"
 # Configuration keys
 CONF_BASE_URL: Final = "base_url"
 CONF_API_CODE: Final = "api_code"
+CONF_PARTITION_KEY: Final = "partition_key"
+CONF_DROP_DIRECTORY: Final = "drop_directory"
+
+# Option keys
+CONF_SCAN_INTERVAL: Final = "scan_interval"
+CONF_CONNECT_TIMEOUT: Final = "connect_timeout"
+CONF_READ_TIMEOUT: Final = "read_timeout"
+CONF_TOTAL_TIMEOUT: Final = "total_timeout"
+CONF_MAX_BODY_SIZE: Final = "max_body_size"
+CONF_AREAS: Final = "areas"
+CONF_RECORD_RESPONSES: Final = "record_responses"
+CONF_RICH_PAYLOAD: Final = "rich_payload"
+CONF_TRACKERS: Final = "trackers"
+CONF_BACKGROUND_REFRESH: Final = "background_refresh"
+CONF_MIN_DWELL: Final = "min_dwell"
+CONF_CONFIRM_COUNT: Final = "confirm_count"
+CONF_CONFIRM_WINDOW: Final = "confirm_window"
+CONF_MAX_STALENESS: Final = "max_staleness"
+CONF_COMPACT: Final = "compact"
+CONF_ALIGN_POLLS: Final = "align_polls"
+CONF_TRACE_FILE: Final = "trace_file"
+CONF_EXPOSURE: Final = "exposure"
+CONF_NOWCAST_HORIZON: Final = "nowcast_horizon"
 
 # Default values
 DEFAULT_SCAN_INTERVAL: Final = 300  # 5 minutes
 DEFAULT_BASE_URL: Final = "https://your-api-endpoint.com"
+DEFAULT_CONNECT_TIMEOUT: Final = 5  # seconds
+DEFAULT_READ_TIMEOUT: Final = 10  # seconds
+DEFAULT_TOTAL_TIMEOUT: Final = 10  # seconds
+DEFAULT_MAX_BODY_SIZE: Final = 65536  # bytes
+DEFAULT_MIN_DWELL: Final = 0  # seconds; no hysteresis
+DEFAULT_CONFIRM_COUNT: Final = 1  # polls
+DEFAULT_CONFIRM_WINDOW: Final = 1  # polls
+DEFAULT_MAX_STALENESS: Final = 0  # seconds; unavailable on the first failed update
+DEFAULT_NOWCAST_HORIZON: Final = 0  # minutes; no storm probability sensors
+
+# Retries of a first refresh running in the background; doubled after each
+# failure until the regular poll interval takes over
+BACKGROUND_RETRY_DELAY: Final = 10  # seconds
+
+# Scans of a drop directory where inotify is not available
+DROP_POLL_INTERVAL: Final = 1  # seconds
+
+# Publish cadence learned from payload timestamps
+CADENCE_SAMPLES: Final = 24  # publications kept
+CADENCE_MIN_SAMPLES: Final = 5  # publications before polls are aligned
+ALIGN_MARGIN: Final = 10  # seconds after an expected publication, on top of its jitter
+# Entries aligned to the same publication keep their phase order within this window
+ALIGN_SPREAD: Final = 60  # seconds
+
+# Sliding windows of the warning exposure sensors, by key
+EXPOSURE_WINDOWS: Final = {"1h": 3600, "24h": 86400, "7d": 604800}  # seconds
+# Longer gaps between updates, e.g. while stopped, count as not observed
+EXPOSURE_MAX_GAP: Final = 7200  # seconds
+EXPOSURE_SAVE_DELAY: Final = 60  # seconds
+EXPOSURE_STORAGE_VERSION: Final = 1
+
+# Storm warning nowcast from a Markov chain of sampled joint statuses
+NOWCAST_STEP: Final = 300  # seconds between samples
+NOWCAST_HISTORY_STEPS: Final = 8640  # 30 days of samples
+NOWCAST_MAX_GAP: Final = 7200  # seconds; longer gaps break the timeline
+NOWCAST_MIN_TRANSITIONS: Final = 12  # before probabilities are shown
+# Pseudo-transitions pulling sparse joint rows towards independent areas
+NOWCAST_SHRINKAGE: Final = 5.0
+# Pseudo-transitions keeping an area's level where it has no observations
+NOWCAST_PERSISTENCE: Final = 1.0
+NOWCAST_SAVE_DELAY: Final = 60  # seconds
+NOWCAST_STORAGE_VERSION: Final = 1
+
+# Option bounds
+MIN_SCAN_INTERVAL: Final = 30  # seconds
+MAX_SCAN_INTERVAL: Final = 3600  # 1 hour
+MIN_TIMEOUT: Final = 1  # seconds
+MAX_TIMEOUT: Final = 60  # seconds
+MIN_MAX_BODY_SIZE: Final = 1024  # bytes
+MAX_MAX_BODY_SIZE: Final = 1048576  # 1 MiB
+MAX_MIN_DWELL: Final = 7200  # 2 hours
+MAX_CONFIRM_WINDOW: Final = 10  # polls
+MAX_MAX_STALENESS: Final = 86400  # 1 day
+MAX_NOWCAST_HORIZON: Final = 360  # minutes
+
+# Warning areas
+AREAS: Final = ["west", "center", "east"]
 
 # API constants
 PARTITION_KEY: Final = "lakeConstance"
 API_ENDPOINT: Final = "/api/get-latest-status"
 
+# Per-area fields of the rich (simple=false) payload
+FIELD_WIND_SPEED: Final = "windSpeed"  # km/h
+FIELD_WIND_GUST: Final = "windGust"  # km/h
+
+# Attributes of entities serving data past a failed update
+ATTR_STALE: Final = "stale"
+ATTR_AGE: Final = "age"
+
+# Attribute of the warning exposure sensors
+ATTR_OBSERVED_HOURS: Final = "observed_hours"
+
+# Attributes of the storm probability sensors
+ATTR_HORIZON_MINUTES: Final = "horizon_minutes"
+ATTR_TRANSITIONS: Final = "transitions"
+
+# Services
+SERVICE_GET_STATUS: Final = "get_status"
+ATTR_PARTITIONS: Final = "partitions"
+ATTR_AREAS: Final = "areas"
+ATTR_REFRESH: Final = "refresh"
+SERVICE_START_PROFILING: Final = "start_profiling"
+SERVICE_STOP_PROFILING: Final = "stop_profiling"
+ATTR_DURATION: Final = "duration"
+ATTR_INTERVAL: Final = "interval"
+ATTR_OUTPUT_FORMAT: Final = "format"
+
+# Prometheus metrics endpoint
+METRICS_URL: Final = f"/api/{DOMAIN}/metrics"
+
+# Keys in hass.data shared by all config entries
+DATA_POLL_SCHEDULER: Final = f"{DOMAIN}_poll_scheduler"
+DATA_RATE_LIMITERS: Final = f"{DOMAIN}_rate_limiters"
+DATA_SESSION: Final = f"{DOMAIN}_session"
+DATA_PROFILER: Final = f"{DOMAIN}_profiler"
+
+# HTTP connection pool tuning
+SESSION_CONNECTION_LIMIT: Final = 100
+SESSION_CONNECTION_LIMIT_PER_HOST: Final = 4
+SESSION_DNS_CACHE_TTL: Final = 300  # seconds
+# Longer than the default poll interval so idle connections survive between polls
+SESSION_KEEPALIVE_TIMEOUT: Final = DEFAULT_SCAN_INTERVAL + 30  # seconds
+
+# Response recordings, relative to the config directory
+RECORDINGS_DIR: Final = "lake_constance_storm_checker_recordings"
+
+# Update traces kept in memory, and the directory of trace files relative to
+# the config directory
+TRACE_BUFFER_SIZE: Final = 50
+TRACES_DIR: Final = "lake_constance_storm_checker_traces"
+
+# Sampling profiler of the integration's code on the event loop; profiles are
+# written to a directory relative to the config directory
+PROFILES_DIR: Final = "lake_constance_storm_checker_profiles"
+DEFAULT_PROFILE_DURATION: Final = 60  # seconds
+MAX_PROFILE_DURATION: Final = 3600  # seconds
+DEFAULT_PROFILE_INTERVAL: Final = 5  # milliseconds between samples
+MAX_PROFILE_INTERVAL: Final = 1000  # milliseconds
+PROFILE_TOP_FUNCTIONS: Final = 10  # in the stop_profiling response
+
+# Malformed payloads kept for diagnostics instead of being published
+QUARANTINE_SIZE: Final = 10
+
 # Logging constants
 LOG_NAME: Final = "lake_constance_storm_checker"
 LOG_PREFIX: Final = "[Lake Constance Storm Checker]" 
\ No newline at end of file
@@ -0,0 +1,558 @@
+"""Data update coordinator for Lake Constance Storm Checker."""
+import asyncio
+import logging
+import time
+from collections import Counter, deque
+from contextlib import nullcontext
+from dataclasses import replace
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any, Deque, Dict, FrozenSet, Iterable, List, Mapping, Optional
+
+import aiohttp
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
+from homeassistant.util.read_only_dict import ReadOnlyDict
+
+from .const import (
+    DOMAIN,
+    CONF_SCAN_INTERVAL,
+    CONF_CONNECT_TIMEOUT,
+    CONF_READ_TIMEOUT,
+    CONF_TOTAL_TIMEOUT,
+    CONF_MAX_BODY_SIZE,
+    CONF_AREAS,
+    CONF_RECORD_RESPONSES,
+    CONF_RICH_PAYLOAD,
+    CONF_TRACKERS,
+    CONF_MIN_DWELL,
+    CONF_CONFIRM_COUNT,
+    CONF_CONFIRM_WINDOW,
+    CONF_MAX_STALENESS,
+    CONF_COMPACT,
+    CONF_ALIGN_POLLS,
+    CONF_TRACE_FILE,
+    CONF_EXPOSURE,
+    CONF_NOWCAST_HORIZON,
+    DEFAULT_SCAN_INTERVAL,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_READ_TIMEOUT,
+    DEFAULT_TOTAL_TIMEOUT,
+    DEFAULT_MAX_BODY_SIZE,
+    DEFAULT_MIN_DWELL,
+    DEFAULT_CONFIRM_COUNT,
+    DEFAULT_CONFIRM_WINDOW,
+    DEFAULT_MAX_STALENESS,
+    DEFAULT_NOWCAST_HORIZON,
+    AREAS,
+    ATTR_AGE,
+    ATTR_STALE,
+    BACKGROUND_RETRY_DELAY,
+    PARTITION_KEY,
+    QUARANTINE_SIZE,
+)
+from .api import (
+    AiohttpTransport,
+    ApiConnectionError,
+    ApiError,
+    ApiPayloadError,
+    ApiRateLimitedError,
+    LakeConstanceApiClient,
+    StatusResult,
+    Transport,
+    decode_response,
+)
+from .cadence import PublishCadence, parse_published
+from .metrics import CoordinatorMetrics
+from .ratelimit import DEFAULT_MAX_WAIT, SETUP_MAX_WAIT, TokenBucket, async_get_rate_limiter
+from .session import async_get_session_manager
+from .snapshot import EMPTY_ATTRIBUTES, StatusHysteresis, StatusSnapshot
+from .tracing import UpdateTrace, UpdateTracer
+
+if TYPE_CHECKING:
+    from .exposure import WarningExposure
+    from .filedrop import FileDropWatcher
+    from .nowcast import WarningNowcast
+    from .recorder import ResponseRecorder
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class LakeConstanceStormCheckerCoordinator(DataUpdateCoordinator):
+    """Class to manage fetching Lake Constance Storm Checker data."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        base_url: str,
+        api_code: str,
+        options: Optional[Mapping[str, Any]] = None,
+        partition_key: str = PARTITION_KEY,
+        recording_path: Optional[str] = None,
+        trace_path: Optional[str] = None,
+        drop_directory: Optional[str] = None,
+        exposure_key: Optional[str] = None,
+        nowcast_key: Optional[str] = None,
+    ) -> None:
+        """Initialize.
+
+        With a ``drop_directory``, payloads are read from files a relay drops
+        there instead of being fetched over HTTP, and neither the shared
+        session nor a rate limiter is used. ``exposure_key`` is the
+        storage key of the warning exposure, and ``nowcast_key`` the one of the
+        storm warning nowcast, if enabled in the options.
+        """
+        _LOGGER.debug("Initializing LakeConstanceStormCheckerCoordinator")
+        self.base_url = base_url
+        self.api_code = api_code
+        self.partition_key = partition_key
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.rate_limiter: Optional[TokenBucket] = None
+        self.http_transport: Optional[AiohttpTransport] = None
+        self.file_drop: Optional["FileDropWatcher"] = None
+        if drop_directory:
+            # Only loaded for relayed deployments
+            from . import filedrop  # pylint: disable=import-outside-toplevel
+
+            self.file_drop = filedrop.FileDropWatcher(
+                hass, filedrop.FileDropTransport(hass, drop_directory), self.async_refresh
+            )
+            transport: Transport = self.file_drop.transport
+        else:
+            self.session = async_get_session_manager(hass).async_acquire()
+            self.rate_limiter = async_get_rate_limiter(hass, base_url)
+            self.http_transport = transport = AiohttpTransport(self.session, self.rate_limiter)
+        self.client = LakeConstanceApiClient(base_url, api_code, transport, partition_key=partition_key)
+        self.areas: List[str] = list(AREAS)
+        self.poll_interval = timedelta(seconds=DEFAULT_SCAN_INTERVAL)
+        self.recording_path = recording_path
+        self.trace_path = trace_path
+        self.recorder: Optional["ResponseRecorder"] = None
+        self.last_result: Optional[StatusResult] = None
+        self.rich_payload = False
+        self.compact = False
+        self.trackers: List[str] = []
+        # Rich area fields used by enabled entities, with reference counts
+        self._required_fields: Counter = Counter()
+        self._reproject_pending = False
+        self._inflight_refresh: Optional[asyncio.Task] = None
+        self._snapshot: Optional[StatusSnapshot] = None
+        self._snapshot_source: Any = None
+        self.hysteresis = StatusHysteresis()
+        self.metrics = CoordinatorMetrics()
+        # Malformed payloads, kept for diagnostics instead of being published
+        self.quarantine: Deque[Dict[str, Any]] = deque(maxlen=QUARANTINE_SIZE)
+        self.cadence = PublishCadence()
+        self.align_polls = True
+        self.tracer = UpdateTracer(hass)
+        # Trace of the update in progress, closed after its state writes
+        self._trace: Optional[UpdateTrace] = None
+        self._last_poll_started: Optional[float] = None
+        self.max_staleness = timedelta(seconds=DEFAULT_MAX_STALENESS)
+        self.last_success_time: Optional[datetime] = None
+        # Set while the last good data is served past failed updates
+        self._stale_attributes: ReadOnlyDict = EMPTY_ATTRIBUTES
+        self._snapshot_stale: ReadOnlyDict = EMPTY_ATTRIBUTES
+        self._unsub_background_retry: Optional[CALLBACK_TYPE] = None
+        self.exposure: Optional["WarningExposure"] = None
+        if exposure_key and (options or {}).get(CONF_EXPOSURE, False):
+            from . import exposure  # pylint: disable=import-outside-toplevel
+
+            self.exposure = exposure.WarningExposure(hass, exposure_key)
+        self.nowcast_horizon: int = (options or {}).get(CONF_NOWCAST_HORIZON, DEFAULT_NOWCAST_HORIZON)
+        self.nowcast: Optional["WarningNowcast"] = None
+        if nowcast_key and self.nowcast_horizon:
+            # Pulls in NumPy; imported in the executor before the coordinator is created
+            from . import nowcast  # pylint: disable=import-outside-toplevel
+
+            self.nowcast = nowcast.WarningNowcast(
+                hass, nowcast_key, self.nowcast_horizon, on_change=self.async_update_listeners
+            )
+        _LOGGER.debug("Coordinator initialized with base_url: %s, drop directory: %s", base_url, drop_directory)
+
+        # No update_interval: the shared poll scheduler triggers refreshes
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=DOMAIN,
+        )
+        self._apply_options(options or {})
+
+    @property
+    def transport(self) -> Transport:
+        """Return the transport responses are currently fetched from."""
+        return self.client.transport
+
+    @transport.setter
+    def transport(self, transport: Optional[Transport]) -> None:
+        """Replace the transport (e.g. for replay); None restores the default one."""
+        if transport is None:
+            transport = self.file_drop.transport if self.file_drop is not None else self.http_transport
+        self.client.transport = transport
+
+    @property
+    def last_decode_seconds(self) -> float:
+        """Return the time spent decoding the last successful response."""
+        return self.last_result.decode_seconds if self.last_result else 0.0
+
+    def _apply_options(self, options: Mapping[str, Any]) -> None:
+        """Set transport tuning from config entry options."""
+        scan_interval = options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
+        self.poll_interval = timedelta(seconds=scan_interval)
+        self.timeout = aiohttp.ClientTimeout(
+            total=options.get(CONF_TOTAL_TIMEOUT, DEFAULT_TOTAL_TIMEOUT),
+            connect=options.get(CONF_CONNECT_TIMEOUT, DEFAULT_CONNECT_TIMEOUT),
+            sock_read=options.get(CONF_READ_TIMEOUT, DEFAULT_READ_TIMEOUT),
+        )
+        self.max_body_size = options.get(CONF_MAX_BODY_SIZE, DEFAULT_MAX_BODY_SIZE)
+        if self.http_transport is not None:
+            self.http_transport.timeout = self.timeout
+            self.http_transport.max_body_size = self.max_body_size
+        if self.file_drop is not None:
+            self.file_drop.transport.max_body_size = self.max_body_size
+        self.rich_payload = options.get(CONF_RICH_PAYLOAD, False)
+        self.client.request = replace(self.client.request, simple=not self.rich_payload)
+        self.trackers = list(options.get(CONF_TRACKERS, []))
+        self.compact = options.get(CONF_COMPACT, False)
+        self.align_polls = options.get(CONF_ALIGN_POLLS, True)
+        # Keep the canonical area order regardless of selection order
+        enabled_areas = options.get(CONF_AREAS, AREAS)
+        self.areas = [area for area in AREAS if area in enabled_areas]
+        self.max_staleness = timedelta(seconds=options.get(CONF_MAX_STALENESS, DEFAULT_MAX_STALENESS))
+        self.hysteresis.configure(
+            timedelta(seconds=options.get(CONF_MIN_DWELL, DEFAULT_MIN_DWELL)),
+            options.get(CONF_CONFIRM_COUNT, DEFAULT_CONFIRM_COUNT),
+            options.get(CONF_CONFIRM_WINDOW, DEFAULT_CONFIRM_WINDOW),
+        )
+        if options.get(CONF_RECORD_RESPONSES, False) and self.recording_path:
+            # Recording is a debugging aid; only load it when enabled
+            from .recorder import ResponseRecorder  # pylint: disable=import-outside-toplevel
+
+            self.recorder = ResponseRecorder(self.recording_path)
+        else:
+            self.recorder = None
+        self.tracer.path = self.trace_path if options.get(CONF_TRACE_FILE, False) else None
+        _LOGGER.debug(
+            "Applied options - Interval: %s, Timeout: %s, Max body size: %s, Areas: %s, Rich: %s, "
+            "Compact: %s, Recording: %s, Hysteresis: %s, Max staleness: %s, Align polls: %s, Trace file: %s",
+            self.poll_interval, self.timeout, self.max_body_size, self.areas, self.rich_payload, self.compact,
+            self.recorder.path if self.recorder else None, self.hysteresis.as_dict(), self.max_staleness,
+            self.align_polls, self.tracer.path,
+        )
+
+    @callback
+    def async_apply_options(self, options: Mapping[str, Any]) -> None:
+        """Apply new options in place and refresh entity states."""
+        self._apply_options(options)
+        # Aggregates in the snapshot depend on the enabled areas
+        self._snapshot_source = None
+        # Entities derive availability and aggregates from the enabled areas
+        self.async_update_listeners()
+
+    @property
+    def projection(self) -> Optional[FrozenSet[str]]:
+        """Return the rich area fields to decode, or None to keep the payload whole."""
+        if not self.rich_payload:
+            return None
+        return frozenset(self._required_fields)
+
+    @callback
+    def async_require_fields(self, fields: Iterable[str]) -> CALLBACK_TYPE:
+        """Decode rich area ``fields`` until the returned callback is called."""
+        fields = tuple(fields)
+        missing = any(name not in self._required_fields for name in fields)
+        self._required_fields.update(fields)
+        if missing:
+            self._async_schedule_reproject()
+
+        @callback
+        def _release() -> None:
+            self._required_fields.subtract(fields)
+            # Drop fields no entity uses any more
+            self._required_fields += Counter()
+
+        return _release
+
+    @callback
+    def _async_schedule_reproject(self) -> None:
+        """Coalesce re-projection when many entities are added at once."""
+        if self._reproject_pending or not self.rich_payload:
+            return
+        self._reproject_pending = True
+        self.hass.loop.call_soon(self._async_reproject)
+
+    @callback
+    def _async_reproject(self) -> None:
+        """Decode newly required fields from the last response without polling."""
+        self._reproject_pending = False
+        if self.last_result is None or not self.last_result.raw or not self.last_update_success:
+            return
+        self.last_result = self.last_result.project(self.projection)
+        _LOGGER.debug("Re-projected last response to fields: %s", sorted(self.projection))
+        self.async_set_updated_data(self.last_result.payload)
+
+    @property
+    def data_available(self) -> bool:
+        """Return if entities have data to show, possibly stale."""
+        if self.data is None:
+            return False
+        return self.last_update_success or self.stale
+
+    @property
+    def stale(self) -> bool:
+        """Return if the last good data is served past a failed update."""
+        return bool(self._stale_attributes)
+
+    @property
+    def data_age(self) -> Optional[timedelta]:
+        """Return the time since the last successful update."""
+        if self.last_success_time is None:
+            return None
+        return dt_util.utcnow() - self.last_success_time
+
+    @callback
+    def _async_mark_stale(self) -> None:
+        """Keep serving the last good data after a failed update, up to the max staleness."""
+        age = self.data_age
+        if age is None or self.data is None or age > self.max_staleness:
+            if self._stale_attributes:
+                _LOGGER.warning(
+                    "Data of partition %s is older than %s, entities become unavailable",
+                    self.partition_key, self.max_staleness,
+                )
+            self._stale_attributes = EMPTY_ATTRIBUTES
+            return
+        _LOGGER.debug("Serving %ss old data for partition %s", int(age.total_seconds()), self.partition_key)
+        self._stale_attributes = ReadOnlyDict({ATTR_STALE: True, ATTR_AGE: int(age.total_seconds())})
+
+    @property
+    def snapshot(self) -> Optional[StatusSnapshot]:
+        """Return the read-only snapshot of the current data.
+
+        The snapshot is built once per update and shared by all entities.
+        """
+        if not self.data:
+            return None
+        if self._snapshot_source is not self.data or self._snapshot_stale is not self._stale_attributes:
+            with self._trace.span("snapshot") if self._trace is not None else nullcontext():
+                result = self.last_result
+                self._snapshot = StatusSnapshot(
+                    self.data,
+                    self.areas,
+                    self.hysteresis.statuses if self.hysteresis.enabled else None,
+                    self._stale_attributes,
+                    # Validation already extracted the statuses of this payload
+                    result.statuses if result is not None and result.payload is self.data else None,
+                )
+            self._snapshot_source = self.data
+            self._snapshot_stale = self._stale_attributes
+            _LOGGER.debug("Built status snapshot: %s", dict(self._snapshot.statuses))
+        return self._snapshot
+
+    def aligned_poll_time(self, earliest: float) -> Optional[float]:
+        """Return when to poll right after the next expected publication.
+
+        None keeps the regular interval: alignment is off, the cadence is not
+        known yet, upstream publishes about as often as we poll, or the
+        expected publication is overdue and regular polls look for it.
+        """
+        if not self.align_polls or self.cadence.period is None:
+            return None
+        if self.cadence.period < 2 * self.poll_interval.total_seconds():
+            return None
+        due = self.cadence.next_poll()
+        if due is None or due <= earliest:
+            return None
+        return due
+
+    async def async_config_entry_first_refresh(self) -> None:
+        """Refresh for setup, queueing for a token of the shared rate limiter."""
+        self._set_max_wait(SETUP_MAX_WAIT)
+        try:
+            await super().async_config_entry_first_refresh()
+        finally:
+            self._set_max_wait(DEFAULT_MAX_WAIT)
+
+    def _set_max_wait(self, max_wait: float) -> None:
+        """Set how long HTTP fetches queue for a token of the rate limiter."""
+        if self.http_transport is not None:
+            self.http_transport.max_wait = max_wait
+
+    async def async_refresh(self) -> None:
+        """Refresh data, joining a refresh that is already in flight.
+
+        Scheduled polls and forced refreshes from services share one request.
+        """
+        if self._inflight_refresh is None or self._inflight_refresh.done():
+            self._inflight_refresh = self.hass.async_create_task(
+                self._async_refresh_serving_stale(), f"{DOMAIN} refresh {self.partition_key}"
+            )
+        else:
+            _LOGGER.debug("Joining refresh already in flight for partition %s", self.partition_key)
+        # A cancelled caller must not cancel the shared request
+        await asyncio.shield(self._inflight_refresh)
+
+    @callback
+    def async_start_background_refresh(self) -> None:
+        """Run the first refresh in the background instead of blocking setup.
+
+        Failures are retried with a growing delay until a refresh succeeds or
+        the delay reaches the poll interval, where regular polls take over.
+        """
+        delay = BACKGROUND_RETRY_DELAY
+
+        async def _async_attempt() -> None:
+            nonlocal delay
+            # Queues for a token like a first refresh during setup
+            self._set_max_wait(SETUP_MAX_WAIT)
+            try:
+                await self.async_refresh()
+            finally:
+                self._set_max_wait(DEFAULT_MAX_WAIT)
+            if self.last_update_success:
+                _LOGGER.info("Background refresh for partition %s succeeded", self.partition_key)
+                return
+            if delay >= self.poll_interval.total_seconds():
+                _LOGGER.debug("Leaving retries for partition %s to regular polls", self.partition_key)
+                return
+            _LOGGER.debug("Retrying background refresh for partition %s in %ss", self.partition_key, delay)
+            self._unsub_background_retry = async_call_later(self.hass, delay, _retry)
+            delay *= 2
+
+        @callback
+        def _retry(_now: Any) -> None:
+            self._unsub_background_retry = None
+            if self.last_update_success:
+                # A scheduled poll succeeded in the meantime
+                return
+            self._async_create_background_refresh(_async_attempt())
+
+        self._async_create_background_refresh(_async_attempt())
+
+    @callback
+    def _async_create_background_refresh(self, target) -> None:
+        """Start a background refresh attempt tied to the config entry."""
+        self.config_entry.async_create_background_task(
+            self.hass, target, f"{DOMAIN} background refresh {self.partition_key}"
+        )
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update all listeners, closing the trace of the update that caused it."""
+        trace = self._trace
+        if trace is None:
+            super().async_update_listeners()
+            return
+        state_writes = self.metrics.state_writes
+        with trace.span("fan_out"):
+            super().async_update_listeners()
+        self._trace = None
+        trace.state_writes = self.metrics.state_writes - state_writes
+        self.tracer.async_finish(trace)
+
+    async def _async_refresh_serving_stale(self) -> None:
+        """Refresh, notifying entities of every failure while stale data is served."""
+        previous_update_success = self.last_update_success
+        await super().async_refresh()
+        if not self.last_update_success and not previous_update_success and self.max_staleness:
+            # The base class only notifies on the first failure in a row, but the
+            # data age grows and the max staleness may be reached on every one
+            self.async_update_listeners()
+
+    async def _async_update_data(self) -> Dict[str, Any]:
+        """Update data via API."""
+        trace = self._trace = UpdateTrace(self.partition_key, time.time(), self._last_poll_started)
+        self._last_poll_started = trace.started_at
+        try:
+            fetch_start = time.perf_counter()
+            try:
+                with trace.span("request"):
+                    response = await self.client.async_fetch_raw()
+            except ApiRateLimitedError:
+                # Held back by the local rate limiter, no request was sent
+                self.metrics.requests["rate_limited"] += 1
+                raise
+            except ApiConnectionError:
+                self.metrics.latency.observe(time.perf_counter() - fetch_start)
+                self.metrics.requests["connection_error"] += 1
+                raise
+            except ApiError:
+                self.metrics.requests["error"] += 1
+                raise
+            self.metrics.latency.observe(time.perf_counter() - fetch_start)
+            self.metrics.requests[str(response.status)] += 1
+            if self.recorder is not None:
+                try:
+                    await self.hass.async_add_executor_job(self.recorder.record, response)
+                except OSError as err:
+                    _LOGGER.warning("Could not record API response: %s", err)
+            try:
+                self.last_result = decode_response(response, self.projection)
+            except ApiPayloadError as err:
+                self._async_quarantine(response.received_at, err)
+                raise
+            self.metrics.decode.observe(self.last_result.decode_seconds)
+            trace.durations["decode"] = self.last_result.decode_seconds
+        except ApiError as err:
+            self._async_mark_stale()
+            # Failures write no new data; close the trace right away
+            self._trace = None
+            trace.outcome = type(err).__name__
+            self.tracer.async_finish(trace)
+            raise UpdateFailed(str(err)) from err
+        self.last_success_time = dt_util.utcnow()
+        self._stale_attributes = EMPTY_ATTRIBUTES
+        with trace.span("normalize"):
+            published = parse_published(self.last_result.timestamp)
+            trace.new_publication = self.cadence.observe(published)
+            # Fed once per fetch; re-projections and option changes reuse the result
+            self.hysteresis.update(self.last_result.statuses, dt_util.utcnow())
+            shown = self.hysteresis.statuses if self.hysteresis.enabled else self.last_result.statuses
+            if self.exposure is not None:
+                self.exposure.async_observe(dt_util.utcnow().timestamp(), shown)
+            if self.nowcast is not None:
+                # Recomputed in the executor for all areas; entities are updated when it is done
+                self.nowcast.async_observe(dt_util.utcnow().timestamp(), shown)
+        if published is not None:
+            trace.published = published.timestamp()
+        if trace.new_publication:
+            _LOGGER.debug("New publication %s for partition %s", self.last_result.timestamp, self.partition_key)
+        return self.last_result.payload
+
+    @callback
+    def _async_quarantine(self, received_at: float, err: ApiPayloadError) -> None:
+        """Keep a malformed payload for diagnostics; it is never published."""
+        self.metrics.quarantined += 1
+        self.quarantine.append(
+            {
+                "received_at": dt_util.utc_from_timestamp(received_at).isoformat(),
+                "reason": str(err),
+                "payload": err.payload,
+            }
+        )
+        _LOGGER.warning(
+            "Quarantined malformed payload of partition %s (%d so far): %s",
+            self.partition_key, self.metrics.quarantined, err,
+        )
+
+    async def async_shutdown(self) -> None:
+        """Shutdown the coordinator."""
+        _LOGGER.debug("Shutting down coordinator")
+        if self._unsub_background_retry is not None:
+            self._unsub_background_retry()
+            self._unsub_background_retry = None
+        if self.file_drop is not None:
+            self.file_drop.async_stop()
+        if self.exposure is not None:
+            await self.exposure.async_save()
+        if self.nowcast is not None:
+            self.nowcast.async_stop()
+            await self.nowcast.async_save()
+        await super().async_shutdown()
+        if self.session is not None:
+            # The pool is shared with other entries; only drop our reference
+            await async_get_session_manager(self.hass).async_release()
+            self.session = None
+            _LOGGER.debug("Session released successfully")
@@ -0,0 +1,47 @@
+"""Diagnostics support for Lake Constance Storm Checker."""
+import logging
+from typing import Any, Dict
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, CONF_API_CODE
+
+_LOGGER = logging.getLogger(__name__)
+
+TO_REDACT = {CONF_API_CODE}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> Dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    _LOGGER.debug("Collecting diagnostics for entry: %s", entry.entry_id)
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "coordinator": {
+            "last_update_success": coordinator.last_update_success,
+            "poll_interval": coordinator.poll_interval.total_seconds(),
+            "stale": coordinator.stale,
+            "max_staleness": coordinator.max_staleness.total_seconds(),
+            "last_success_time": coordinator.last_success_time.isoformat() if coordinator.last_success_time else None,
+            "areas": coordinator.areas,
+            "rich_payload": coordinator.rich_payload,
+            "projected_fields": sorted(coordinator.projection) if coordinator.projection is not None else None,
+            "data": coordinator.data,
+            # Fields outside the projection are only decoded here, on demand
+            "full_payload": coordinator.last_result.full_payload() if coordinator.last_result else None,
+        },
+        "hysteresis": coordinator.hysteresis.as_dict(),
+        "cadence": {"align_polls": coordinator.align_polls, **coordinator.cadence.as_dict()},
+        "metrics": coordinator.metrics.as_dict(),
+        "traces": coordinator.tracer.as_list(),
+        "quarantine": list(coordinator.quarantine),
+        "exposure": coordinator.exposure.as_dict() if coordinator.exposure is not None else None,
+        "nowcast": coordinator.nowcast.as_dict() if coordinator.nowcast is not None else None,
+        "file_drop": coordinator.file_drop.as_dict() if coordinator.file_drop is not None else None,
+        "rate_limit": coordinator.rate_limiter.as_dict() if coordinator.rate_limiter is not None else None,
+    }
@@ -0,0 +1,79 @@
+"""Base entity for Lake Constance Storm Checker."""
+import logging
+from typing import Any, Optional, Tuple
+
+from homeassistant.core import callback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .snapshot import StatusSnapshot
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class LakeConstanceEntity(CoordinatorEntity):
+    """Common base for entities backed by the coordinator's status snapshot."""
+
+    def __init__(self, coordinator, key: str) -> None:
+        """Initialize the entity with a unique ID scoped to its config entry."""
+        super().__init__(coordinator)
+        self._attr_unique_id = f"{coordinator.config_entry.entry_id}_{key}"
+        self._last_written: Optional[Tuple[Any, ...]] = None
+        if coordinator.compact:
+            # Compact mode publishes one overview sensor; the rest can be enabled as needed
+            self._attr_entity_registry_enabled_default = False
+
+    @property
+    def snapshot(self) -> Optional[StatusSnapshot]:
+        """Return the shared snapshot of the latest update, if any."""
+        return self.coordinator.snapshot
+
+    @property
+    def available(self) -> bool:
+        """Return if data is available.
+
+        Pending until the first update arrives; stale data is shown through
+        failed updates up to the configured max staleness.
+        """
+        return self.coordinator.data_available
+
+    def _written_state(self) -> Tuple[Any, ...]:
+        """Return what a state write would publish."""
+        if not self.available:
+            return (False,)
+        return (True, self.state, self.extra_state_attributes)
+
+    @callback
+    def async_write_ha_state(self) -> None:
+        """Write the state and remember what was written."""
+        self._last_written = self._written_state()
+        super().async_write_ha_state()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state only if the update changed it."""
+        written = self._written_state()
+        if written == self._last_written:
+            self.coordinator.metrics.skipped_writes += 1
+            return
+        self._last_written = written
+        self.coordinator.metrics.state_writes += 1
+        super().async_write_ha_state()
+
+
+class LakeConstanceAreaEntity(LakeConstanceEntity):
+    """Common base for entities that belong to a single warning area.
+
+    Entities that follow a tracker have no fixed area; they are created with
+    ``area`` None, their key alone as unique ID suffix, and set ``area`` as
+    the tracker moves.
+    """
+
+    def __init__(self, coordinator, area: Optional[str], key: str) -> None:
+        """Initialize the area entity."""
+        super().__init__(coordinator, key if area is None else f"{area}_{key}")
+        self.area = area
+
+    @property
+    def available(self) -> bool:
+        """Return if the area, when known, is enabled and data is available."""
+        return super().available and (self.area is None or self.area in self.coordinator.areas)
@@ -0,0 +1,183 @@
+"""Share of time each area spent under warning over sliding windows."""
+import logging
+from collections import deque
+from typing import Any, Deque, Dict, List, Mapping, Optional, Tuple
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    AREAS,
+    EXPOSURE_MAX_GAP,
+    EXPOSURE_SAVE_DELAY,
+    EXPOSURE_STORAGE_VERSION,
+    EXPOSURE_WINDOWS,
+)
+from .snapshot import WARNING_STATUSES
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class SlidingShare:
+    """Time share of a condition over a sliding window, updated incrementally.
+
+    Observed time is added as segments in time order, and touching segments
+    of the same condition are merged. Running sums are adjusted when a
+    segment is added or falls out of the window, so adding and querying
+    take amortized O(1) time however long the window is.
+    """
+
+    __slots__ = ("window", "_segments", "_observed", "_active")
+
+    def __init__(self, window: float) -> None:
+        """Initialize an empty window of ``window`` seconds."""
+        self.window = window
+        # [start, end, active] in epoch seconds
+        self._segments: Deque[List[Any]] = deque()
+        self._observed = 0.0
+        self._active = 0.0
+
+    def add(self, start: float, end: float, active: bool) -> None:
+        """Add an observed segment that ends at or after the previous one."""
+        if end <= start:
+            return
+        if self._segments:
+            last = self._segments[-1]
+            if last[2] == active and last[1] == start:
+                last[1] = end
+                self._count(end - start, active)
+                return
+        self._segments.append([start, end, active])
+        self._count(end - start, active)
+
+    def _count(self, seconds: float, active: bool) -> None:
+        """Adjust the running sums."""
+        self._observed += seconds
+        if active:
+            self._active += seconds
+
+    def totals(self, now: float) -> Tuple[float, float]:
+        """Return the active and the observed seconds in the window ending at ``now``."""
+        horizon = now - self.window
+        while self._segments and self._segments[0][1] <= horizon:
+            start, end, active = self._segments.popleft()
+            self._count(start - end, active)
+        if not self._segments:
+            # Drop rounding residue of the running sums
+            self._observed = self._active = 0.0
+            return 0.0, 0.0
+        start, _end, active = self._segments[0]
+        # The oldest segment may start before the window
+        clipped = max(0.0, horizon - start)
+        return max(0.0, self._active - (clipped if active else 0.0)), max(0.0, self._observed - clipped)
+
+    def segments(self) -> List[List[Any]]:
+        """Return a copy of the segments in the window."""
+        return [list(segment) for segment in self._segments]
+
+
+class WarningExposure:
+    """Sliding-window shares of time under warning for every area.
+
+    Each successful update credits the time since the previous one to the
+    statuses shown during it; gaps longer than ``EXPOSURE_MAX_GAP``, e.g.
+    while Home Assistant was stopped, count as not observed. Shares are of
+    the observed time. The segments of the longest window are stored, so
+    the shares survive restarts without querying recorder history.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        key: str,
+        windows: Mapping[str, float] = EXPOSURE_WINDOWS,
+        max_gap: float = EXPOSURE_MAX_GAP,
+    ) -> None:
+        """Initialize without any observations."""
+        self.windows = dict(windows)
+        self.max_gap = max_gap
+        self._store: Store = Store(hass, EXPOSURE_STORAGE_VERSION, key)
+        self._shares: Dict[str, Dict[str, SlidingShare]] = {
+            area: {name: SlidingShare(seconds) for name, seconds in self.windows.items()} for area in AREAS
+        }
+        self._longest = max(self.windows, key=self.windows.__getitem__)
+        self.last_observed: Optional[float] = None
+        self._last_active: Dict[str, bool] = {}
+
+    async def async_load(self) -> None:
+        """Restore the stored segments."""
+        stored = await self._store.async_load()
+        if not stored:
+            return
+        for area, segments in stored.get("segments", {}).items():
+            if area not in self._shares:
+                continue
+            for start, end, active in segments:
+                for share in self._shares[area].values():
+                    share.add(start, end, active)
+        self.last_observed = stored.get("last_observed")
+        self._last_active = {
+            area: active for area, active in stored.get("last_active", {}).items() if area in self._shares
+        }
+        _LOGGER.debug("Restored warning exposure observed until %s", self.last_observed)
+
+    @callback
+    def async_observe(self, now: float, statuses: Mapping[str, str]) -> None:
+        """Credit the time since the last update and record the statuses shown from now on."""
+        if self.last_observed is not None:
+            elapsed = now - self.last_observed
+            if 0 < elapsed <= self.max_gap:
+                for area, active in self._last_active.items():
+                    for share in self._shares[area].values():
+                        share.add(self.last_observed, now, active)
+            elif elapsed > self.max_gap:
+                _LOGGER.debug("Not counting %.0fs without updates towards warning exposure", elapsed)
+        self.last_observed = now
+        self._last_active = {area: statuses.get(area) in WARNING_STATUSES for area in AREAS}
+        self._store.async_delay_save(self._data_to_save, EXPOSURE_SAVE_DELAY)
+
+    def share(self, area: str, window: str) -> Optional[float]:
+        """Return the share of observed time under warning, up to the last update."""
+        if self.last_observed is None:
+            return None
+        active, observed = self._shares[area][window].totals(self.last_observed)
+        if observed <= 0:
+            return None
+        return min(1.0, active / observed)
+
+    def observed(self, area: str, window: str) -> float:
+        """Return the observed seconds of a window, up to the last update."""
+        if self.last_observed is None:
+            return 0.0
+        return self._shares[area][window].totals(self.last_observed)[1]
+
+    def _data_to_save(self) -> Dict[str, Any]:
+        """Return the segments of the longest window for storage."""
+        if self.last_observed is not None:
+            for shares in self._shares.values():
+                # Do not store segments that already left the window
+                shares[self._longest].totals(self.last_observed)
+        return {
+            "last_observed": self.last_observed,
+            "last_active": self._last_active,
+            "segments": {area: shares[self._longest].segments() for area, shares in self._shares.items()},
+        }
+
+    async def async_save(self) -> None:
+        """Store the segments now, e.g. before the entry unloads."""
+        await self._store.async_save(self._data_to_save())
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the shares for diagnostics."""
+        return {
+            area: {
+                window: {"share": self.share(area, window), "observed": self.observed(area, window)}
+                for window in self.windows
+            }
+            for area in AREAS
+        }
+
+
+async def async_remove_exposure(hass: HomeAssistant, key: str) -> None:
+    """Remove the stored segments of a removed config entry."""
+    await Store(hass, EXPOSURE_STORAGE_VERSION, key).async_remove()
@@ -0,0 +1,276 @@
+"""Read status payloads that a relay drops into a directory.
+
+Sites that cannot reach the API run a relay that writes the JSON returned
+by ``get-latest-status`` into a shared directory. The directory is watched
+with inotify where available and scanned for newer files otherwise, and
+every new file is fed into the coordinator as soon as it lands.
+"""
+import asyncio
+import ctypes
+import errno
+import logging
+import os
+import struct
+import sys
+from datetime import timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+
+from .api import ApiConnectionError, ApiRequest, ApiResponseError, RawResponse
+from .const import DEFAULT_MAX_BODY_SIZE, DOMAIN, DROP_POLL_INTERVAL
+
+_LOGGER = logging.getLogger(__name__)
+
+# Flags and event layout from inotify(7)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+_EVENT_HEADER = struct.Struct("iIII")
+# Large enough for many events, and always for one with the longest file name
+_EVENT_BUFFER_SIZE = 16384
+
+DROP_FILE_SUFFIX = ".json"
+
+# Drop files are ordered by modification time, then name
+DropKey = Tuple[int, str]
+
+
+def is_drop_file(name: str) -> bool:
+    """Return if a file name is a status payload, not a hidden or partial file."""
+    return name.endswith(DROP_FILE_SUFFIX) and not name.startswith(".")
+
+
+def _open_inotify(directory: str) -> int:
+    """Return a non-blocking inotify descriptor watching for finished files.
+
+    Runs in the executor. Raises OSError where inotify is not available.
+    """
+    if not sys.platform.startswith("linux"):
+        raise OSError(errno.ENOSYS, "inotify is only available on Linux")
+    # Symbols of the libc the interpreter is already linked against
+    libc = ctypes.CDLL(None, use_errno=True)
+    if not hasattr(libc, "inotify_init1"):
+        raise OSError(errno.ENOSYS, "libc has no inotify support")
+    descriptor = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+    if descriptor < 0:
+        code = ctypes.get_errno()
+        raise OSError(code, os.strerror(code))
+    if libc.inotify_add_watch(descriptor, os.fsencode(directory), IN_CLOSE_WRITE | IN_MOVED_TO) < 0:
+        code = ctypes.get_errno()
+        os.close(descriptor)
+        raise OSError(code, os.strerror(code), directory)
+    return descriptor
+
+
+class FileDropTransport:
+    """Serve the newest payload file of a drop directory as API responses.
+
+    Each file is read once; until a newer one lands, fetches serve the last
+    response again. Blocking file access runs in the executor.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, directory: str, max_body_size: int = DEFAULT_MAX_BODY_SIZE
+    ) -> None:
+        """Initialize without any file read."""
+        self.hass = hass
+        self.directory = directory
+        self.max_body_size = max_body_size
+        self.files_read = 0
+        self.last_file: Optional[str] = None
+        self._last_key: Optional[DropKey] = None
+        self._last_response: Optional[RawResponse] = None
+
+    def newest_file(self) -> Optional[DropKey]:
+        """Return the key of the newest drop file; runs in the executor."""
+        newest: Optional[DropKey] = None
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if not is_drop_file(entry.name) or not entry.is_file():
+                    continue
+                key = (entry.stat().st_mtime_ns, entry.name)
+                if newest is None or key > newest:
+                    newest = key
+        return newest
+
+    def has_new_file(self) -> bool:
+        """Return if a file newer than the last one read landed; runs in the executor."""
+        newest = self.newest_file()
+        return newest is not None and (self._last_key is None or newest > self._last_key)
+
+    def _read_new_file(self) -> Optional[Tuple[str, RawResponse]]:
+        """Read the newest drop file unless it was read before; runs in the executor."""
+        newest = self.newest_file()
+        if newest is None or (self._last_key is not None and newest <= self._last_key):
+            return None
+        name = newest[1]
+        with open(os.path.join(self.directory, name), "rb") as file:
+            body = file.read(self.max_body_size + 1)
+        # A rewritten file gets a new modification time and is read again
+        self._last_key = newest
+        if len(body) > self.max_body_size:
+            _LOGGER.error("Dropped file %s exceeds the limit of %s bytes", name, self.max_body_size)
+            raise ApiResponseError(f"Dropped file {name} exceeds {self.max_body_size} bytes")
+        return name, RawResponse(status=200, headers={"Content-Type": "application/json"}, body=body)
+
+    async def async_fetch(self, request: ApiRequest) -> RawResponse:
+        """Return the newest dropped payload, whatever was requested."""
+        try:
+            new_file = await self.hass.async_add_executor_job(self._read_new_file)
+        except OSError as err:
+            _LOGGER.error("Cannot read drop directory %s: %s", self.directory, err)
+            raise ApiConnectionError(f"Cannot read drop directory: {err}") from err
+        if new_file is not None:
+            self.last_file, self._last_response = new_file
+            self.files_read += 1
+            _LOGGER.debug("Read dropped file %s from %s", self.last_file, self.directory)
+        elif self._last_response is None:
+            raise ApiConnectionError(f"No status file in {self.directory} yet")
+        else:
+            _LOGGER.debug("No new file in %s, serving %s again", self.directory, self.last_file)
+        return self._last_response
+
+
+class FileDropWatcher:
+    """Refresh a coordinator as soon as a new file lands in the drop directory.
+
+    inotify reports files once they are closed after writing or moved into
+    place. Where it is not available, the directory is scanned every
+    ``DROP_POLL_INTERVAL`` seconds instead.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        transport: FileDropTransport,
+        refresh: Callable[[], Awaitable[None]],
+    ) -> None:
+        """Initialize the watcher; nothing is watched before it is started."""
+        self.hass = hass
+        self.transport = transport
+        self._refresh = refresh
+        self.mode: Optional[str] = None
+        self._descriptor: Optional[int] = None
+        self._unsub_poll: Optional[CALLBACK_TYPE] = None
+        self._pending = False
+        self._drain_task: Optional[asyncio.Task] = None
+        self._scan_failed = False
+
+    async def async_start(self) -> None:
+        """Start watching with inotify, falling back to scanning."""
+        directory = self.transport.directory
+        try:
+            self._descriptor = await self.hass.async_add_executor_job(_open_inotify, directory)
+        except OSError as err:
+            _LOGGER.info("Cannot watch %s with inotify (%s), scanning it every %ss", directory, err, DROP_POLL_INTERVAL)
+            self._async_start_polling()
+        else:
+            self.hass.loop.add_reader(self._descriptor, self._async_read_events)
+            self.mode = "inotify"
+            _LOGGER.debug("Watching %s with inotify", directory)
+        # Files may have landed since the first refresh
+        self._async_changed()
+
+    @callback
+    def _async_start_polling(self) -> None:
+        """Scan the directory at a fixed interval."""
+        self.mode = "polling"
+        self._unsub_poll = async_track_time_interval(
+            self.hass, self._async_poll, timedelta(seconds=DROP_POLL_INTERVAL), name=f"{DOMAIN} drop scan"
+        )
+
+    @callback
+    def _async_close_inotify(self) -> None:
+        """Stop reading and close the inotify descriptor."""
+        if self._descriptor is None:
+            return
+        self.hass.loop.remove_reader(self._descriptor)
+        os.close(self._descriptor)
+        self._descriptor = None
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop watching the directory."""
+        self._async_close_inotify()
+        if self._unsub_poll is not None:
+            self._unsub_poll()
+            self._unsub_poll = None
+        if self._drain_task is not None:
+            self._drain_task.cancel()
+            self._drain_task = None
+        self._pending = False
+        _LOGGER.debug("Stopped watching %s", self.transport.directory)
+
+    @callback
+    def _async_read_events(self) -> None:
+        """Read pending inotify events and refresh if a drop file finished."""
+        try:
+            data = os.read(self._descriptor, _EVENT_BUFFER_SIZE)
+        except BlockingIOError:
+            return
+        except OSError as err:
+            _LOGGER.warning("Reading inotify events for %s failed (%s), scanning instead", self.transport.directory, err)
+            self._async_close_inotify()
+            self._async_start_polling()
+            return
+        changed = False
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            _watch, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+            if mask & IN_IGNORED:
+                # The directory was removed or unmounted
+                _LOGGER.warning("Watch on %s was removed, scanning instead", self.transport.directory)
+                self._async_close_inotify()
+                self._async_start_polling()
+                changed = True
+                break
+            if mask & IN_Q_OVERFLOW or is_drop_file(name):
+                changed = True
+        if changed:
+            self._async_changed()
+
+    @callback
+    def _async_poll(self, _now: Any) -> None:
+        """Check the directory on a scan interval."""
+        self._async_changed()
+
+    @callback
+    def _async_changed(self) -> None:
+        """Check for a new file, coalescing changes while a refresh runs."""
+        self._pending = True
+        if self._drain_task is None or self._drain_task.done():
+            self._drain_task = self.hass.async_create_task(
+                self._async_drain(), f"{DOMAIN} read drop directory"
+            )
+
+    async def _async_drain(self) -> None:
+        """Refresh until no change arrived during the last refresh."""
+        while self._pending:
+            self._pending = False
+            try:
+                new_file = await self.hass.async_add_executor_job(self.transport.has_new_file)
+            except OSError as err:
+                if not self._scan_failed:
+                    _LOGGER.warning("Cannot scan drop directory %s: %s", self.transport.directory, err)
+                self._scan_failed = True
+                continue
+            if self._scan_failed:
+                _LOGGER.info("Drop directory %s can be scanned again", self.transport.directory)
+                self._scan_failed = False
+            if new_file:
+                await self._refresh()
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the watcher state for diagnostics."""
+        return {
+            "directory": self.transport.directory,
+            "mode": self.mode,
+            "files_read": self.transport.files_read,
+            "last_file": self.transport.last_file,
+        }
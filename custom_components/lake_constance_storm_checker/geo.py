@@ -0,0 +1,160 @@
+"""Map GPS positions on Lake Constance to warning areas."""
+import logging
+import math
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+_LOGGER = logging.getLogger(__name__)
+
+Point = Tuple[float, float]  # (longitude, latitude)
+Polygon = Sequence[Point]
+
+# Coarse outlines of the three warning areas. Neighbouring areas share
+# their border vertices, so no point lies in two areas. The outlines enclose
+# the lake's water, including the Swiss shore, Rorschach bay and the Zeller
+# See, and also cover shoreline towns and some land next to the lake. They
+# are not exact: callers must not treat a position outside all outlines as
+# safe water.
+AREA_POLYGONS: Dict[str, Tuple[Point, ...]] = {
+    # Untersee with the Zeller See, Überlinger See and the Konstanz bay
+    "west": (
+        (8.840, 47.640), (8.860, 47.690), (8.940, 47.750), (8.990, 47.760), (9.020, 47.770),
+        (9.110, 47.810), (9.170, 47.830), (9.220, 47.760), (9.250, 47.720),
+        (9.290, 47.660), (9.200, 47.640), (9.100, 47.640), (8.980, 47.630),
+    ),
+    # Obersee between Meersburg/Konstanz and Langenargen, with the Swiss shore
+    # from Kreuzlingen over Romanshorn and Arbon to Rorschach bay
+    "center": (
+        (9.290, 47.660), (9.250, 47.720), (9.350, 47.690), (9.450, 47.660),
+        (9.520, 47.640), (9.520, 47.475), (9.480, 47.472), (9.430, 47.505),
+        (9.370, 47.555), (9.280, 47.605), (9.200, 47.640),
+    ),
+    # Eastern Obersee with the Bregenz and Rhine delta area
+    "east": (
+        (9.520, 47.640), (9.600, 47.600), (9.690, 47.560), (9.770, 47.520),
+        (9.740, 47.475), (9.640, 47.465), (9.560, 47.465), (9.520, 47.475),
+    ),
+}
+
+DEFAULT_CELL_SIZE = 0.005  # degrees, roughly 400 m x 550 m on the lake
+
+
+def point_in_polygon(point: Point, polygon: Polygon) -> bool:
+    """Return if a point lies inside a polygon (even-odd rule)."""
+    x, y = point
+    inside = False
+    x1, y1 = polygon[-1]
+    for x2, y2 in polygon:
+        if (y1 > y) != (y2 > y) and x < (x2 - x1) * (y - y1) / (y2 - y1) + x1:
+            inside = not inside
+        x1, y1 = x2, y2
+    return inside
+
+
+def _segment_hits_box(
+    start: Point, end: Point, min_x: float, min_y: float, max_x: float, max_y: float
+) -> bool:
+    """Return if a segment intersects an axis-aligned box (Liang-Barsky clipping)."""
+    (x1, y1), (x2, y2) = start, end
+    dx, dy = x2 - x1, y2 - y1
+    low, high = 0.0, 1.0
+    for p, q in ((-dx, x1 - min_x), (dx, max_x - x1), (-dy, y1 - min_y), (dy, max_y - y1)):
+        if p == 0:
+            if q < 0:
+                return False
+            continue
+        ratio = q / p
+        if p < 0:
+            low = max(low, ratio)
+        else:
+            high = min(high, ratio)
+        if low > high:
+            return False
+    return True
+
+
+Cell = Union[None, str, Tuple[str, ...]]
+
+
+class AreaIndex:
+    """Uniform grid over the area polygons for O(1) point lookups.
+
+    Each cell is precomputed as empty, fully inside one area, or crossed by
+    area borders. Only points in border cells need point-in-polygon tests,
+    and only against the few areas touching that cell.
+    """
+
+    def __init__(
+        self,
+        polygons: Dict[str, Tuple[Point, ...]] = AREA_POLYGONS,
+        cell_size: float = DEFAULT_CELL_SIZE,
+    ) -> None:
+        """Build the grid."""
+        self.polygons = polygons
+        self.cell_size = cell_size
+        xs = [x for polygon in polygons.values() for x, _ in polygon]
+        ys = [y for polygon in polygons.values() for _, y in polygon]
+        self.min_x, self.min_y = min(xs), min(ys)
+        self._bounds = {
+            area: (min(x for x, _ in polygon), min(y for _, y in polygon),
+                   max(x for x, _ in polygon), max(y for _, y in polygon))
+            for area, polygon in polygons.items()
+        }
+        self.columns = math.ceil((max(xs) - self.min_x) / cell_size) or 1
+        self.rows = math.ceil((max(ys) - self.min_y) / cell_size) or 1
+        self.cells: List[Cell] = [
+            self._classify(column, row) for row in range(self.rows) for column in range(self.columns)
+        ]
+        _LOGGER.debug(
+            "Built area index with %dx%d cells, %d on borders",
+            self.columns, self.rows, sum(isinstance(cell, tuple) for cell in self.cells),
+        )
+
+    def _classify(self, column: int, row: int) -> Cell:
+        """Return the precomputed content of one cell."""
+        min_x = self.min_x + column * self.cell_size
+        min_y = self.min_y + row * self.cell_size
+        max_x, max_y = min_x + self.cell_size, min_y + self.cell_size
+        center = (min_x + self.cell_size / 2, min_y + self.cell_size / 2)
+
+        crossing = []
+        for area, polygon in self.polygons.items():
+            bounds = self._bounds[area]
+            if bounds[0] > max_x or bounds[2] < min_x or bounds[1] > max_y or bounds[3] < min_y:
+                continue
+            edges = zip(polygon, polygon[1:] + polygon[:1])
+            if any(_segment_hits_box(a, b, min_x, min_y, max_x, max_y) for a, b in edges):
+                crossing.append(area)
+        if crossing:
+            return tuple(crossing)
+        # No border crosses the cell, so it lies entirely inside one area or none
+        for area, polygon in self.polygons.items():
+            if point_in_polygon(center, polygon):
+                return area
+        return None
+
+    def lookup(self, latitude: float, longitude: float) -> Optional[str]:
+        """Return the warning area containing a position, if any."""
+        if not (math.isfinite(latitude) and math.isfinite(longitude)):
+            return None
+        column = int((longitude - self.min_x) // self.cell_size)
+        row = int((latitude - self.min_y) // self.cell_size)
+        if not (0 <= column < self.columns and 0 <= row < self.rows):
+            return None
+        cell = self.cells[row * self.columns + column]
+        if not isinstance(cell, tuple):
+            return cell
+        point = (longitude, latitude)
+        for area in cell:
+            if point_in_polygon(point, self.polygons[area]):
+                return area
+        return None
+
+
+@lru_cache(maxsize=1)
+def get_area_index() -> AreaIndex:
+    """Return the process-wide index over the built-in area polygons.
+
+    Building takes a moment; call it from an executor the first time.
+    """
+    return AreaIndex()
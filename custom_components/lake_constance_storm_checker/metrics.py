@@ -0,0 +1,161 @@
+"""In-memory fetch and state write metrics in the Prometheus text format.
+
+Every value is aggregated when it is observed, so rendering costs
+O(number of metrics) regardless of how long the integration has run.
+"""
+from bisect import bisect_left
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+from .snapshot import STATUS_SEVERITY
+
+METRIC_PREFIX = "lake_constance"
+
+# Upper bounds in seconds; +Inf is implied
+LATENCY_BUCKETS: Tuple[float, ...] = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DECODE_BUCKETS: Tuple[float, ...] = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.05)
+
+
+class Histogram:
+    """Fixed-bucket histogram."""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float]) -> None:
+        """Initialize with empty buckets."""
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        """Count one observation."""
+        index = bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """Return ``(le, count)`` pairs with cumulative counts, ending at +Inf."""
+        pairs = []
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            pairs.append((repr(bound), total))
+        pairs.append(("+Inf", self.count))
+        return pairs
+
+
+class CoordinatorMetrics:
+    """Fetch and state write counters of one coordinator."""
+
+    def __init__(self) -> None:
+        """Initialize all counters at zero."""
+        # HTTP status code, or the kind of error when no response arrived
+        self.requests: Counter = Counter()
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.decode = Histogram(DECODE_BUCKETS)
+        self.state_writes = 0
+        self.skipped_writes = 0
+        self.quarantined = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the counters for diagnostics."""
+        return {
+            "requests": dict(self.requests),
+            "requests_total": sum(self.requests.values()),
+            "latency_seconds_sum": self.latency.sum,
+            "decode_seconds_sum": self.decode.sum,
+            "state_writes": self.state_writes,
+            "skipped_writes": self.skipped_writes,
+            "quarantined": self.quarantined,
+        }
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    """Format a label set."""
+    escaped = (
+        (name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in labels.items()
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+def render_metrics(coordinators: Iterable[Any]) -> str:
+    """Render the metrics of all coordinators in the text exposition format."""
+    families: Dict[str, Tuple[str, str, List[str]]] = {}
+
+    def add(name: str, kind: str, help_text: str, line: str) -> None:
+        families.setdefault(name, (kind, help_text, []))[2].append(line)
+
+    def add_histogram(name: str, help_text: str, histogram: Histogram, labels: Dict[str, str]) -> None:
+        for bound, count in histogram.cumulative():
+            add(name, "histogram", help_text, f"{name}_bucket{_labels({**labels, 'le': bound})} {count}")
+        add(name, "histogram", help_text, f"{name}_sum{_labels(labels)} {histogram.sum!r}")
+        add(name, "histogram", help_text, f"{name}_count{_labels(labels)} {histogram.count}")
+
+    for coordinator in coordinators:
+        metrics: CoordinatorMetrics = coordinator.metrics
+        labels = {"entry_id": coordinator.config_entry.entry_id, "partition": coordinator.partition_key}
+        for status, count in sorted(metrics.requests.items()):
+            add(
+                f"{METRIC_PREFIX}_requests_total",
+                "counter",
+                "Status requests by HTTP status or error kind.",
+                f"{METRIC_PREFIX}_requests_total{_labels({**labels, 'status': status})} {count}",
+            )
+        add_histogram(
+            f"{METRIC_PREFIX}_request_duration_seconds",
+            "Duration of status requests.",
+            metrics.latency,
+            labels,
+        )
+        add_histogram(
+            f"{METRIC_PREFIX}_decode_duration_seconds",
+            "Time spent decoding successful responses.",
+            metrics.decode,
+            labels,
+        )
+        add(
+            f"{METRIC_PREFIX}_state_writes_total",
+            "counter",
+            "Entity state writes after coordinator updates.",
+            f"{METRIC_PREFIX}_state_writes_total{_labels(labels)} {metrics.state_writes}",
+        )
+        add(
+            f"{METRIC_PREFIX}_skipped_writes_total",
+            "counter",
+            "Entity state writes skipped because nothing changed.",
+            f"{METRIC_PREFIX}_skipped_writes_total{_labels(labels)} {metrics.skipped_writes}",
+        )
+        add(
+            f"{METRIC_PREFIX}_quarantined_payloads_total",
+            "counter",
+            "Malformed payloads kept out of entity states.",
+            f"{METRIC_PREFIX}_quarantined_payloads_total{_labels(labels)} {metrics.quarantined}",
+        )
+        add(
+            f"{METRIC_PREFIX}_last_update_success",
+            "gauge",
+            "Whether the last update succeeded.",
+            f"{METRIC_PREFIX}_last_update_success{_labels(labels)} {int(coordinator.last_update_success)}",
+        )
+        snapshot = coordinator.snapshot
+        if snapshot is not None:
+            for area in coordinator.areas:
+                status = snapshot.statuses[area]
+                add(
+                    f"{METRIC_PREFIX}_area_warning_level",
+                    "gauge",
+                    "Current warning level per area: 0 none, 1 strong wind, 2 storm, -1 unknown.",
+                    f"{METRIC_PREFIX}_area_warning_level{_labels({**labels, 'area': area})} "
+                    f"{STATUS_SEVERITY.get(status, -1)}",
+                )
+
+    lines = []
+    for name, (kind, help_text, samples) in families.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.extend(samples)
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,299 @@
+"""Probability of an upcoming storm warning from observed status transitions.
+
+Imports NumPy, so it is only loaded when the nowcast is enabled.
+"""
+import asyncio
+import copy
+import logging
+import math
+from collections import deque
+from functools import reduce
+from typing import Any, Callable, Deque, Dict, Iterable, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    AREAS,
+    NOWCAST_HISTORY_STEPS,
+    NOWCAST_MAX_GAP,
+    NOWCAST_MIN_TRANSITIONS,
+    NOWCAST_PERSISTENCE,
+    NOWCAST_SAVE_DELAY,
+    NOWCAST_SHRINKAGE,
+    NOWCAST_STEP,
+    NOWCAST_STORAGE_VERSION,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Warning levels of the chain, lowest first; other statuses are not observed
+LEVELS = ("noWarning", "StrongWindWarning", "StormWarning")
+STORM_LEVEL = LEVELS.index("StormWarning")
+_LEVEL_INDEX = {status: index for index, status in enumerate(LEVELS)}
+# Step of the timeline without a usable status, e.g. after a gap
+UNOBSERVED = -1
+
+
+def encode(statuses: Mapping[str, str], areas: Sequence[str] = AREAS) -> int:
+    """Return the joint state of the areas, or UNOBSERVED if any status is not a level."""
+    state = 0
+    for area in areas:
+        level = _LEVEL_INDEX.get(statuses.get(area))
+        if level is None:
+            return UNOBSERVED
+        state = state * len(LEVELS) + level
+    return state
+
+
+class TransitionModel:
+    """Markov chain over the joint warning levels of all areas.
+
+    The timeline is a bounded history of joint states sampled once per step.
+    Transition counts between consecutive samples are kept in a matrix that
+    is adjusted as steps are added and old ones fall out of the history;
+    only loading a stored history counts all of it, vectorized. Sparse rows
+    of the joint matrix are shrunk towards the product of the per-area
+    chains, which are projected from the same counts.
+    """
+
+    def __init__(
+        self,
+        areas: int = len(AREAS),
+        capacity: int = NOWCAST_HISTORY_STEPS,
+        shrinkage: float = NOWCAST_SHRINKAGE,
+        persistence: float = NOWCAST_PERSISTENCE,
+    ) -> None:
+        """Initialize an empty history."""
+        self.areas = areas
+        self.shrinkage = shrinkage
+        self.persistence = persistence
+        self.states = len(LEVELS) ** areas
+        self._steps: Deque[int] = deque(maxlen=capacity)
+        self.counts = np.zeros((self.states, self.states), dtype=np.int64)
+        # Level of every area in every joint state, most significant area first
+        powers = len(LEVELS) ** np.arange(areas - 1, -1, -1)
+        self._digits = (np.arange(self.states)[:, None] // powers) % len(LEVELS)
+        # One-hot projection of joint states to the levels of each area
+        self._projections = (self._digits[:, :, None] == np.arange(len(LEVELS))).astype(float)
+        self._storm = self._digits == STORM_LEVEL
+        self._version = 0
+        self._matrix_version = -1
+        self._matrix: Optional[np.ndarray] = None
+
+    @property
+    def transitions(self) -> int:
+        """Return the number of observed transitions in the history."""
+        return int(self.counts.sum())
+
+    def load(self, steps: Sequence[int]) -> None:
+        """Replace the history and count all of its transitions at once."""
+        self._steps.clear()
+        self._steps.extend(steps)
+        history = np.fromiter(self._steps, dtype=np.int64, count=len(self._steps))
+        self.counts[:] = 0
+        if len(history) > 1:
+            before, after = history[:-1], history[1:]
+            observed = (before != UNOBSERVED) & (after != UNOBSERVED)
+            np.add.at(self.counts, (before[observed], after[observed]), 1)
+        self._version += 1
+
+    def extend(self, steps: Iterable[int]) -> None:
+        """Append sampled steps, adjusting the counts of added and dropped transitions."""
+        for state in steps:
+            if len(self._steps) == self._steps.maxlen:
+                # The oldest transition falls out of the history
+                dropped, following = self._steps[0], self._steps[1]
+                if dropped != UNOBSERVED and following != UNOBSERVED:
+                    self.counts[dropped, following] -= 1
+            if self._steps and self._steps[-1] != UNOBSERVED and state != UNOBSERVED:
+                self.counts[self._steps[-1], state] += 1
+            self._steps.append(state)
+        self._version += 1
+
+    def frozen(self) -> "TransitionModel":
+        """Return a copy of the counts to compute with off the event loop, without the history."""
+        clone = copy.copy(self)
+        clone.counts = self.counts.copy()
+        clone._steps = deque(maxlen=self._steps.maxlen)
+        return clone
+
+    def runs(self) -> List[List[int]]:
+        """Return the history as [state, length] runs for storage."""
+        if not self._steps:
+            return []
+        history = np.fromiter(self._steps, dtype=np.int64, count=len(self._steps))
+        starts = np.flatnonzero(np.diff(history, prepend=history[0] - 1))
+        lengths = np.diff(np.append(starts, len(history)))
+        return [[int(state), int(length)] for state, length in zip(history[starts], lengths)]
+
+    def area_matrices(self) -> np.ndarray:
+        """Return the transition matrix of each area on its own, stacked."""
+        counts = np.einsum("sai,st,taj->aij", self._projections, self.counts, self._projections)
+        counts += self.persistence * np.eye(len(LEVELS))
+        return counts / counts.sum(axis=2, keepdims=True)
+
+    def transition_matrix(self) -> np.ndarray:
+        """Return the joint transition matrix, recomputed only after the history changed."""
+        if self._matrix_version != self._version:
+            independent = reduce(np.kron, self.area_matrices())
+            rows = self.counts.sum(axis=1, keepdims=True)
+            self._matrix = (self.counts + self.shrinkage * independent) / (rows + self.shrinkage)
+            self._matrix_version = self._version
+        return self._matrix
+
+    def storm_probabilities(self, state: int, steps: int) -> np.ndarray:
+        """Return for each area the probability of a storm warning within ``steps`` steps."""
+        matrix = self.transition_matrix()
+        # One chain per area in which its storm states are absorbing
+        absorbing = np.where(self._storm.T[:, :, None], np.eye(self.states), matrix)
+        reached = np.linalg.matrix_power(absorbing, steps)[:, state, :]
+        return (reached * self._storm.T).sum(axis=1)
+
+
+class WarningNowcast:
+    """Probability of a storm warning within a horizon, for every area.
+
+    The statuses shown are sampled at every ``NOWCAST_STEP`` boundary; gaps
+    longer than ``NOWCAST_MAX_GAP`` break the timeline. Probabilities are
+    computed for all areas at once in the executor, from a copy of the
+    counts and the current joint state; updates arriving while that runs
+    are batched into one more run. ``on_change`` is called on the event
+    loop with new probabilities. The sampled history is stored across
+    restarts.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        key: str,
+        horizon: int,
+        step: float = NOWCAST_STEP,
+        max_gap: float = NOWCAST_MAX_GAP,
+        min_transitions: int = NOWCAST_MIN_TRANSITIONS,
+        on_change: Optional[Callable[[], None]] = None,
+    ) -> None:
+        """Initialize with a horizon in minutes."""
+        self.hass = hass
+        self.on_change = on_change
+        self.horizon = horizon
+        self.step = step
+        self.max_gap = max_gap
+        self.min_transitions = min_transitions
+        self.steps = max(1, math.ceil(horizon * 60 / step))
+        self.model = TransitionModel()
+        self._store: Store = Store(hass, NOWCAST_STORAGE_VERSION, key)
+        self.last_observed: Optional[float] = None
+        self._last_state = UNOBSERVED
+        self._probabilities: Optional[Dict[str, float]] = None
+        self._recompute: Optional["asyncio.Future[np.ndarray]"] = None
+        self._recompute_pending = False
+
+    async def async_load(self) -> None:
+        """Restore the stored history; its transitions are counted in the executor."""
+        stored = await self._store.async_load()
+        if not stored:
+            return
+        steps = [state for state, length in stored.get("steps", []) for _ in range(length)]
+        await self.hass.async_add_executor_job(self.model.load, steps)
+        self.last_observed = stored.get("last_observed")
+        self._last_state = stored.get("last_state", UNOBSERVED)
+        _LOGGER.debug(
+            "Restored %d nowcast steps with %d transitions", len(steps), self.model.transitions
+        )
+
+    @property
+    def ready(self) -> bool:
+        """Return if the current state and the history allow an estimate."""
+        return self._last_state != UNOBSERVED and self.model.transitions >= self.min_transitions
+
+    @callback
+    def async_observe(self, now: float, statuses: Mapping[str, str]) -> None:
+        """Sample the statuses shown since the last update and schedule a recompute."""
+        state = encode(statuses)
+        if self.last_observed is not None:
+            if now - self.last_observed > self.max_gap:
+                _LOGGER.debug("Breaking the nowcast timeline after %.0fs without updates", now - self.last_observed)
+                self.model.extend([UNOBSERVED])
+            else:
+                # Every step boundary since the last update still showed its statuses
+                crossed = int(now // self.step) - int(self.last_observed // self.step)
+                if crossed > 0:
+                    self.model.extend([self._last_state] * crossed)
+        self.last_observed = now
+        self._last_state = state
+        self._store.async_delay_save(self._data_to_save, NOWCAST_SAVE_DELAY)
+        if not self.ready:
+            self._probabilities = None
+            return
+        self._async_schedule_recompute()
+
+    @callback
+    def _async_schedule_recompute(self) -> None:
+        """Recompute in the executor, or batch into the next run if one is in flight."""
+        if self._recompute is not None:
+            self._recompute_pending = True
+            return
+        self._recompute = self.hass.async_add_executor_job(
+            self.model.frozen().storm_probabilities, self._last_state, self.steps
+        )
+        self._recompute.add_done_callback(self._async_recomputed)
+
+    @callback
+    def _async_recomputed(self, future: "asyncio.Future[np.ndarray]") -> None:
+        """Publish the probabilities of a finished run and start the batched one, if any."""
+        self._recompute = None
+        if future.cancelled():
+            return
+        if (err := future.exception()) is not None:
+            _LOGGER.error("Nowcast recompute failed: %s", err)
+            return
+        if self.ready:
+            probabilities = future.result()
+            self._probabilities = {area: float(probabilities[index]) for index, area in enumerate(AREAS)}
+            if self.on_change is not None:
+                self.on_change()
+        if self._recompute_pending:
+            # Updates that arrived meanwhile are computed in one more run
+            self._recompute_pending = False
+            if self.ready:
+                self._async_schedule_recompute()
+
+    @callback
+    def async_stop(self) -> None:
+        """Drop a recompute in flight, e.g. when the entry unloads."""
+        self._recompute_pending = False
+        if self._recompute is not None:
+            self._recompute.cancel()
+            self._recompute = None
+
+    def probability(self, area: str) -> Optional[float]:
+        """Return the probability of a storm warning within the horizon, if known."""
+        if self._probabilities is None:
+            return None
+        return self._probabilities[area]
+
+    def _data_to_save(self) -> Dict[str, Any]:
+        """Return the sampled history for storage."""
+        return {
+            "last_observed": self.last_observed,
+            "last_state": self._last_state,
+            "steps": self.model.runs(),
+        }
+
+    async def async_save(self) -> None:
+        """Store the history now, e.g. before the entry unloads."""
+        await self._store.async_save(self._data_to_save())
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the model for diagnostics."""
+        matrices = self.model.area_matrices()
+        return {
+            "horizon_minutes": self.horizon,
+            "transitions": self.model.transitions,
+            "probabilities": self._probabilities,
+            "area_matrices": {area: np.round(matrices[index], 4).tolist() for index, area in enumerate(AREAS)},
+        }
+
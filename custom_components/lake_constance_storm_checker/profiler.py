@@ -0,0 +1,233 @@
+"""Sampling profiler for the integration's code on the event loop."""
+import asyncio
+import logging
+import marshal
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from types import CodeType
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+
+from .const import DOMAIN, PROFILE_TOP_FUNCTIONS
+
+_LOGGER = logging.getLogger(__name__)
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+FORMAT_COLLAPSED = "collapsed"
+FORMAT_PSTATS = "pstats"
+FORMATS = (FORMAT_COLLAPSED, FORMAT_PSTATS)
+
+# (file name, first line, function name), as in pstats
+FunctionKey = Tuple[str, int, str]
+
+
+class StackSampler:
+    """Count the stacks of one thread that run through a package.
+
+    ``run`` blocks until ``stopped`` is set and belongs in its own thread.
+    Each sample reads the current stack of the sampled thread; stacks
+    without a frame from the package directory are only counted as samples.
+    """
+
+    def __init__(self, thread_id: int, interval: float, root: str = PACKAGE_DIR) -> None:
+        """Initialize for a thread and an interval in seconds."""
+        self.thread_id = thread_id
+        self.interval = interval
+        self.root = root
+        self.samples = 0
+        # Code objects of the sampled stacks, outermost first
+        self.stacks: Counter = Counter()
+        self.stopped = threading.Event()
+        self._in_root: Dict[CodeType, bool] = {}
+
+    def sample(self) -> None:
+        """Take one sample of the thread's stack."""
+        frame = sys._current_frames().get(self.thread_id)  # pylint: disable=protected-access
+        if frame is None:
+            return
+        self.samples += 1
+        stack: List[CodeType] = []
+        in_root = False
+        while frame is not None:
+            code = frame.f_code
+            ours = self._in_root.get(code)
+            if ours is None:
+                ours = self._in_root[code] = code.co_filename.startswith(self.root)
+            in_root = in_root or ours
+            stack.append(code)
+            frame = frame.f_back
+        if in_root:
+            stack.reverse()
+            self.stacks[tuple(stack)] += 1
+
+    def run(self) -> None:
+        """Sample until stopped."""
+        while not self.stopped.wait(self.interval):
+            self.sample()
+
+    @property
+    def root_samples(self) -> int:
+        """Return the number of samples that ran through the package."""
+        return sum(self.stacks.values())
+
+    def collapsed(self) -> List[str]:
+        """Return the stacks in the collapsed format of flame graph tools, most frequent first."""
+        return [
+            f"{';'.join(self._label(code) for code in stack)} {count}"
+            for stack, count in self.stacks.most_common()
+        ]
+
+    def pstats(self) -> Dict[FunctionKey, Tuple[int, int, float, float, Dict[FunctionKey, Tuple[int, int, float, float]]]]:
+        """Return the stacks as the statistics ``pstats.Stats`` loads.
+
+        Call counts are sample counts, and times are samples multiplied by
+        the interval: own time for the innermost function of a stack and
+        cumulative time for every function in it.
+        """
+        own: Counter = Counter()
+        cumulative: Counter = Counter()
+        callers: Dict[FunctionKey, Counter] = {}
+        for stack, count in self.stacks.items():
+            keys = [_function_key(code) for code in stack]
+            own[keys[-1]] += count
+            for key in set(keys):
+                cumulative[key] += count
+            for edge in set(zip(keys, keys[1:])):
+                callers.setdefault(edge[1], Counter())[edge[0]] += count
+        return {
+            key: (
+                samples,
+                samples,
+                own[key] * self.interval,
+                samples * self.interval,
+                {
+                    caller: (calls, calls, 0.0, calls * self.interval)
+                    for caller, calls in callers.get(key, Counter()).items()
+                },
+            )
+            for key, samples in cumulative.items()
+        }
+
+    def top_functions(self, count: int = PROFILE_TOP_FUNCTIONS) -> List[Dict[str, Any]]:
+        """Return the package functions found in most samples, with their share of all samples."""
+        functions: Counter = Counter()
+        for stack, samples in self.stacks.items():
+            for code in set(stack):
+                if self._in_root.get(code):
+                    functions[code] += samples
+        return [
+            {
+                "function": self._label(code),
+                "samples": samples,
+                "share": round(samples / self.samples, 4) if self.samples else 0.0,
+            }
+            for code, samples in functions.most_common(count)
+        ]
+
+    def _label(self, code: CodeType) -> str:
+        """Return a frame label without the separators of the collapsed format."""
+        if code.co_filename.startswith(self.root):
+            path = os.path.relpath(code.co_filename, os.path.dirname(self.root))
+        else:
+            path = os.path.join(
+                os.path.basename(os.path.dirname(code.co_filename)), os.path.basename(code.co_filename)
+            )
+        return f"{code.co_qualname} ({path}:{code.co_firstlineno})".replace(";", ",")
+
+
+def _function_key(code: CodeType) -> FunctionKey:
+    """Return the pstats key of a code object."""
+    return code.co_filename, code.co_firstlineno, code.co_name
+
+
+class IntegrationProfiler:
+    """Sample the event loop from a thread of its own and write the profile on stop.
+
+    Only stacks that run through the integration are kept, e.g. coordinator
+    updates, normalization and entity properties read while states are
+    written. Sampling and writing the profile never run on the event loop.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        path: str,
+        interval: float,
+        output_format: str,
+        on_hass_stop: Optional[Callable[[], None]] = None,
+    ) -> None:
+        """Initialize on the event loop, with the profile path and an interval in seconds.
+
+        ``on_hass_stop`` is called when Home Assistant stops while sampling,
+        so the owner can drop the profiler and its timers.
+        """
+        self.hass = hass
+        self.path = path
+        self.output_format = output_format
+        self.sampler = StackSampler(threading.get_ident(), interval)
+        self.started_at: Optional[float] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"{DOMAIN}_profiler")
+        self._running: Optional["asyncio.Future[None]"] = None
+        self._unsub_hass_stop: Optional[CALLBACK_TYPE] = None
+        self._on_hass_stop = on_hass_stop
+
+    @callback
+    def async_start(self) -> None:
+        """Start sampling the event loop thread."""
+        self.started_at = time.monotonic()
+        self._running = self.hass.loop.run_in_executor(self._executor, self.sampler.run)
+        self._unsub_hass_stop = self.hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, self._async_hass_stop)
+        _LOGGER.info(
+            "Profiling started, sampling every %.0f ms into %s", self.sampler.interval * 1000, self.path
+        )
+
+    async def async_stop(self) -> Dict[str, Any]:
+        """Stop sampling, write the profile and return a summary."""
+        if self._unsub_hass_stop is not None:
+            self._unsub_hass_stop()
+            self._unsub_hass_stop = None
+        self.sampler.stopped.set()
+        await self._running
+        duration = time.monotonic() - self.started_at
+        try:
+            top = await self.hass.loop.run_in_executor(self._executor, self._write)
+        finally:
+            self._executor.shutdown(wait=False)
+        _LOGGER.info(
+            "Profiling stopped after %.1fs: %d of %d samples ran through the integration, written to %s",
+            duration, self.sampler.root_samples, self.sampler.samples, self.path,
+        )
+        return {
+            "path": self.path,
+            "format": self.output_format,
+            "duration": round(duration, 3),
+            "samples": self.sampler.samples,
+            "integration_samples": self.sampler.root_samples,
+            "top": top,
+        }
+
+    def _write(self) -> List[Dict[str, Any]]:
+        """Write the profile and return the top functions; runs in the profiler's executor."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        if self.output_format == FORMAT_PSTATS:
+            with open(self.path, "wb") as file:
+                marshal.dump(self.sampler.pstats(), file)
+        else:
+            with open(self.path, "w", encoding="utf-8") as file:
+                file.writelines(f"{line}\n" for line in self.sampler.collapsed())
+        return self.sampler.top_functions()
+
+    @callback
+    def _async_hass_stop(self, _event: Event) -> None:
+        """Stop sampling without writing, so shutdown does not wait for the thread."""
+        self._unsub_hass_stop = None
+        self.sampler.stopped.set()
+        self._executor.shutdown(wait=False)
+        if self._on_hass_stop is not None:
+            self._on_hass_stop()
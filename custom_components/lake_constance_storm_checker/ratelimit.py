@@ -0,0 +1,183 @@
+"""Client-side rate limiting for the Lake Constance Storm Checker API."""
+import asyncio
+import logging
+import time
+from email.utils import parsedate_to_datetime
+from typing import TYPE_CHECKING, Any, Dict, Mapping, Optional
+
+from .const import DATA_RATE_LIMITERS
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_BURST = 20  # requests
+DEFAULT_RATE = 5.0  # requests per second
+DEFAULT_RETRY_AFTER = 60.0  # seconds, when a 429 carries no Retry-After
+DEFAULT_MAX_WAIT = 5.0  # seconds a caller may wait for a token
+# First refreshes queue for a token instead of failing, so a restart of
+# many entries sharing a base URL is paced rather than left not ready
+SETUP_MAX_WAIT = 120.0  # seconds
+
+
+class RateLimitedError(Exception):
+    """Error to indicate a request must not be sent yet."""
+
+    def __init__(self, retry_after: float) -> None:
+        """Initialize the error."""
+        super().__init__(f"Rate limited, retry in {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+def _header(headers: Mapping[str, str], *names: str) -> Optional[str]:
+    """Return the first present header of ``names``, case-insensitively."""
+    lowered = {key.lower(): value for key, value in headers.items()}
+    for name in names:
+        if (value := lowered.get(name.lower())) is not None:
+            return value
+    return None
+
+
+def parse_retry_after(value: Optional[str], now: float) -> Optional[float]:
+    """Parse a Retry-After header (delta seconds or HTTP date) into seconds."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - now)
+    except (TypeError, ValueError):
+        _LOGGER.debug("Unparsable Retry-After header: %s", value)
+        return None
+
+
+def parse_reset(value: Optional[str], now: float) -> Optional[float]:
+    """Parse a rate-limit reset header into seconds from now.
+
+    Values larger than a day are taken as epoch timestamps, smaller ones as
+    delta seconds, matching the common ``X-RateLimit-Reset`` variants.
+    """
+    if not value:
+        return None
+    try:
+        reset = float(value.strip())
+    except ValueError:
+        _LOGGER.debug("Unparsable rate-limit reset header: %s", value)
+        return None
+    if reset > 86400:
+        reset -= now
+    return max(0.0, reset)
+
+
+class TokenBucket:
+    """Token bucket that also honours server-side rate-limit signals.
+
+    Tokens refill continuously at ``rate`` up to ``burst``. A 429 response or
+    an exhausted ``RateLimit-Remaining`` pauses all requests until the
+    server's reset time.
+    """
+
+    def __init__(self, burst: int = DEFAULT_BURST, rate: float = DEFAULT_RATE) -> None:
+        """Initialize the bucket."""
+        self.burst = burst
+        self.rate = rate
+        self.tokens = float(burst)
+        self.updated = self._now()
+        self.blocked_until = 0.0
+        self.limit: Optional[int] = None
+        self.remaining: Optional[int] = None
+        self.throttled_requests = 0
+        self.rate_limited_responses = 0
+
+    @staticmethod
+    def _now() -> float:
+        """Return the current wall-clock time."""
+        return time.time()
+
+    def _refill(self, now: float) -> None:
+        """Add the tokens accrued since the last update."""
+        self.tokens = min(float(self.burst), self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self) -> float:
+        """Take a token and return how long to wait before using it.
+
+        Raises ``RateLimitedError`` while the server asked us to back off.
+        """
+        now = self._now()
+        if now < self.blocked_until:
+            self.throttled_requests += 1
+            raise RateLimitedError(self.blocked_until - now)
+        self._refill(now)
+        self.tokens -= 1
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.rate
+
+    async def async_acquire(self, max_wait: float = DEFAULT_MAX_WAIT) -> None:
+        """Wait for a token, failing fast if the wait would exceed ``max_wait``."""
+        wait = self.reserve()
+        if wait > max_wait:
+            # Give the token back; the caller will not send this request
+            self.tokens += 1
+            self.throttled_requests += 1
+            raise RateLimitedError(wait)
+        if wait > 0:
+            _LOGGER.debug("Rate limiter delaying request by %.2fs", wait)
+            await asyncio.sleep(wait)
+
+    def update_from_response(self, status: int, headers: Mapping[str, str]) -> None:
+        """Adjust the bucket from a response's status and rate-limit headers."""
+        now = self._now()
+
+        limit = _header(headers, "RateLimit-Limit", "X-RateLimit-Limit")
+        remaining = _header(headers, "RateLimit-Remaining", "X-RateLimit-Remaining")
+        reset = parse_reset(_header(headers, "RateLimit-Reset", "X-RateLimit-Reset"), now)
+        try:
+            self.limit = int(float(limit)) if limit is not None else self.limit
+            self.remaining = int(float(remaining)) if remaining is not None else self.remaining
+        except ValueError:
+            _LOGGER.debug("Unparsable rate-limit headers: limit=%s remaining=%s", limit, remaining)
+
+        if remaining is not None and self.remaining is not None:
+            self._refill(now)
+            self.tokens = min(self.tokens, float(self.remaining))
+            if self.remaining <= 0 and reset is not None:
+                self.blocked_until = max(self.blocked_until, now + reset)
+
+        if status == 429:
+            self.rate_limited_responses += 1
+            retry_after = parse_retry_after(_header(headers, "Retry-After"), now)
+            if retry_after is None:
+                retry_after = reset if reset is not None else DEFAULT_RETRY_AFTER
+            self.blocked_until = max(self.blocked_until, now + retry_after)
+            self.tokens = min(self.tokens, 0.0)
+            _LOGGER.warning("API rate limit hit, pausing requests for %.0fs", retry_after)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the limiter state for diagnostics."""
+        now = self._now()
+        self._refill(now)
+        return {
+            "burst": self.burst,
+            "rate": self.rate,
+            "tokens": round(self.tokens, 2),
+            "blocked_for": round(max(0.0, self.blocked_until - now), 1),
+            "server_limit": self.limit,
+            "server_remaining": self.remaining,
+            "throttled_requests": self.throttled_requests,
+            "rate_limited_responses": self.rate_limited_responses,
+        }
+
+
+def async_get_rate_limiter(hass: "HomeAssistant", base_url: str) -> TokenBucket:
+    """Return the limiter shared by every user of ``base_url``."""
+    limiters: Dict[str, TokenBucket] = hass.data.setdefault(DATA_RATE_LIMITERS, {})
+    key = base_url.rstrip("/").lower()
+    if (limiter := limiters.get(key)) is None:
+        limiter = limiters[key] = TokenBucket()
+    return limiter
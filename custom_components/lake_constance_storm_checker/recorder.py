@@ -0,0 +1,177 @@
+"""Record and replay raw API responses for Lake Constance Storm Checker."""
+import asyncio
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from homeassistant.core import Event, callback
+
+from .api import ApiRequest, RawResponse
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class ResponseRecorder:
+    """Append raw API responses with their receive time to a JSONL file.
+
+    ``record`` does blocking file I/O and must run in the executor.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Initialize the recorder."""
+        self.path = path
+
+    def record(self, response: RawResponse) -> None:
+        """Append one response to the recording."""
+        line = json.dumps(
+            {
+                "received_at": response.received_at,
+                "status": response.status,
+                "headers": response.headers,
+                "body": response.body.decode("utf-8", errors="replace"),
+            },
+            separators=(",", ":"),
+        )
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as file:
+            file.write(line + "\n")
+        _LOGGER.debug("Recorded response with status %s to %s", response.status, self.path)
+
+
+def load_recording(path: str) -> List[RawResponse]:
+    """Load a JSONL recording, skipping lines that cannot be parsed."""
+    responses: List[RawResponse] = []
+    with open(path, encoding="utf-8") as file:
+        for line_number, line in enumerate(file, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                responses.append(
+                    RawResponse(
+                        status=int(record["status"]),
+                        headers=dict(record.get("headers") or {}),
+                        body=record.get("body", "").encode("utf-8"),
+                        received_at=float(record["received_at"]),
+                    )
+                )
+            except (ValueError, KeyError, TypeError) as err:
+                _LOGGER.warning("Skipping malformed recording line %s in %s: %s", line_number, path, err)
+    _LOGGER.debug("Loaded %d recorded responses from %s", len(responses), path)
+    return responses
+
+
+class ReplayExhausted(Exception):
+    """Error to indicate a replay transport has no responses left."""
+
+
+class ReplayTransport:
+    """Transport that serves recorded responses in order instead of HTTP."""
+
+    def __init__(self, responses: Iterable[RawResponse]) -> None:
+        """Initialize the transport."""
+        self._responses = list(responses)
+        self._position = 0
+
+    @property
+    def remaining(self) -> int:
+        """Return the number of responses not yet served."""
+        return len(self._responses) - self._position
+
+    @property
+    def next_received_at(self) -> Optional[float]:
+        """Return the receive time of the next response, if any."""
+        if self._position >= len(self._responses):
+            return None
+        return self._responses[self._position].received_at
+
+    async def async_fetch(self, request: ApiRequest) -> RawResponse:
+        """Return the next recorded response, whatever was requested."""
+        if self._position >= len(self._responses):
+            raise ReplayExhausted("No recorded responses left")
+        response = self._responses[self._position]
+        self._position += 1
+        return response
+
+
+@dataclass
+class ReplayReport:
+    """Summary of a replay run."""
+
+    refreshes: int = 0
+    failures: int = 0
+    decode_seconds: float = 0.0
+    state_writes: int = 0
+    transitions: List[Dict[str, Any]] = field(default_factory=list)
+
+
+async def async_replay(
+    coordinator: Any,
+    transport: ReplayTransport,
+    speed: float = 1.0,
+    entity_ids: Optional[Iterable[str]] = None,
+    sleep: Callable[[float], Any] = asyncio.sleep,
+) -> ReplayReport:
+    """Feed a recording through the coordinator's update path.
+
+    ``speed`` scales the recorded gaps between responses: 1.0 replays in real
+    time, 60.0 one minute per second and 0 as fast as possible. State writes
+    are counted for ``entity_ids``, or for every entity when omitted.
+    """
+    report = ReplayReport()
+    watched = set(entity_ids) if entity_ids is not None else None
+
+    @callback
+    def _count_state_write(event: Event) -> None:
+        if watched is None or event.data.get("entity_id") in watched:
+            report.state_writes += 1
+
+    unsub = coordinator.hass.bus.async_listen("state_changed", _count_state_write)
+    previous_transport = coordinator.transport
+    coordinator.transport = transport
+    previous_statuses: Dict[str, Any] = {}
+    previous_received_at: Optional[float] = None
+
+    try:
+        while transport.remaining:
+            received_at = transport.next_received_at
+            if speed > 0 and previous_received_at is not None:
+                await sleep(max(0.0, received_at - previous_received_at) / speed)
+            previous_received_at = received_at
+
+            await coordinator.async_refresh()
+            report.refreshes += 1
+            report.decode_seconds += coordinator.last_decode_seconds
+            if not coordinator.last_update_success:
+                report.failures += 1
+                continue
+
+            snapshot = coordinator.snapshot
+            if snapshot is None:
+                continue
+            for area in coordinator.areas:
+                status = snapshot.statuses[area]
+                if area in previous_statuses and previous_statuses[area] != status:
+                    report.transitions.append(
+                        {
+                            "area": area,
+                            "from": previous_statuses[area],
+                            "to": status,
+                            "received_at": received_at,
+                        }
+                    )
+                previous_statuses[area] = status
+
+            # Let entity state writes triggered by this refresh land
+            await asyncio.sleep(0)
+    finally:
+        coordinator.transport = previous_transport
+        unsub()
+
+    _LOGGER.info(
+        "Replay finished - Refreshes: %s, Failures: %s, Decode time: %.6fs, State writes: %s, Transitions: %s",
+        report.refreshes, report.failures, report.decode_seconds, report.state_writes, len(report.transitions),
+    )
+    return report
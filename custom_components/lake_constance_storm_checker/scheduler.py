@@ -0,0 +1,184 @@
+"""Poll scheduler that spreads refreshes of all entries across their interval."""
+import hashlib
+import logging
+import math
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_point_in_utc_time
+from homeassistant.util import dt as dt_util
+
+from .const import ALIGN_SPREAD, DATA_POLL_SCHEDULER
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def phase_fraction(key: str) -> float:
+    """Return a deterministic fraction in [0, 1) derived from a key."""
+    digest = hashlib.sha256(key.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") / 2**64
+
+
+@dataclass
+class _ScheduledPoll:
+    """Scheduling state of one registered coordinator."""
+
+    coordinator: Any
+    offset: float = 0.0  # fraction of the interval
+    last_poll: float = 0.0  # epoch seconds
+    due: float = 0.0  # epoch seconds
+
+
+class PollScheduler:
+    """Trigger coordinator refreshes at evenly spread, stable phases.
+
+    Entries are ordered by a hash of their key and get the phase
+    ``rank / count`` of their interval, anchored to the wall clock. Phases
+    survive restarts, and entries started together do not poll together.
+    A single timer serves all entries.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the scheduler."""
+        self.hass = hass
+        self._polls: Dict[str, _ScheduledPoll] = {}
+        self._unsub_timer: Optional[CALLBACK_TYPE] = None
+        self._rebalance_pending = False
+
+    @callback
+    def async_register(self, key: str, coordinator: Any) -> CALLBACK_TYPE:
+        """Register a coordinator and return a callback that unregisters it."""
+        _LOGGER.debug("Registering %s with poll scheduler", key)
+        # The coordinator has just done its first refresh
+        self._polls[key] = _ScheduledPoll(coordinator, last_poll=dt_util.utcnow().timestamp())
+        self._async_schedule_rebalance()
+
+        @callback
+        def _unregister() -> None:
+            _LOGGER.debug("Unregistering %s from poll scheduler", key)
+            self._polls.pop(key, None)
+            if self._polls:
+                self._async_schedule_rebalance()
+            elif self._unsub_timer is not None:
+                self._unsub_timer()
+                self._unsub_timer = None
+
+        return _unregister
+
+    @callback
+    def async_reschedule(self, key: str) -> None:
+        """Recompute the next poll of one entry, e.g. after its interval changed."""
+        poll = self._polls.get(key)
+        if poll is None:
+            return
+        poll.due = self._next_due(poll, dt_util.utcnow().timestamp())
+        self._async_arm_timer()
+
+    @callback
+    def _async_schedule_rebalance(self) -> None:
+        """Coalesce rebalancing when many entries register at once."""
+        if self._rebalance_pending:
+            return
+        self._rebalance_pending = True
+        self.hass.loop.call_soon(self._async_rebalance)
+
+    @callback
+    def _async_rebalance(self) -> None:
+        """Assign evenly spaced phase offsets in hash order."""
+        self._rebalance_pending = False
+        count = len(self._polls)
+        if not count:
+            return
+        now = dt_util.utcnow().timestamp()
+        ordered = sorted(self._polls, key=phase_fraction)
+        for rank, key in enumerate(ordered):
+            poll = self._polls[key]
+            poll.offset = rank / count
+            poll.due = self._next_due(poll, now)
+        _LOGGER.debug("Rebalanced poll phases for %d entries", count)
+        self._async_arm_timer()
+
+    @staticmethod
+    def _interval_seconds(poll: _ScheduledPoll) -> float:
+        """Return the poll interval of an entry in seconds."""
+        return poll.coordinator.poll_interval.total_seconds()
+
+    def _next_due(self, poll: _ScheduledPoll, now: float) -> float:
+        """Return the next phase-aligned poll time after ``now``.
+
+        A slot closer than half an interval to the previous poll is skipped,
+        so rebalancing never causes back-to-back polls. Coordinators that
+        learned the upstream publish cadence poll right after it instead,
+        offset by their phase within ``ALIGN_SPREAD``, so entries aligned to
+        the same publication still do not poll together.
+        """
+        interval = self._interval_seconds(poll)
+        phase = poll.offset * interval
+        earliest = max(now, poll.last_poll + interval / 2)
+        aligned = poll.coordinator.aligned_poll_time(earliest)
+        if aligned is not None:
+            return aligned + poll.offset * min(ALIGN_SPREAD, interval)
+        slots = math.floor((earliest - phase) / interval) + 1
+        return phase + slots * interval
+
+    @callback
+    def _async_arm_timer(self) -> None:
+        """Arm the single timer for the earliest due poll."""
+        if self._unsub_timer is not None:
+            self._unsub_timer()
+            self._unsub_timer = None
+        if not self._polls:
+            return
+        due = min(poll.due for poll in self._polls.values())
+        self._unsub_timer = async_track_point_in_utc_time(
+            self.hass, self._async_handle_timer, dt_util.utc_from_timestamp(due)
+        )
+
+    @callback
+    def _async_handle_timer(self, now: datetime) -> None:
+        """Refresh every coordinator that is due and re-arm the timer."""
+        self._unsub_timer = None
+        timestamp = now.timestamp()
+        for key, poll in self._polls.items():
+            # Compare at the timer's microsecond resolution; ``now`` is the armed
+            # point, which can fall a fraction of a microsecond before ``due``
+            if dt_util.utc_from_timestamp(poll.due) > now:
+                continue
+            _LOGGER.debug("Scheduled poll for %s", key)
+            poll.last_poll = timestamp
+            poll.due = self._next_due(poll, timestamp)
+            self.hass.async_create_task(self._async_poll(key, poll), f"lake_constance_storm_checker poll {key}")
+        self._async_arm_timer()
+
+    async def _async_poll(self, key: str, poll: _ScheduledPoll) -> None:
+        """Refresh one coordinator and move its next poll if the new data changed it."""
+        await poll.coordinator.async_refresh()
+        if self._polls.get(key) is not poll:
+            # Unregistered while the refresh was in flight
+            return
+        due = self._next_due(poll, dt_util.utcnow().timestamp())
+        if due != poll.due:
+            _LOGGER.debug("Moving next poll for %s to %s", key, dt_util.utc_from_timestamp(due))
+            poll.due = due
+            self._async_arm_timer()
+
+    def next_polls(self) -> Dict[str, datetime]:
+        """Return the next scheduled poll of every entry."""
+        return {key: dt_util.utc_from_timestamp(poll.due) for key, poll in self._polls.items()}
+
+    def phase_offsets(self) -> Dict[str, timedelta]:
+        """Return the current phase offset of every entry."""
+        return {
+            key: timedelta(seconds=poll.offset * self._interval_seconds(poll))
+            for key, poll in self._polls.items()
+        }
+
+
+@callback
+def async_get_poll_scheduler(hass: HomeAssistant) -> PollScheduler:
+    """Return the poll scheduler shared by all config entries."""
+    if (scheduler := hass.data.get(DATA_POLL_SCHEDULER)) is None:
+        scheduler = hass.data[DATA_POLL_SCHEDULER] = PollScheduler(hass)
+    return scheduler
@@ -0,0 +1,104 @@
+"""Shape validation of decoded status payloads.
+
+Like ``api.py``, this module does not depend on Home Assistant.
+"""
+from typing import Any, Callable, Dict, Iterable, Mapping, Tuple
+
+from .const import AREAS, FIELD_WIND_GUST, FIELD_WIND_SPEED
+
+STATUS_UNKNOWN = "UnknownStatus"
+# Statuses documented for the API; undocumented ones take the tolerant path
+KNOWN_STATUSES = frozenset(
+    {"noWarning", "StrongWindWarning", "StormWarning", "UnknownStatus", "NoData", "Error"}
+)
+TIMESTAMP_KEYS = ("timestamp", "lastUpdate")
+NUMERIC_FIELDS = (FIELD_WIND_SPEED, FIELD_WIND_GUST)
+
+
+class SchemaViolation(ValueError):
+    """Error to indicate a payload has a shape no entity can show."""
+
+
+class PayloadSchema:
+    """Validate decoded payloads and extract the status of every area.
+
+    Built once for a set of areas and numeric area fields. Simple payloads,
+    with a documented status string for every area, take a fast path of one
+    exact type check and one set lookup per area. Everything else takes the
+    tolerant path: dict-per-area objects, mixed shapes, missing areas and
+    undocumented status strings are accepted; area values of other types,
+    area objects without a status, non-numeric wind values and non-string
+    timestamps are violations.
+    """
+
+    def __init__(self, areas: Iterable[str] = AREAS, numeric_fields: Iterable[str] = NUMERIC_FIELDS) -> None:
+        """Compile the schema."""
+        self.areas: Tuple[str, ...] = tuple(areas)
+        self.numeric_fields: Tuple[str, ...] = tuple(numeric_fields)
+        # Dispatch on the exact type of an area value instead of isinstance chains
+        self._area_parsers: Dict[type, Callable[[str, Any], str]] = {
+            str: self._string_status,
+            dict: self._object_status,
+            type(None): self._missing_status,
+        }
+
+    def statuses(self, payload: Mapping[str, Any]) -> Dict[str, str]:
+        """Return the status of every area; raise SchemaViolation for malformed payloads."""
+        statuses = {area: payload.get(area) for area in self.areas}
+        for status in statuses.values():
+            if type(status) is not str or status not in KNOWN_STATUSES:
+                break
+        else:
+            if type(payload.get("timestamp")) is str:
+                return statuses
+        return self._tolerant_statuses(payload)
+
+    def _tolerant_statuses(self, payload: Mapping[str, Any]) -> Dict[str, str]:
+        """Validate any accepted shape, value by value."""
+        if not any(area in payload for area in self.areas):
+            raise SchemaViolation(f"none of the areas {', '.join(self.areas)} is in the payload")
+        for key in TIMESTAMP_KEYS:
+            value = payload.get(key)
+            if value is not None and type(value) is not str:
+                raise SchemaViolation(f"{key} is a {type(value).__name__}, not a string")
+        statuses = {}
+        for area in self.areas:
+            value = payload.get(area)
+            parser = self._area_parsers.get(type(value))
+            if parser is None:
+                if not isinstance(value, Mapping):
+                    raise SchemaViolation(f"{area} is a {type(value).__name__}, not a status or an object")
+                parser = self._object_status
+            statuses[area] = parser(area, value)
+        return statuses
+
+    @staticmethod
+    def _string_status(area: str, status: str) -> str:
+        """Return a plain status string."""
+        if not status:
+            raise SchemaViolation(f"{area} has an empty status")
+        return status
+
+    @staticmethod
+    def _missing_status(area: str, value: None) -> str:
+        """Return the status of an area missing from the payload."""
+        return STATUS_UNKNOWN
+
+    def _object_status(self, area: str, value: Mapping[str, Any]) -> str:
+        """Return the status of a rich area object and check its numeric fields."""
+        status = value.get("status")
+        if type(status) is not str or not status:
+            raise SchemaViolation(f"{area} has no status string")
+        for name in self.numeric_fields:
+            number = value.get(name)
+            if number is None or type(number) in (int, float):
+                continue
+            if type(number) is str:
+                try:
+                    float(number)
+                except ValueError:
+                    pass
+                else:
+                    continue
+            raise SchemaViolation(f"{area} {name} is not a number: {number!r}")
+        return status
@@ -1,20 +1,42 @@
 """Sensor platform for Lake Constance Storm Checker."""
 import logging
-from datetime import datetime
-from typing import Any, Dict
+from typing import Any, Mapping, Optional
 
-from homeassistant.components.sensor import SensorEntity
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorStateClass,
+)
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import PERCENTAGE, UnitOfSpeed
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.typing import StateType
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
-from homeassistant.util import dt as dt_util
 
-from .const import DOMAIN
+from .const import (
+    DOMAIN,
+    AREAS,
+    ATTR_HORIZON_MINUTES,
+    ATTR_OBSERVED_HOURS,
+    ATTR_TRANSITIONS,
+    EXPOSURE_WINDOWS,
+    FIELD_WIND_GUST,
+    FIELD_WIND_SPEED,
+)
+from .entity import LakeConstanceAreaEntity, LakeConstanceEntity
+from .snapshot import EMPTY_ATTRIBUTES
 
 _LOGGER = logging.getLogger(__name__)
 
+STATUS_ICONS = {
+    "noWarning": "mdi:weather-sunny",
+    "StrongWindWarning": "mdi:weather-windy",
+    "StormWarning": "mdi:weather-lightning",
+    "UnknownStatus": "mdi:help-circle",
+    "NoData": "mdi:database-off",
+    "Error": "mdi:alert-circle",
+}
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -27,236 +49,225 @@ async def async_setup_entry(
     coordinator = hass.data[DOMAIN][config_entry.entry_id]
     _LOGGER.debug("Retrieved coordinator for sensor setup")
 
-    entities = [
-        LakeConstanceWestStatusSensor(coordinator),
-        LakeConstanceCenterStatusSensor(coordinator),
-        LakeConstanceEastStatusSensor(coordinator),
-        LakeConstanceLastUpdateSensor(coordinator),
-    ]
+    entities = []
+    if coordinator.compact:
+        entities.append(LakeConstanceOverviewSensor(coordinator))
+    entities.extend(LakeConstanceAreaStatusSensor(coordinator, area) for area in AREAS)
+    entities.append(LakeConstanceLastUpdateSensor(coordinator))
+    if coordinator.rich_payload:
+        # Wind values only exist in the rich payload
+        for area in AREAS:
+            entities.append(
+                LakeConstanceAreaWindSensor(coordinator, area, "wind_speed", FIELD_WIND_SPEED, "Wind Speed")
+            )
+            entities.append(
+                LakeConstanceAreaWindSensor(coordinator, area, "wind_gust", FIELD_WIND_GUST, "Wind Gust")
+            )
+    if coordinator.exposure is not None:
+        entities.extend(
+            LakeConstanceAreaExposureSensor(coordinator, area, window)
+            for area in AREAS
+            for window in EXPOSURE_WINDOWS
+        )
+    if coordinator.nowcast is not None:
+        entities.extend(LakeConstanceAreaStormProbabilitySensor(coordinator, area) for area in AREAS)
     _LOGGER.debug("Created %d sensor entities", len(entities))
     
     async_add_entities(entities)
     _LOGGER.info("Sensor setup completed successfully")
 
 
-class LakeConstanceWestStatusSensor(CoordinatorEntity, SensorEntity):
-    """Representation of a Lake Constance West area status sensor."""
+class LakeConstanceOverviewSensor(LakeConstanceEntity, SensorEntity):
+    """Worst status of all enabled areas, with the per-area statuses as attributes."""
 
-    def __init__(self, coordinator: CoordinatorEntity) -> None:
+    def __init__(self, coordinator) -> None:
         """Initialize the sensor."""
-        _LOGGER.debug("Initializing LakeConstanceWestStatusSensor")
-        super().__init__(coordinator)
-        self._attr_unique_id = f"{DOMAIN}_west_status"
-        self._attr_name = "Lake Constance West Status"
-        _LOGGER.debug("Sensor initialized with unique_id: %s, name: %s", 
+        _LOGGER.debug("Initializing LakeConstanceOverviewSensor")
+        super().__init__(coordinator, "overview")
+        # The base class disables entities by default in compact mode
+        self._attr_entity_registry_enabled_default = True
+        self._attr_name = "Lake Constance Overview"
+        _LOGGER.debug("Sensor initialized with unique_id: %s, name: %s",
                       self._attr_unique_id, self._attr_name)
 
     @property
     def native_value(self) -> StateType:
-        """Return the state of the sensor."""
-        if not self.coordinator.data:
+        """Return the worst status of the enabled areas."""
+        snapshot = self.snapshot
+        if snapshot is None:
             _LOGGER.debug("No coordinator data available, returning 'NoData'")
             return "NoData"
-        
-        try:
-            west_data = self.coordinator.data.get("west")
-            if isinstance(west_data, dict):
-                status = west_data.get("status", "UnknownStatus")
-            elif isinstance(west_data, str):
-                status = west_data
-            else:
-                status = "UnknownStatus"
-            _LOGGER.debug("West area status: %s", status)
-            return status
-        except Exception as e:
-            _LOGGER.error("Error getting west status: %s", e)
-            return "Error"
+        return snapshot.worst_status
 
     @property
     def icon(self) -> str:
         """Return the icon of the sensor."""
-        status = self.native_value
-        icon_map = {
-            "noWarning": "mdi:weather-sunny",
-            "StrongWindWarning": "mdi:weather-windy",
-            "StormWarning": "mdi:weather-lightning",
-            "UnknownStatus": "mdi:help-circle",
-            "NoData": "mdi:database-off",
-            "Error": "mdi:alert-circle",
-        }
-        return icon_map.get(status, "mdi:help-circle")
+        return STATUS_ICONS.get(self.native_value, "mdi:help-circle")
 
     @property
-    def extra_state_attributes(self) -> Dict[str, Any]:
-        """Return entity specific state attributes."""
-        if not self.coordinator.data:
-            _LOGGER.debug("No coordinator data available for west attributes")
-            return {}
+    def extra_state_attributes(self) -> Mapping[str, Any]:
+        """Return the status of each enabled area."""
+        snapshot = self.snapshot
+        if snapshot is None:
+            return EMPTY_ATTRIBUTES
+        return snapshot.overview_attributes
 
-        try:
-            west_data = self.coordinator.data.get("west")
-            if isinstance(west_data, dict):
-                _LOGGER.debug("Returning west data as extra state attributes")
-                return west_data
-            elif isinstance(west_data, str):
-                _LOGGER.debug("West data is string, returning as status")
-                return {"status": west_data}
-            else:
-                _LOGGER.debug("West data is unknown type, returning empty")
-                return {}
-        except Exception as e:
-            _LOGGER.error("Error getting west attributes: %s", e)
-            return {}
-
-
-class LakeConstanceCenterStatusSensor(CoordinatorEntity, SensorEntity):
-    """Representation of a Lake Constance Center area status sensor."""
-
-    def __init__(self, coordinator: CoordinatorEntity) -> None:
+
+class LakeConstanceAreaStatusSensor(LakeConstanceAreaEntity, SensorEntity):
+    """Representation of a Lake Constance area status sensor."""
+
+    def __init__(self, coordinator, area: str) -> None:
         """Initialize the sensor."""
-        _LOGGER.debug("Initializing LakeConstanceCenterStatusSensor")
-        super().__init__(coordinator)
-        self._attr_unique_id = f"{DOMAIN}_center_status"
-        self._attr_name = "Lake Constance Center Status"
+        _LOGGER.debug("Initializing LakeConstanceAreaStatusSensor for area: %s", area)
+        super().__init__(coordinator, area, "status")
+        self._attr_name = f"Lake Constance {area.capitalize()} Status"
         _LOGGER.debug("Sensor initialized with unique_id: %s, name: %s", 
                       self._attr_unique_id, self._attr_name)
 
     @property
     def native_value(self) -> StateType:
         """Return the state of the sensor."""
-        if not self.coordinator.data:
+        snapshot = self.snapshot
+        if snapshot is None:
             _LOGGER.debug("No coordinator data available, returning 'NoData'")
             return "NoData"
-        
-        try:
-            center_data = self.coordinator.data.get("center")
-            if isinstance(center_data, dict):
-                status = center_data.get("status", "UnknownStatus")
-            elif isinstance(center_data, str):
-                status = center_data
-            else:
-                status = "UnknownStatus"
-            _LOGGER.debug("Center area status: %s", status)
-            return status
-        except Exception as e:
-            _LOGGER.error("Error getting center status: %s", e)
-            return "Error"
+        return snapshot.statuses[self.area]
 
     @property
     def icon(self) -> str:
         """Return the icon of the sensor."""
-        status = self.native_value
-        icon_map = {
-            "noWarning": "mdi:weather-sunny",
-            "StrongWindWarning": "mdi:weather-windy",
-            "StormWarning": "mdi:weather-lightning",
-            "UnknownStatus": "mdi:help-circle",
-            "NoData": "mdi:database-off",
-            "Error": "mdi:alert-circle",
-        }
-        return icon_map.get(status, "mdi:help-circle")
+        return STATUS_ICONS.get(self.native_value, "mdi:help-circle")
 
     @property
-    def extra_state_attributes(self) -> Dict[str, Any]:
+    def extra_state_attributes(self) -> Mapping[str, Any]:
         """Return entity specific state attributes."""
-        if not self.coordinator.data:
-            _LOGGER.debug("No coordinator data available for center attributes")
-            return {}
+        snapshot = self.snapshot
+        if snapshot is None:
+            return EMPTY_ATTRIBUTES
+        return snapshot.area_attributes[self.area]
 
-        try:
-            center_data = self.coordinator.data.get("center")
-            if isinstance(center_data, dict):
-                _LOGGER.debug("Returning center data as extra state attributes")
-                return center_data
-            elif isinstance(center_data, str):
-                _LOGGER.debug("Center data is string, returning as status")
-                return {"status": center_data}
-            else:
-                _LOGGER.debug("Center data is unknown type, returning empty")
-                return {}
-        except Exception as e:
-            _LOGGER.error("Error getting center attributes: %s", e)
-            return {}
-
-
-class LakeConstanceEastStatusSensor(CoordinatorEntity, SensorEntity):
-    """Representation of a Lake Constance East area status sensor."""
-
-    def __init__(self, coordinator: CoordinatorEntity) -> None:
+
+class LakeConstanceAreaWindSensor(LakeConstanceAreaEntity, SensorEntity):
+    """Representation of a Lake Constance area wind sensor (rich payload only)."""
+
+    _attr_device_class = SensorDeviceClass.WIND_SPEED
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = UnitOfSpeed.KILOMETERS_PER_HOUR
+
+    def __init__(self, coordinator, area: str, key: str, field: str, label: str) -> None:
         """Initialize the sensor."""
-        _LOGGER.debug("Initializing LakeConstanceEastStatusSensor")
-        super().__init__(coordinator)
-        self._attr_unique_id = f"{DOMAIN}_east_status"
-        self._attr_name = "Lake Constance East Status"
-        _LOGGER.debug("Sensor initialized with unique_id: %s, name: %s", 
-                      self._attr_unique_id, self._attr_name)
+        _LOGGER.debug("Initializing LakeConstanceAreaWindSensor for area: %s, field: %s", area, field)
+        super().__init__(coordinator, area, key)
+        self.field = field
+        self._attr_name = f"Lake Constance {area.capitalize()} {label}"
+
+    async def async_added_to_hass(self) -> None:
+        """Have the coordinator decode this sensor's field while it is enabled."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self.coordinator.async_require_fields((self.field,)))
 
     @property
-    def native_value(self) -> StateType:
-        """Return the state of the sensor."""
-        if not self.coordinator.data:
-            _LOGGER.debug("No coordinator data available, returning 'NoData'")
-            return "NoData"
-        
+    def native_value(self) -> Optional[float]:
+        """Return the wind value of the area."""
+        snapshot = self.snapshot
+        if snapshot is None:
+            return None
+        value = snapshot.area_attributes[self.area].get(self.field)
+        if value is None:
+            return None
         try:
-            east_data = self.coordinator.data.get("east")
-            if isinstance(east_data, dict):
-                status = east_data.get("status", "UnknownStatus")
-            elif isinstance(east_data, str):
-                status = east_data
-            else:
-                status = "UnknownStatus"
-            _LOGGER.debug("East area status: %s", status)
-            return status
-        except Exception as e:
-            _LOGGER.error("Error getting east status: %s", e)
-            return "Error"
+            return float(value)
+        except (TypeError, ValueError):
+            _LOGGER.debug("Ignoring non-numeric %s for area %s: %s", self.field, self.area, value)
+            return None
+
+
+class LakeConstanceAreaExposureSensor(LakeConstanceAreaEntity, SensorEntity):
+    """Share of a sliding window that an area was under warning."""
+
+    _attr_native_unit_of_measurement = PERCENTAGE
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_icon = "mdi:chart-timeline-variant"
+
+    def __init__(self, coordinator, area: str, window: str) -> None:
+        """Initialize the sensor."""
+        _LOGGER.debug("Initializing LakeConstanceAreaExposureSensor for area: %s, window: %s", area, window)
+        super().__init__(coordinator, area, f"warning_share_{window}")
+        # Enabled on purpose in the options, so also in compact mode
+        self._attr_entity_registry_enabled_default = True
+        self.window = window
+        self._attr_name = f"Lake Constance {area.capitalize()} Warning Share {window}"
 
     @property
-    def icon(self) -> str:
-        """Return the icon of the sensor."""
-        status = self.native_value
-        icon_map = {
-            "noWarning": "mdi:weather-sunny",
-            "StrongWindWarning": "mdi:weather-windy",
-            "StormWarning": "mdi:weather-lightning",
-            "UnknownStatus": "mdi:help-circle",
-            "NoData": "mdi:database-off",
-            "Error": "mdi:alert-circle",
+    def available(self) -> bool:
+        """Return if part of the window was observed."""
+        return super().available and self.native_value is not None
+
+    @property
+    def native_value(self) -> Optional[float]:
+        """Return the percentage of the observed window under warning."""
+        share = self.coordinator.exposure.share(self.area, self.window)
+        if share is None:
+            return None
+        return round(share * 100, 1)
+
+    @property
+    def extra_state_attributes(self) -> Mapping[str, Any]:
+        """Return how much of the window was observed."""
+        snapshot = self.snapshot
+        observed = self.coordinator.exposure.observed(self.area, self.window)
+        return {
+            ATTR_OBSERVED_HOURS: round(observed / 3600, 1),
+            **(snapshot.stale_attributes if snapshot is not None else EMPTY_ATTRIBUTES),
         }
-        return icon_map.get(status, "mdi:help-circle")
+
+
+class LakeConstanceAreaStormProbabilitySensor(LakeConstanceAreaEntity, SensorEntity):
+    """Probability that an area gets a storm warning within the nowcast horizon."""
+
+    _attr_native_unit_of_measurement = PERCENTAGE
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_icon = "mdi:weather-lightning"
+
+    def __init__(self, coordinator, area: str) -> None:
+        """Initialize the sensor."""
+        _LOGGER.debug("Initializing LakeConstanceAreaStormProbabilitySensor for area: %s", area)
+        super().__init__(coordinator, area, "storm_probability")
+        # Enabled on purpose in the options, so also in compact mode
+        self._attr_entity_registry_enabled_default = True
+        self._attr_name = f"Lake Constance {area.capitalize()} Storm Probability"
 
     @property
-    def extra_state_attributes(self) -> Dict[str, Any]:
-        """Return entity specific state attributes."""
-        if not self.coordinator.data:
-            _LOGGER.debug("No coordinator data available for east attributes")
-            return {}
+    def available(self) -> bool:
+        """Return if enough transitions were observed."""
+        return super().available and self.native_value is not None
 
-        try:
-            east_data = self.coordinator.data.get("east")
-            if isinstance(east_data, dict):
-                _LOGGER.debug("Returning east data as extra state attributes")
-                return east_data
-            elif isinstance(east_data, str):
-                _LOGGER.debug("East data is string, returning as status")
-                return {"status": east_data}
-            else:
-                _LOGGER.debug("East data is unknown type, returning empty")
-                return {}
-        except Exception as e:
-            _LOGGER.error("Error getting east attributes: %s", e)
-            return {}
-
-
-class LakeConstanceLastUpdateSensor(CoordinatorEntity, SensorEntity):
+    @property
+    def native_value(self) -> Optional[float]:
+        """Return the probability of a storm warning within the horizon, in percent."""
+        probability = self.coordinator.nowcast.probability(self.area)
+        if probability is None:
+            return None
+        return round(probability * 100, 1)
+
+    @property
+    def extra_state_attributes(self) -> Mapping[str, Any]:
+        """Return the horizon and how many transitions the estimate is based on."""
+        snapshot = self.snapshot
+        return {
+            ATTR_HORIZON_MINUTES: self.coordinator.nowcast.horizon,
+            ATTR_TRANSITIONS: self.coordinator.nowcast.model.transitions,
+            **(snapshot.stale_attributes if snapshot is not None else EMPTY_ATTRIBUTES),
+        }
+
+
+class LakeConstanceLastUpdateSensor(LakeConstanceEntity, SensorEntity):
     """Representation of a Lake Constance last update timestamp sensor."""
 
-    def __init__(self, coordinator: CoordinatorEntity) -> None:
+    def __init__(self, coordinator) -> None:
         """Initialize the sensor."""
         _LOGGER.debug("Initializing LakeConstanceLastUpdateSensor")
-        super().__init__(coordinator)
-        self._attr_unique_id = f"{DOMAIN}_last_update"
+        super().__init__(coordinator, "last_update")
         self._attr_name = "Lake Constance Last Update"
         _LOGGER.debug("Sensor initialized with unique_id: %s, name: %s", 
                       self._attr_unique_id, self._attr_name)
@@ -264,37 +275,16 @@ class LakeConstanceLastUpdateSensor(CoordinatorEntity, SensorEntity):
     @property
     def native_value(self) -> StateType:
         """Return the state of the sensor."""
-        if not self.coordinator.data:
+        snapshot = self.snapshot
+        if snapshot is None:
             _LOGGER.debug("No coordinator data available, returning 'NoData'")
             return "NoData"
-        
-        try:
-            # Try to get timestamp from the data
-            timestamp_str = self.coordinator.data.get("timestamp") or self.coordinator.data.get("lastUpdate")
-            if timestamp_str:
-                _LOGGER.debug("Last update timestamp string: %s", timestamp_str)
-                
-                # Parse the ISO format timestamp string to datetime object
-                try:
-                    # Use Home Assistant's datetime utility to parse the timestamp
-                    # This handles various ISO formats including timezone offsets
-                    dt = dt_util.parse_datetime(timestamp_str)
-                    if dt:
-                        _LOGGER.debug("Parsed timestamp to datetime: %s", dt)
-                        return dt
-                    else:
-                        _LOGGER.error("Failed to parse timestamp '%s' - returned None", timestamp_str)
-                        return "Error"
-                        
-                except ValueError as parse_error:
-                    _LOGGER.error("Failed to parse timestamp '%s': %s", timestamp_str, parse_error)
-                    return "Error"
-            else:
-                _LOGGER.debug("No timestamp found in data")
-                return "NoData"
-        except Exception as e:
-            _LOGGER.error("Error getting last update: %s", e)
+        if not snapshot.timestamp_raw:
+            _LOGGER.debug("No timestamp found in data")
+            return "NoData"
+        if snapshot.timestamp is None:
             return "Error"
+        return snapshot.timestamp
 
     @property
     def icon(self) -> str:
@@ -305,16 +295,10 @@ class LakeConstanceLastUpdateSensor(CoordinatorEntity, SensorEntity):
         return "mdi:clock-outline"
 
     @property
-    def extra_state_attributes(self) -> Dict[str, Any]:
+    def extra_state_attributes(self) -> Mapping[str, Any]:
         """Return entity specific state attributes."""
-        if not self.coordinator.data:
-            _LOGGER.debug("No coordinator data available for last update attributes")
-            return {}
-
-        try:
-            # Return the full data as attributes for debugging
-            _LOGGER.debug("Returning full data as extra state attributes")
-            return {"full_data": self.coordinator.data}
-        except Exception as e:
-            _LOGGER.error("Error getting last update attributes: %s", e)
-            return {} 
\ No newline at end of file
+        snapshot = self.snapshot
+        if snapshot is None:
+            return EMPTY_ATTRIBUTES
+        # Return the full data as attributes for debugging
+        return snapshot.last_update_attributes
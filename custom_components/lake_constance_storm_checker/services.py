@@ -0,0 +1,186 @@
+"""Services for Lake Constance Storm Checker."""
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+import voluptuous as vol
+
+from homeassistant.core import (
+    CALLBACK_TYPE,
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import ServiceValidationError
+import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.event import async_call_later
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DOMAIN,
+    AREAS,
+    ATTR_PARTITIONS,
+    ATTR_AREAS,
+    ATTR_REFRESH,
+    ATTR_DURATION,
+    ATTR_INTERVAL,
+    ATTR_OUTPUT_FORMAT,
+    DATA_PROFILER,
+    DEFAULT_PROFILE_DURATION,
+    DEFAULT_PROFILE_INTERVAL,
+    MAX_PROFILE_DURATION,
+    MAX_PROFILE_INTERVAL,
+    PROFILES_DIR,
+    SERVICE_GET_STATUS,
+    SERVICE_START_PROFILING,
+    SERVICE_STOP_PROFILING,
+)
+from .profiler import FORMAT_COLLAPSED, FORMATS, IntegrationProfiler
+from .snapshot import WARNING_STATUSES, STATUS_STORM_WARNING, STATUS_STRONG_WIND_WARNING
+
+_LOGGER = logging.getLogger(__name__)
+
+GET_STATUS_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_PARTITIONS): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(ATTR_AREAS): vol.All(cv.ensure_list, [vol.In(AREAS)]),
+        vol.Optional(ATTR_REFRESH, default=False): cv.boolean,
+    }
+)
+
+START_PROFILING_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_DURATION, default=DEFAULT_PROFILE_DURATION): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=MAX_PROFILE_DURATION)
+        ),
+        vol.Optional(ATTR_INTERVAL, default=DEFAULT_PROFILE_INTERVAL): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=MAX_PROFILE_INTERVAL)
+        ),
+        vol.Optional(ATTR_OUTPUT_FORMAT, default=FORMAT_COLLAPSED): vol.In(FORMATS),
+    }
+)
+
+
+def _partition_status(coordinator, areas: List[str]) -> Dict[str, Any]:
+    """Return the normalized status of one partition from its cached snapshot."""
+    snapshot = coordinator.snapshot
+    statuses = dict(snapshot.statuses) if snapshot is not None else {}
+    area_status = {}
+    for area in areas:
+        status = statuses.get(area)
+        area_status[area] = {
+            "status": status,
+            "warning": status in WARNING_STATUSES,
+            "enabled": area in coordinator.areas,
+        }
+    return {
+        "entry_id": coordinator.config_entry.entry_id,
+        "last_update_success": coordinator.last_update_success,
+        "stale": coordinator.stale,
+        "timestamp": snapshot.timestamp.isoformat() if snapshot is not None and snapshot.timestamp else None,
+        "areas": area_status,
+        "storm_warning_areas": [
+            area for area in areas if area_status[area]["status"] == STATUS_STORM_WARNING
+        ],
+        "strong_wind_warning_areas": [
+            area for area in areas if area_status[area]["status"] == STATUS_STRONG_WIND_WARNING
+        ],
+    }
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration's services."""
+
+    async def _async_get_status(call: ServiceCall) -> ServiceResponse:
+        """Return the status of the requested partitions and areas."""
+        # One coordinator per partition; several entries may poll the same one
+        coordinators: Dict[str, Any] = {}
+        for coordinator in hass.data.get(DOMAIN, {}).values():
+            coordinators.setdefault(coordinator.partition_key, coordinator)
+
+        partitions = call.data.get(ATTR_PARTITIONS) or list(coordinators)
+        unknown = [partition for partition in partitions if partition not in coordinators]
+        if unknown:
+            raise ServiceValidationError(f"No loaded entry for partition(s): {', '.join(unknown)}")
+        areas = call.data.get(ATTR_AREAS) or list(AREAS)
+
+        if call.data[ATTR_REFRESH]:
+            _LOGGER.debug("Refreshing partitions %s for get_status", partitions)
+            await asyncio.gather(*(coordinators[partition].async_refresh() for partition in partitions))
+
+        return {
+            "partitions": {
+                partition: _partition_status(coordinators[partition], areas) for partition in partitions
+            }
+        }
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_STATUS,
+        _async_get_status,
+        schema=GET_STATUS_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    # Stops the running profile when its duration is up
+    unsub_timeout: Optional[CALLBACK_TYPE] = None
+
+    async def _async_stop_profiler() -> Dict[str, Any]:
+        """Stop the running profiler and return its summary."""
+        nonlocal unsub_timeout
+        if unsub_timeout is not None:
+            unsub_timeout()
+            unsub_timeout = None
+        return await hass.data.pop(DATA_PROFILER).async_stop()
+
+    async def _async_profile_timeout(_now: Any) -> None:
+        """Stop profiling after the requested duration."""
+        nonlocal unsub_timeout
+        unsub_timeout = None
+        if DATA_PROFILER in hass.data:
+            await _async_stop_profiler()
+
+    @callback
+    def _async_profiler_hass_stop() -> None:
+        """Drop the profiler and its timeout when Home Assistant stops."""
+        nonlocal unsub_timeout
+        if unsub_timeout is not None:
+            unsub_timeout()
+            unsub_timeout = None
+        hass.data.pop(DATA_PROFILER, None)
+        _LOGGER.debug("Profiling discarded, Home Assistant is stopping")
+
+    async def _async_start_profiling(call: ServiceCall) -> None:
+        """Start sampling the integration's code on the event loop."""
+        nonlocal unsub_timeout
+        if DATA_PROFILER in hass.data:
+            raise ServiceValidationError("Profiling is already running")
+        output_format = call.data[ATTR_OUTPUT_FORMAT]
+        path = hass.config.path(PROFILES_DIR, f"{dt_util.utcnow().strftime('%Y%m%dT%H%M%S')}.{output_format}")
+        profiler = hass.data[DATA_PROFILER] = IntegrationProfiler(
+            hass, path, call.data[ATTR_INTERVAL] / 1000, output_format, _async_profiler_hass_stop
+        )
+        profiler.async_start()
+        unsub_timeout = async_call_later(hass, call.data[ATTR_DURATION], _async_profile_timeout)
+
+    async def _async_stop_profiling(call: ServiceCall) -> ServiceResponse:
+        """Stop profiling and write the profile."""
+        if DATA_PROFILER not in hass.data:
+            raise ServiceValidationError("Profiling is not running")
+        return await _async_stop_profiler()
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_START_PROFILING,
+        _async_start_profiling,
+        schema=START_PROFILING_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_STOP_PROFILING,
+        _async_stop_profiling,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
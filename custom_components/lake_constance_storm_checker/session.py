@@ -0,0 +1,91 @@
+"""Integration-owned HTTP connection pool for Lake Constance Storm Checker."""
+import logging
+from typing import Optional
+
+import aiohttp
+
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import SERVER_SOFTWARE
+from homeassistant.util.ssl import client_context
+
+from .const import (
+    DATA_SESSION,
+    SESSION_CONNECTION_LIMIT,
+    SESSION_CONNECTION_LIMIT_PER_HOST,
+    SESSION_DNS_CACHE_TTL,
+    SESSION_KEEPALIVE_TIMEOUT,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class SessionManager:
+    """Own one tuned aiohttp session shared by all entries and config flows.
+
+    The session is created on first use. Config entries hold a reference
+    while loaded; the session is closed when the last entry releases it or
+    when Home Assistant stops. Home Assistant's shared session is never
+    touched.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the manager."""
+        self.hass = hass
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._users = 0
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, self._async_close_on_stop)
+
+    @callback
+    def async_get(self) -> aiohttp.ClientSession:
+        """Return the session, creating it if needed."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=SESSION_CONNECTION_LIMIT,
+                limit_per_host=SESSION_CONNECTION_LIMIT_PER_HOST,
+                ttl_dns_cache=SESSION_DNS_CACHE_TTL,
+                use_dns_cache=True,
+                keepalive_timeout=SESSION_KEEPALIVE_TIMEOUT,
+                enable_cleanup_closed=True,
+                ssl=client_context(),
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers={"User-Agent": SERVER_SOFTWARE},
+            )
+            _LOGGER.debug(
+                "Created HTTP session - Limit per host: %s, DNS cache TTL: %ss, Keep-alive: %ss",
+                SESSION_CONNECTION_LIMIT_PER_HOST, SESSION_DNS_CACHE_TTL, SESSION_KEEPALIVE_TIMEOUT,
+            )
+        return self._session
+
+    @callback
+    def async_acquire(self) -> aiohttp.ClientSession:
+        """Return the session and keep it open until released."""
+        self._users += 1
+        return self.async_get()
+
+    async def async_release(self) -> None:
+        """Release a reference and close the session when unused."""
+        self._users = max(0, self._users - 1)
+        if self._users == 0:
+            await self._async_close()
+
+    async def _async_close(self) -> None:
+        """Close the session if it is open."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+            _LOGGER.debug("HTTP session closed")
+        self._session = None
+
+    async def _async_close_on_stop(self, event: Event) -> None:
+        """Close the session when Home Assistant stops."""
+        await self._async_close()
+
+
+@callback
+def async_get_session_manager(hass: HomeAssistant) -> SessionManager:
+    """Return the session manager shared by all config entries."""
+    if (manager := hass.data.get(DATA_SESSION)) is None:
+        manager = hass.data[DATA_SESSION] = SessionManager(hass)
+    return manager
@@ -0,0 +1,241 @@
+"""Immutable status snapshots shared by all Lake Constance Storm Checker entities."""
+import logging
+from collections import Counter, deque
+from datetime import datetime, timedelta
+from typing import Any, Deque, Dict, Iterable, Mapping, Optional, Tuple
+
+from homeassistant.util import dt as dt_util
+from homeassistant.util.read_only_dict import ReadOnlyDict
+
+from .api import area_status
+from .const import AREAS
+
+_LOGGER = logging.getLogger(__name__)
+
+STATUS_STORM_WARNING = "StormWarning"
+STATUS_STRONG_WIND_WARNING = "StrongWindWarning"
+STATUS_NO_WARNING = "noWarning"
+STATUS_UNKNOWN = "UnknownStatus"
+
+WARNING_STATUSES = frozenset({STATUS_STRONG_WIND_WARNING, STATUS_STORM_WARNING})
+
+# Ordered warning levels; statuses outside this map are never held back
+STATUS_SEVERITY = {STATUS_NO_WARNING: 0, STATUS_STRONG_WIND_WARNING: 1, STATUS_STORM_WARNING: 2}
+
+EMPTY_ATTRIBUTES: ReadOnlyDict = ReadOnlyDict()
+
+
+def freeze(value: Any) -> Any:
+    """Return a deeply read-only copy of a decoded JSON value."""
+    if isinstance(value, Mapping):
+        return ReadOnlyDict({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def raw_statuses(data: Any) -> Dict[str, str]:
+    """Return the status of every area as reported in a decoded payload."""
+    if not isinstance(data, Mapping):
+        data = {}
+    return {area: area_status(data.get(area)) for area in AREAS}
+
+
+class StatusHysteresis:
+    """Damp area status flapping across updates.
+
+    Escalations apply immediately. A lower status only applies once the
+    current one has been held for ``min_dwell`` and at least
+    ``confirm_count`` of the last ``confirm_window`` reported statuses are
+    at or below it.
+    """
+
+    def __init__(
+        self,
+        min_dwell: timedelta = timedelta(0),
+        confirm_count: int = 1,
+        confirm_window: int = 1,
+    ) -> None:
+        """Initialize without any status history."""
+        self.statuses: Dict[str, str] = {}
+        self.suppressed: Counter = Counter()
+        self._since: Dict[str, datetime] = {}
+        self._history: Dict[str, Deque[str]] = {}
+        self.configure(min_dwell, confirm_count, confirm_window)
+
+    def configure(self, min_dwell: timedelta, confirm_count: int, confirm_window: int) -> None:
+        """Set the hysteresis parameters, keeping the status history."""
+        self.min_dwell = min_dwell
+        self.confirm_count = confirm_count
+        self.confirm_window = max(confirm_window, confirm_count)
+        self._history = {
+            area: deque(history, maxlen=self.confirm_window) for area, history in self._history.items()
+        }
+
+    @property
+    def enabled(self) -> bool:
+        """Return if any de-escalation can be held back."""
+        return self.min_dwell > timedelta(0) or self.confirm_count > 1
+
+    def update(self, reported: Mapping[str, str], now: datetime) -> Dict[str, str]:
+        """Feed the statuses of one update and return the effective statuses."""
+        for area, status in reported.items():
+            history = self._history.setdefault(area, deque(maxlen=self.confirm_window))
+            history.append(status)
+            current = self.statuses.get(area)
+            if status == current:
+                continue
+            if current is not None and self._is_de_escalation(current, status) and not self._confirmed(
+                area, status, now
+            ):
+                self.suppressed[area] += 1
+                _LOGGER.debug(
+                    "Holding %s status %s, suppressed change to %s (%d suppressed)",
+                    area, current, status, self.suppressed[area],
+                )
+                continue
+            _LOGGER.debug("Area %s status changed from %s to %s", area, current, status)
+            self.statuses[area] = status
+            self._since[area] = now
+        return self.statuses
+
+    @staticmethod
+    def _is_de_escalation(current: str, status: str) -> bool:
+        """Return if ``status`` is a lower warning level than ``current``."""
+        if current not in STATUS_SEVERITY or status not in STATUS_SEVERITY:
+            return False
+        return STATUS_SEVERITY[status] < STATUS_SEVERITY[current]
+
+    def _confirmed(self, area: str, status: str, now: datetime) -> bool:
+        """Return if a de-escalation to ``status`` has held long and often enough."""
+        if now - self._since[area] < self.min_dwell:
+            return False
+        severity = STATUS_SEVERITY[status]
+        confirmations = sum(
+            STATUS_SEVERITY.get(reported, severity + 1) <= severity for reported in self._history[area]
+        )
+        return confirmations >= self.confirm_count
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the configuration and counters for diagnostics."""
+        return {
+            "enabled": self.enabled,
+            "min_dwell": self.min_dwell.total_seconds(),
+            "confirm_count": self.confirm_count,
+            "confirm_window": self.confirm_window,
+            "statuses": dict(self.statuses),
+            "suppressed_transitions": dict(self.suppressed),
+            "suppressed_total": sum(self.suppressed.values()),
+        }
+
+
+class StatusSnapshot:
+    """Read-only view of one coordinator update.
+
+    Built once per update; entities hand out its attribute mappings as-is
+    instead of building new dicts and lists on every state write.
+    """
+
+    __slots__ = (
+        "full_data",
+        "raw_statuses",
+        "statuses",
+        "area_attributes",
+        "areas_with_storm_warning",
+        "areas_with_strong_wind_warning",
+        "storm_warning_attributes",
+        "strong_wind_warning_attributes",
+        "last_update_attributes",
+        "stale_attributes",
+        "worst_status",
+        "overview_attributes",
+        "timestamp_raw",
+        "timestamp",
+    )
+
+    def __init__(
+        self,
+        data: Any,
+        areas: Iterable[str],
+        effective_statuses: Optional[Mapping[str, str]] = None,
+        stale_attributes: Mapping[str, Any] = EMPTY_ATTRIBUTES,
+        reported_statuses: Optional[Mapping[str, str]] = None,
+    ) -> None:
+        """Build the snapshot from a decoded payload.
+
+        ``effective_statuses`` replaces the reported statuses, e.g. after
+        hysteresis; the reported ones are then kept as ``raw_status``.
+        ``stale_attributes`` are added to every attribute mapping while
+        the data is served past a failed update. ``reported_statuses``
+        are the statuses already extracted when the payload was validated.
+        """
+        self.stale_attributes = stale_attributes
+        if not isinstance(data, Mapping):
+            _LOGGER.debug("Payload is not a mapping (%s), treating all areas as unknown", type(data).__name__)
+            data = {}
+        self.full_data: ReadOnlyDict = freeze(data)
+        self.raw_statuses: ReadOnlyDict = ReadOnlyDict(
+            reported_statuses if reported_statuses is not None else raw_statuses(self.full_data)
+        )
+
+        statuses = {}
+        area_attributes = {}
+        for area in AREAS:
+            area_data = self.full_data.get(area)
+            if isinstance(area_data, Mapping):
+                attributes = area_data
+            elif isinstance(area_data, str):
+                attributes = ReadOnlyDict({"status": area_data})
+            else:
+                attributes = EMPTY_ATTRIBUTES
+            if effective_statuses is None:
+                statuses[area] = self.raw_statuses[area]
+            else:
+                statuses[area] = effective_statuses.get(area, self.raw_statuses[area])
+                attributes = ReadOnlyDict({**attributes, "raw_status": self.raw_statuses[area]})
+            if stale_attributes:
+                attributes = ReadOnlyDict({**attributes, **stale_attributes})
+            area_attributes[area] = attributes
+        self.statuses: ReadOnlyDict = ReadOnlyDict(statuses)
+        self.area_attributes: ReadOnlyDict = ReadOnlyDict(area_attributes)
+
+        enabled_areas = set(areas)
+        enabled = [area for area in AREAS if area in enabled_areas]
+        self.areas_with_storm_warning: Tuple[str, ...] = tuple(
+            area for area in enabled if statuses[area] == STATUS_STORM_WARNING
+        )
+        self.areas_with_strong_wind_warning: Tuple[str, ...] = tuple(
+            area for area in enabled if statuses[area] == STATUS_STRONG_WIND_WARNING
+        )
+        # Compact overview: the worst known status and one status per enabled area
+        known = [statuses[area] for area in enabled if statuses[area] in STATUS_SEVERITY]
+        self.worst_status: str = max(known, key=STATUS_SEVERITY.__getitem__) if known else STATUS_UNKNOWN
+        self.overview_attributes = ReadOnlyDict(
+            {**{area: statuses[area] for area in enabled}, **stale_attributes}
+        )
+        self.storm_warning_attributes = ReadOnlyDict(
+            {
+                "areas_with_storm_warning": self.areas_with_storm_warning,
+                "full_data": self.full_data,
+                **stale_attributes,
+            }
+        )
+        self.strong_wind_warning_attributes = ReadOnlyDict(
+            {
+                "areas_with_strong_wind_warning": self.areas_with_strong_wind_warning,
+                "full_data": self.full_data,
+                **stale_attributes,
+            }
+        )
+        self.last_update_attributes = ReadOnlyDict({"full_data": self.full_data, **stale_attributes})
+
+        self.timestamp_raw: Optional[str] = self.full_data.get("timestamp") or self.full_data.get("lastUpdate")
+        self.timestamp: Optional[datetime] = None
+        if self.timestamp_raw:
+            try:
+                self.timestamp = dt_util.parse_datetime(str(self.timestamp_raw))
+            except ValueError as parse_error:
+                _LOGGER.error("Failed to parse timestamp '%s': %s", self.timestamp_raw, parse_error)
+            else:
+                if self.timestamp is None:
+                    _LOGGER.error("Failed to parse timestamp '%s' - returned None", self.timestamp_raw)
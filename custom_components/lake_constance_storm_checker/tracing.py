@@ -0,0 +1,164 @@
+"""Per-stage latency traces of coordinator updates."""
+import json
+import logging
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, TRACE_BUFFER_SIZE
+
+_LOGGER = logging.getLogger(__name__)
+
+# Local stages in the order they run; upstream and poll wait come before them
+STAGES = ("request", "decode", "normalize", "snapshot", "fan_out")
+
+
+class UpdateTrace:
+    """Timing of one update, from the upstream timestamp to the last state write.
+
+    Stage durations are measured with ``time.perf_counter``; the poll start,
+    publication and finish times are wall-clock epoch seconds.
+    """
+
+    __slots__ = (
+        "partition",
+        "started_at",
+        "previous_poll",
+        "durations",
+        "published",
+        "new_publication",
+        "outcome",
+        "state_writes",
+        "finished_at",
+    )
+
+    def __init__(self, partition: str, started_at: float, previous_poll: Optional[float]) -> None:
+        """Start a trace at the beginning of a poll."""
+        self.partition = partition
+        self.started_at = started_at
+        self.previous_poll = previous_poll
+        self.durations: Dict[str, float] = {}
+        self.published: Optional[float] = None
+        self.new_publication = False
+        self.outcome = "ok"
+        self.state_writes = 0
+        self.finished_at: Optional[float] = None
+
+    @contextmanager
+    def span(self, stage: str) -> Iterator[None]:
+        """Time a stage; repeated spans of one stage add up."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.durations[stage] = self.durations.get(stage, 0.0) + time.perf_counter() - start
+
+    @property
+    def age(self) -> Optional[float]:
+        """Return how old the data was when the last entity state was written."""
+        if self.published is None or self.finished_at is None:
+            return None
+        return self.finished_at - self.published
+
+    def breakdown(self) -> Dict[str, float]:
+        """Return the data age split into stages, in seconds.
+
+        For a new publication, the time before the poll is split at the
+        previous poll: upstream had not published it by then (a lower bound
+        of the publishing delay), and the rest was spent waiting for this
+        poll. Data fetched before is only aged as a whole.
+        """
+        stages: Dict[str, float] = {}
+        if self.published is not None and self.new_publication:
+            before_poll = max(0.0, self.started_at - self.published)
+            upstream = 0.0
+            if self.previous_poll is not None:
+                upstream = min(before_poll, max(0.0, self.previous_poll - self.published))
+            stages["upstream"] = upstream
+            stages["poll_wait"] = before_poll - upstream
+        durations = dict(self.durations)
+        # The snapshot is built lazily by the first entity during fan-out
+        if "fan_out" in durations:
+            durations["fan_out"] = max(0.0, durations["fan_out"] - durations.get("snapshot", 0.0))
+        stages.update((stage, durations[stage]) for stage in STAGES if stage in durations)
+        return stages
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the trace as a JSON-serializable dict."""
+        age = self.age
+        return {
+            "partition": self.partition,
+            "started_at": dt_util.utc_from_timestamp(self.started_at).isoformat(),
+            "outcome": self.outcome,
+            "published": (
+                dt_util.utc_from_timestamp(self.published).isoformat() if self.published is not None else None
+            ),
+            "new_publication": self.new_publication,
+            "age": round(age, 6) if age is not None else None,
+            "stages": {stage: round(seconds, 6) for stage, seconds in self.breakdown().items()},
+            "state_writes": self.state_writes,
+        }
+
+
+class UpdateTracer:
+    """Keep the most recent update traces and optionally append them to a JSONL file.
+
+    File writes are batched into one executor job at a time, so lines keep
+    their order and the event loop never blocks on disk.
+    """
+
+    def __init__(self, hass: HomeAssistant, size: int = TRACE_BUFFER_SIZE) -> None:
+        """Initialize with an empty buffer and no trace file."""
+        self.hass = hass
+        self.traces: Deque[UpdateTrace] = deque(maxlen=size)
+        self.path: Optional[str] = None
+        self._pending: List[str] = []
+        self._flushing = False
+
+    @callback
+    def async_finish(self, trace: UpdateTrace) -> None:
+        """Store a finished trace and queue it for the trace file."""
+        if trace.finished_at is None:
+            trace.finished_at = time.time()
+        self.traces.append(trace)
+        if self.path is None and not _LOGGER.isEnabledFor(logging.DEBUG):
+            return
+        record = trace.as_dict()
+        _LOGGER.debug(
+            "Update of partition %s: %s, age %ss, stages %s",
+            trace.partition, trace.outcome, record["age"], record["stages"],
+        )
+        if self.path is None:
+            return
+        self._pending.append(json.dumps(record, separators=(",", ":")))
+        if not self._flushing:
+            self._flushing = True
+            self.hass.async_create_task(self._async_flush(), f"{DOMAIN} write traces")
+
+    async def _async_flush(self) -> None:
+        """Append queued lines until none are left."""
+        try:
+            while self._pending and self.path is not None:
+                lines, self._pending = self._pending, []
+                try:
+                    await self.hass.async_add_executor_job(self._write, self.path, lines)
+                except OSError as err:
+                    _LOGGER.warning("Could not write update traces to %s: %s", self.path, err)
+        finally:
+            self._flushing = False
+
+    @staticmethod
+    def _write(path: str, lines: List[str]) -> None:
+        """Append lines to the trace file; runs in the executor."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "a", encoding="utf-8") as file:
+            file.write("\n".join(lines) + "\n")
+
+    def as_list(self) -> List[Dict[str, Any]]:
+        """Return the buffered traces, oldest first, for diagnostics."""
+        return [trace.as_dict() for trace in self.traces]
@@ -0,0 +1,31 @@
+"""HTTP view serving the integration's metrics to Prometheus."""
+import logging
+
+from aiohttp import web
+
+from homeassistant.components.http import KEY_HASS, HomeAssistantView
+
+from .const import DOMAIN, METRICS_URL
+from .metrics import render_metrics
+
+_LOGGER = logging.getLogger(__name__)
+
+CONTENT_TYPE_PROMETHEUS = "text/plain; version=0.0.4"
+
+
+class LakeConstanceMetricsView(HomeAssistantView):
+    """Serve fetch health and state write metrics of all config entries."""
+
+    url = METRICS_URL
+    name = f"api:{DOMAIN}:metrics"
+    requires_auth = True
+
+    async def get(self, request: web.Request) -> web.Response:
+        """Render the metrics from the in-memory counters."""
+        hass = request.app[KEY_HASS]
+        coordinators = hass.data.get(DOMAIN, {}).values()
+        _LOGGER.debug("Rendering metrics for %d entries", len(coordinators))
+        response = web.Response(text=render_metrics(coordinators))
+        # aiohttp rejects a charset inside content_type, so set the header directly
+        response.headers["Content-Type"] = f"{CONTENT_TYPE_PROMETHEUS}; charset=utf-8"
+        return response
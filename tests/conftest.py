@@ -0,0 +1,27 @@
+"""Fixtures for Lake Constance Storm Checker tests."""
+from typing import AsyncGenerator
+
+import pytest
+
+from .standin_api import StandInApi
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations):
+    """Enable loading of the custom integration in all tests."""
+    yield
+
+
+@pytest.fixture
+async def standin_api(socket_enabled, request) -> AsyncGenerator[StandInApi, None]:
+    """Run the stand-in API on localhost.
+
+    Tests configure it by parametrizing this fixture indirectly with a dict
+    of the ``codes`` to accept and a ``quota`` of requests per minute.
+    """
+    settings = getattr(request, "param", {})
+    api = StandInApi(codes=settings.get("codes"))
+    api.quota = settings.get("quota")
+    await api.async_start()
+    yield api
+    await api.async_stop()
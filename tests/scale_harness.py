@@ -0,0 +1,253 @@
+"""Scale harness: many config entries in one Home Assistant instance."""
+import asyncio
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Callable, List, Optional
+
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+from custom_components.lake_constance_storm_checker.const import (
+    DOMAIN,
+    CONF_BASE_URL,
+    CONF_API_CODE,
+    CONF_PARTITION_KEY,
+)
+from custom_components.lake_constance_storm_checker.ratelimit import async_get_rate_limiter
+
+from .standin_api import StandInApi
+
+INTEGRATION_FILTER = tracemalloc.Filter(True, "*lake_constance_storm_checker*")
+
+
+def _real_monotonic() -> float:
+    """Return wall-clock monotonic time that the frozen test clock does not touch."""
+    return time.clock_gettime(time.CLOCK_MONOTONIC)
+
+
+class LoopLagMonitor:
+    """Measure event-loop lag as the longest gap between two loop iterations.
+
+    A probe re-schedules itself with ``call_soon`` while running, so each gap
+    between probes is the time one loop iteration spent on other callbacks.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the monitor."""
+        self.max_lag = 0.0
+        self._last = 0.0
+        self._handle: Optional[asyncio.Handle] = None
+
+    def start(self) -> None:
+        """Start probing."""
+        self._last = _real_monotonic()
+        self._handle = asyncio.get_running_loop().call_soon(self._probe)
+
+    def stop(self) -> None:
+        """Stop probing."""
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+    def _probe(self) -> None:
+        now = _real_monotonic()
+        self.max_lag = max(self.max_lag, now - self._last)
+        self._last = now
+        self._handle = asyncio.get_running_loop().call_soon(self._probe)
+
+
+@dataclass
+class ScaleBudget:
+    """Limits a scale run must stay within."""
+
+    max_loop_lag: float = 0.5  # seconds
+    max_memory_per_entry: int = 256 * 1024  # bytes
+    max_cpu_per_refresh: float = 0.02  # seconds
+    max_state_writes_per_second: Optional[float] = None
+
+
+@dataclass
+class ScaleReport:
+    """Measurements of one scale run.
+
+    CPU time is process time of the simulated seconds that issued requests,
+    so it includes the stand-in API and the lag probe, which run in the same
+    process; treat it as an upper bound. Memory counts the live allocations
+    made from the integration's own code once all entries are loaded.
+    Tracing stops before the timed run so it does not inflate CPU time.
+    """
+
+    entries: int
+    simulated_seconds: float
+    refreshes: int
+    state_writes: int
+    max_loop_lag: float
+    memory_bytes: int
+    cpu_seconds: float
+
+    @property
+    def state_writes_per_second(self) -> float:
+        """Return state writes per simulated second."""
+        return self.state_writes / self.simulated_seconds if self.simulated_seconds else 0.0
+
+    @property
+    def cpu_per_refresh(self) -> float:
+        """Return CPU seconds spent per refresh."""
+        return self.cpu_seconds / self.refreshes if self.refreshes else 0.0
+
+    @property
+    def memory_per_entry(self) -> float:
+        """Return traced memory per config entry."""
+        return self.memory_bytes / self.entries if self.entries else 0.0
+
+    def violations(self, budget: ScaleBudget) -> List[str]:
+        """Return the budget limits this run exceeded."""
+        violations = []
+        if self.max_loop_lag > budget.max_loop_lag:
+            violations.append(f"event-loop lag {self.max_loop_lag:.3f}s > {budget.max_loop_lag:.3f}s")
+        if self.memory_per_entry > budget.max_memory_per_entry:
+            violations.append(
+                f"memory per entry {self.memory_per_entry:.0f}B > {budget.max_memory_per_entry}B"
+            )
+        if self.cpu_per_refresh > budget.max_cpu_per_refresh:
+            violations.append(
+                f"CPU per refresh {self.cpu_per_refresh * 1000:.2f}ms > {budget.max_cpu_per_refresh * 1000:.2f}ms"
+            )
+        if (
+            budget.max_state_writes_per_second is not None
+            and self.state_writes_per_second > budget.max_state_writes_per_second
+        ):
+            violations.append(
+                f"state writes {self.state_writes_per_second:.1f}/s > {budget.max_state_writes_per_second:.1f}/s"
+            )
+        return violations
+
+    def assert_within(self, budget: ScaleBudget) -> None:
+        """Fail when any budget limit is exceeded."""
+        violations = self.violations(budget)
+        assert not violations, f"Scale budget exceeded with {self.entries} entries: " + "; ".join(violations)
+
+
+class ScaleHarness:
+    """Load many config entries against a stand-in API and run them on a simulated clock."""
+
+    def __init__(self, hass: HomeAssistant, freezer, api: StandInApi) -> None:
+        """Initialize the harness."""
+        self.hass = hass
+        self.freezer = freezer
+        self.api = api
+        self.entries: List[MockConfigEntry] = []
+        self.memory_bytes = 0
+
+    async def async_load_entries(self, count: int, partitions: int = 1) -> None:
+        """Create and set up ``count`` config entries spread over ``partitions``."""
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        setups = []
+        for index in range(count):
+            entry = MockConfigEntry(
+                domain=DOMAIN,
+                title=f"Lake Constance {index}",
+                data={
+                    CONF_BASE_URL: self.api.base_url,
+                    CONF_API_CODE: f"code-{index}",
+                    CONF_PARTITION_KEY: f"partition-{index % partitions}",
+                },
+                version=6,
+            )
+            entry.add_to_hass(self.hass)
+            self.entries.append(entry)
+            setups.append(self.hass.async_create_task(self.hass.config_entries.async_setup(entry.entry_id)))
+        await self._async_wait_for_setups(setups, count)
+        assert all(setup.result() for setup in setups)
+        await self.hass.async_block_till_done()
+        snapshot = tracemalloc.take_snapshot().filter_traces([INTEGRATION_FILTER])
+        self.memory_bytes = sum(stat.size for stat in snapshot.statistics("filename"))
+        if started_tracing:
+            tracemalloc.stop()
+
+    async def _async_wait_for_setups(self, setups: List["asyncio.Task[bool]"], count: int) -> None:
+        """Wait for setups started at once, as on a restart, under the real rate limits.
+
+        First refreshes past the shared rate limiter's burst wait for tokens
+        on the simulated clock. It only advances once the requests already
+        let through were answered, so their connections do not time out.
+        """
+        limiter = async_get_rate_limiter(self.hass, self.api.base_url)
+        tokens = max(0, int(limiter.as_dict()["tokens"]))
+        started = dt_util.utcnow()
+        requests_before = self.api.requests
+        progress = (requests_before, _real_monotonic())
+        while not all(setup.done() for setup in setups):
+            await asyncio.sleep(0)
+            elapsed = (dt_util.utcnow() - started).total_seconds()
+            # Allow one request of slack for rounding of the token waits
+            let_through = min(count, tokens + int(elapsed * limiter.rate)) - 1
+            if self.api.requests != progress[0]:
+                progress = (self.api.requests, _real_monotonic())
+            # Failed requests never arrive; do not wait for them forever
+            if self.api.requests - requests_before < let_through and _real_monotonic() - progress[1] < 1:
+                continue
+            self.freezer.tick(timedelta(seconds=1 / limiter.rate))
+            async_fire_time_changed(self.hass)
+
+    async def async_run(
+        self,
+        duration: timedelta,
+        step: timedelta = timedelta(seconds=1),
+        on_tick: Optional[Callable[[int], None]] = None,
+    ) -> ScaleReport:
+        """Advance the simulated clock by ``duration`` in ``step`` increments."""
+        state_writes = 0
+
+        @callback
+        def _count_state_write(event: Event) -> None:
+            nonlocal state_writes
+            state_writes += 1
+
+        unsub = self.hass.bus.async_listen("state_changed", _count_state_write)
+        monitor = LoopLagMonitor()
+        requests_before = self.api.requests
+        cpu_seconds = 0.0
+        ticks = int(duration / step)
+
+        try:
+            for tick in range(ticks):
+                if on_tick is not None:
+                    on_tick(tick)
+                self.freezer.tick(step)
+                requests = self.api.requests
+                cpu_start = time.process_time()
+                monitor.start()
+                async_fire_time_changed(self.hass)
+                await self.hass.async_block_till_done()
+                monitor.stop()
+                # Idle ticks only measure the test harness itself
+                if self.api.requests != requests:
+                    cpu_seconds += time.process_time() - cpu_start
+        finally:
+            monitor.stop()
+            unsub()
+
+        return ScaleReport(
+            entries=len(self.entries),
+            simulated_seconds=ticks * step.total_seconds(),
+            refreshes=self.api.requests - requests_before,
+            state_writes=state_writes,
+            max_loop_lag=monitor.max_lag,
+            memory_bytes=self.memory_bytes,
+            cpu_seconds=cpu_seconds,
+        )
+
+    async def async_unload(self) -> None:
+        """Unload all config entries."""
+        for entry in self.entries:
+            await self.hass.config_entries.async_unload(entry.entry_id)
+        await self.hass.async_block_till_done()
@@ -0,0 +1,305 @@
+"""Simulated-clock harness: run days of polling against a scripted stand-in API.
+
+Instead of ticking the frozen clock in fixed steps, the harness jumps
+straight to the next scheduled timer or scripted event, so a week of
+5-minute polls takes a few thousand loop iterations.
+"""
+import asyncio
+import math
+import statistics
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.lake_constance_storm_checker.const import (
+    DOMAIN,
+    CONF_BASE_URL,
+    CONF_API_CODE,
+    CONF_PARTITION_KEY,
+)
+
+from .standin_api import StandInApi
+
+# Smallest clock jump, so timers that are already due cannot stall the run
+MIN_STEP = timedelta(seconds=1)
+# aiohttp sweeps closed transports every 2 s; stopping for it would turn a
+# week into 300000 iterations. It still runs, overdue, at the next jump.
+HOUSEKEEPING_METHODS = ("_cleanup_closed",)
+
+
+def _is_housekeeping(handle: asyncio.TimerHandle) -> bool:
+    """Return whether a timer is aiohttp's periodic closed-transport sweep."""
+    # aiohttp schedules helpers.weakref_handle(obj, method_name)
+    args = handle._args  # pylint: disable=protected-access
+    return bool(args) and isinstance(args[0], tuple) and args[0][-1] in HOUSEKEEPING_METHODS
+
+
+@dataclass(frozen=True)
+class StatusChange:
+    """The stand-in API starts reporting ``status`` for an area at ``at``."""
+
+    at: timedelta
+    partition: str
+    area: str
+    status: str
+
+
+@dataclass(frozen=True)
+class Outage:
+    """The stand-in API answers every request with a 503 from ``at`` until ``end``."""
+
+    at: timedelta
+    end: timedelta
+
+
+@dataclass(frozen=True)
+class Publication:
+    """The stand-in API starts serving a new ``timestamp`` at ``at``, statuses unchanged.
+
+    ``published`` is the time the payload claims, by default ``at``.
+    """
+
+    at: timedelta
+    published: Optional[timedelta] = None
+
+
+TimelineEvent = Union[StatusChange, Outage, Publication]
+
+
+@dataclass
+class Transition:
+    """A scripted status change and when the coordinator published it."""
+
+    change: StatusChange
+    detected_at: Optional[timedelta] = None
+
+    @property
+    def delay(self) -> Optional[timedelta]:
+        """Return how long the change took to reach the entities."""
+        return None if self.detected_at is None else self.detected_at - self.change.at
+
+
+@dataclass
+class SimulationReport:
+    """Measurements of one simulated run."""
+
+    simulated: timedelta
+    requests: int
+    failed_requests: int
+    state_writes: int
+    iterations: int
+    transitions: List[Transition] = field(default_factory=list)
+    # How long each publication took to be fetched, None if never fetched
+    publication_delays: List[Optional[timedelta]] = field(default_factory=list)
+
+    @property
+    def detection_delays(self) -> List[timedelta]:
+        """Return the delays of all detected transitions."""
+        return [transition.delay for transition in self.transitions if transition.delay is not None]
+
+    @property
+    def missed_transitions(self) -> List[Transition]:
+        """Return transitions that were superseded before any poll saw them."""
+        return [transition for transition in self.transitions if transition.delay is None]
+
+    @property
+    def max_detection_delay(self) -> timedelta:
+        """Return the longest detection delay."""
+        return max(self.detection_delays, default=timedelta(0))
+
+    @property
+    def mean_detection_delay(self) -> timedelta:
+        """Return the mean detection delay."""
+        delays = self.detection_delays
+        if not delays:
+            return timedelta(0)
+        return timedelta(seconds=statistics.fmean(delay.total_seconds() for delay in delays))
+
+    @property
+    def mean_publication_delay(self) -> timedelta:
+        """Return the mean time from a publication until a poll fetched it."""
+        delays = [delay for delay in self.publication_delays if delay is not None]
+        if not delays:
+            return timedelta(0)
+        return timedelta(seconds=statistics.fmean(delay.total_seconds() for delay in delays))
+
+    @property
+    def requests_per_day(self) -> float:
+        """Return requests per simulated day."""
+        return self.requests / (self.simulated / timedelta(days=1))
+
+    def summary(self) -> str:
+        """Return a one-line summary for test output."""
+        return (
+            f"{self.simulated} simulated in {self.iterations} iterations: {self.requests} requests "
+            f"({self.failed_requests} failed), {self.state_writes} state writes, "
+            f"{len(self.detection_delays)}/{len(self.transitions)} transitions detected, "
+            f"delay mean {self.mean_detection_delay} max {self.max_detection_delay}, "
+            f"publication delay mean {self.mean_publication_delay}"
+        )
+
+
+class SimulationHarness:
+    """Drive config entries on a virtual clock against a scripted stand-in API."""
+
+    def __init__(self, hass: HomeAssistant, freezer, api: StandInApi) -> None:
+        """Initialize the harness."""
+        self.hass = hass
+        self.freezer = freezer
+        self.api = api
+        self.entries: List[MockConfigEntry] = []
+
+    @property
+    def coordinators(self) -> List[Any]:
+        """Return the coordinators of the loaded entries."""
+        return [self.hass.data[DOMAIN][entry.entry_id] for entry in self.entries]
+
+    async def async_load_entry(
+        self, partition: str = "lakeConstance", options: Optional[Mapping[str, Any]] = None
+    ) -> MockConfigEntry:
+        """Create and set up one config entry for ``partition``."""
+        entry = MockConfigEntry(
+            domain=DOMAIN,
+            title=f"Lake Constance {partition}",
+            data={
+                CONF_BASE_URL: self.api.base_url,
+                CONF_API_CODE: "code",
+                CONF_PARTITION_KEY: partition,
+            },
+            options=dict(options or {}),
+            version=6,
+        )
+        entry.add_to_hass(self.hass)
+        self.entries.append(entry)
+        assert await self.hass.config_entries.async_setup(entry.entry_id)
+        await self.hass.async_block_till_done()
+        return entry
+
+    def _next_timer(self, now: datetime) -> datetime:
+        """Return when the earliest pending loop timer is due."""
+        loop_now = self.hass.loop.time()
+        delays = [
+            handle.when() - loop_now
+            for handle in self.hass.loop._scheduled  # pylint: disable=protected-access
+            if isinstance(handle, asyncio.TimerHandle)
+            and not handle.cancelled()
+            and not _is_housekeeping(handle)
+        ]
+        delay = max(min(delays, default=math.inf), MIN_STEP.total_seconds())
+        if math.isinf(delay):
+            return datetime.max.replace(tzinfo=now.tzinfo)
+        return now + timedelta(seconds=delay)
+
+    def _apply(self, event: TimelineEvent, start: datetime, outage: bool) -> None:
+        """Apply a scripted event to the stand-in API."""
+        if isinstance(event, StatusChange):
+            self.api.set_status(event.partition, event.area, event.status)
+            # Every change is a new publication
+            self.api.timestamp = (start + event.at).isoformat()
+        elif isinstance(event, Publication):
+            published = event.at if event.published is None else event.published
+            self.api.timestamp = (start + published).isoformat()
+        else:
+            self.api.fail_every = 1 if outage else 0
+
+    async def async_run(self, duration: timedelta, timeline: Sequence[TimelineEvent] = ()) -> SimulationReport:
+        """Advance the virtual clock by ``duration``, applying ``timeline`` on the way."""
+        start = dt_util.utcnow()
+        end = start + duration
+        # (offset, order, event, starts an outage)
+        pending: List[Tuple[timedelta, int, TimelineEvent, bool]] = []
+        for order, event in enumerate(timeline):
+            pending.append((event.at, order, event, True))
+            if isinstance(event, Outage):
+                pending.append((event.end, order, event, False))
+        pending.sort(key=lambda item: (item[0], item[1]))
+
+        transitions = [Transition(event) for event in timeline if isinstance(event, StatusChange)]
+        transition_of = {id(transition.change): transition for transition in transitions}
+        open_transitions: Dict[Tuple[str, str], Transition] = {}
+        # Served timestamps by the offset they appeared at, until a poll fetches them
+        open_publications: Dict[str, timedelta] = {}
+        publication_delays: Dict[str, Optional[timedelta]] = {}
+        state_writes = 0
+        requests_before = self.api.requests
+        failed_before = self.api.responses_by_status[503]
+
+        @callback
+        def _count_state_write(event: Event) -> None:
+            nonlocal state_writes
+            state_writes += 1
+
+        def _make_listener(coordinator: Any):
+            @callback
+            def _detect() -> None:
+                snapshot = coordinator.snapshot
+                if snapshot is None:
+                    return
+                offset = dt_util.utcnow() - start
+                if snapshot.timestamp_raw in open_publications:
+                    appeared = open_publications.pop(snapshot.timestamp_raw)
+                    publication_delays[snapshot.timestamp_raw] = offset - appeared
+                for area in list(snapshot.statuses):
+                    transition = open_transitions.get((coordinator.partition_key, area))
+                    if transition is not None and snapshot.statuses[area] == transition.change.status:
+                        transition.detected_at = offset
+                        del open_transitions[(coordinator.partition_key, area)]
+
+            return _detect
+
+        unsubs = [self.hass.bus.async_listen("state_changed", _count_state_write)]
+        unsubs.extend(
+            coordinator.async_add_listener(_make_listener(coordinator)) for coordinator in self.coordinators
+        )
+        iterations = 0
+        # Debug mode captures a traceback for every callback; over thousands
+        # of jumps that costs more than the simulated work itself
+        debug = self.hass.loop.get_debug()
+        self.hass.loop.set_debug(False)
+        try:
+            now = start
+            while now < end:
+                target = min(self._next_timer(now), end)
+                if pending:
+                    target = min(target, start + pending[0][0])
+                if target > now:
+                    self.freezer.move_to(target)
+                    now = target
+                while pending and start + pending[0][0] <= now:
+                    _, _, event, begins = pending.pop(0)
+                    self._apply(event, start, begins)
+                    if isinstance(event, (StatusChange, Publication)) and self.api.timestamp not in publication_delays:
+                        open_publications[self.api.timestamp] = event.at
+                        publication_delays[self.api.timestamp] = None
+                    if isinstance(event, StatusChange):
+                        # A newer change of the same area supersedes an undetected one
+                        open_transitions[(event.partition, event.area)] = transition_of[id(event)]
+                # The freezer moves loop.time() too, so due timers run on the
+                # next loop iteration without async_fire_time_changed's patching
+                await asyncio.sleep(0)
+                await self.hass.async_block_till_done()
+                iterations += 1
+        finally:
+            self.hass.loop.set_debug(debug)
+            for unsub in unsubs:
+                unsub()
+
+        return SimulationReport(
+            simulated=duration,
+            requests=self.api.requests - requests_before,
+            failed_requests=self.api.responses_by_status[503] - failed_before,
+            state_writes=state_writes,
+            iterations=iterations,
+            transitions=transitions,
+            publication_delays=list(publication_delays.values()),
+        )
+
+    async def async_unload(self) -> None:
+        """Unload all config entries."""
+        for entry in self.entries:
+            await self.hass.config_entries.async_unload(entry.entry_id)
+        await self.hass.async_block_till_done()
@@ -0,0 +1,157 @@
+"""Local stand-in for the Lake Constance Storm Checker API used by tests."""
+import asyncio
+import json
+import time
+from collections import Counter
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from aiohttp import web
+
+API_ENDPOINT = "/api/get-latest-status"
+AREAS = ("west", "center", "east")
+
+
+def rich_area(status: str, speed: float, gust: float, forecast_hours: int = 24) -> Dict[str, Any]:
+    """Return a rich per-area object with warning metadata and a wind forecast."""
+    return {
+        "status": status,
+        "windSpeed": speed,
+        "windGust": gust,
+        "windDirection": 250,
+        "warning": {
+            "issuedAt": "2025-01-20T17:00:00+0200",
+            "validUntil": "2025-01-20T23:00:00+0200",
+            "lights": "flashing 90/min" if status == "StormWarning" else "flashing 40/min",
+            "text": f"{status} in effect for the area.",
+        },
+        "forecast": [
+            {"hour": hour, "windSpeed": speed + hour % 5, "windGust": gust + hour % 7, "direction": 250}
+            for hour in range(forecast_hours)
+        ],
+    }
+
+
+class StandInApi:
+    """Serve ``/api/get-latest-status`` from in-memory state on localhost.
+
+    Statuses are kept per partition key and can be changed between polls.
+    Every request is counted, so tests can assert on request rates.
+    """
+
+    def __init__(self, codes: Optional[Iterable[str]] = None) -> None:
+        """Initialize the stand-in API.
+
+        ``codes`` restricts the accepted API codes; ``None`` accepts any.
+        """
+        self.codes = set(codes) if codes is not None else None
+        self.statuses: Dict[str, Dict[str, str]] = {}
+        # (speed, gust) per area of a partition, served in rich mode
+        self.wind: Dict[str, Dict[str, Tuple[float, float]]] = {}
+        self.timestamp = "2025-01-20T17:27:14+0200"
+        self.delay = 0.0
+        # Answer every ``fail_every``-th request with a 503; 0 never fails
+        self.fail_every = 0
+        # Quota enforcement: ``quota`` requests per ``quota_window`` seconds
+        self.quota: Optional[int] = None
+        self.quota_window = 60.0
+        self.send_rate_limit_headers = True
+        self._window_start = 0.0
+        self._window_requests = 0
+        self.requests = 0
+        self.responses_by_status: Counter = Counter()
+        self.requests_by_partition: Counter = Counter()
+        self.rich_requests = 0
+        self._runner: Optional[web.AppRunner] = None
+        self.base_url = ""
+
+    def set_status(self, partition_key: str, area: str, status: str) -> None:
+        """Set the status served for one area of a partition."""
+        self.statuses.setdefault(partition_key, dict.fromkeys(AREAS, "noWarning"))[area] = status
+
+    def set_wind(self, partition_key: str, area: str, speed: float, gust: float) -> None:
+        """Set the wind served for one area of a partition in rich mode."""
+        self.wind.setdefault(partition_key, {})[area] = (speed, gust)
+
+    def payload(self, partition_key: str, simple: bool = True) -> Dict[str, Any]:
+        """Return the simple or rich payload for a partition."""
+        statuses = self.statuses.get(partition_key) or dict.fromkeys(AREAS, "noWarning")
+        if simple:
+            return {"partitionKey": partition_key, "timestamp": self.timestamp, **statuses}
+        wind = self.wind.get(partition_key, {})
+        return {
+            "partitionKey": partition_key,
+            "timestamp": self.timestamp,
+            **{area: rich_area(statuses[area], *wind.get(area, (0.0, 0.0))) for area in AREAS},
+        }
+
+    async def async_start(self) -> str:
+        """Start serving on a free localhost port and return the base URL."""
+        app = web.Application()
+        app.router.add_get(API_ENDPOINT, self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self.base_url = f"http://127.0.0.1:{port}"
+        return self.base_url
+
+    async def async_stop(self) -> None:
+        """Stop serving."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def _respond(
+        self,
+        status: int,
+        body: str,
+        content_type: str = "application/json",
+        headers: Optional[Dict[str, str]] = None,
+    ) -> web.Response:
+        """Build a response and count it."""
+        self.responses_by_status[status] += 1
+        return web.Response(status=status, text=body, content_type=content_type, headers=headers)
+
+    def _check_quota(self) -> Optional[Dict[str, str]]:
+        """Count a request against the quota and return rate-limit headers.
+
+        Returns ``None`` when no quota is configured.
+        """
+        if self.quota is None:
+            return None
+        now = time.time()
+        if now - self._window_start >= self.quota_window:
+            self._window_start = now
+            self._window_requests = 0
+        self._window_requests += 1
+        reset = max(0, int(self._window_start + self.quota_window - now))
+        headers = {}
+        if self.send_rate_limit_headers:
+            headers = {
+                "X-RateLimit-Limit": str(self.quota),
+                "X-RateLimit-Remaining": str(max(0, self.quota - self._window_requests)),
+                "X-RateLimit-Reset": str(reset),
+            }
+        if self._window_requests > self.quota:
+            headers["Retry-After"] = str(reset)
+        return headers
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        """Handle one status request."""
+        self.requests += 1
+        partition_key = request.query.get("partitionKey", "")
+        self.requests_by_partition[partition_key] += 1
+        simple = request.query.get("simple", "true") != "false"
+        if not simple:
+            self.rich_requests += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.fail_every and self.requests % self.fail_every == 0:
+            return self._respond(503, json.dumps({"error": "unavailable"}))
+        headers = self._check_quota()
+        if headers is not None and "Retry-After" in headers:
+            return self._respond(429, json.dumps({"error": "quota exceeded"}), headers=headers)
+        if self.codes is not None and request.query.get("code") not in self.codes:
+            return self._respond(401, json.dumps({"error": "invalid code"}), headers=headers)
+        return self._respond(200, json.dumps(self.payload(partition_key, simple)), headers=headers)
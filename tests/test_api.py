@@ -0,0 +1,114 @@
+"""Tests for the standalone Lake Constance Storm Checker API client."""
+import json
+from typing import List
+
+import aiohttp
+import pytest
+
+from custom_components.lake_constance_storm_checker.api import (
+    AiohttpTransport,
+    ApiAuthError,
+    ApiConnectionError,
+    ApiError,
+    ApiRateLimitedError,
+    ApiRequest,
+    ApiResponseError,
+    LakeConstanceApiClient,
+    RawResponse,
+    decode_response,
+)
+from custom_components.lake_constance_storm_checker.ratelimit import TokenBucket
+
+from .standin_api import StandInApi
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+class FakeTransport:
+    """Transport returning canned responses and recording requests."""
+
+    def __init__(self, *responses: RawResponse) -> None:
+        """Initialize the transport."""
+        self.responses = list(responses)
+        self.requests: List[ApiRequest] = []
+
+    async def async_fetch(self, request: ApiRequest) -> RawResponse:
+        """Return the next canned response."""
+        self.requests.append(request)
+        return self.responses.pop(0)
+
+
+def _json_response(payload, status: int = 200) -> RawResponse:
+    """Build a JSON response."""
+    return RawResponse(status=status, headers=JSON_HEADERS, body=json.dumps(payload).encode(), received_at=0.0)
+
+
+async def test_get_status_decodes_payload() -> None:
+    """Test a successful request without Home Assistant."""
+    transport = FakeTransport(
+        _json_response({"west": "StormWarning", "center": "noWarning", "timestamp": "2025-01-20T17:27:14+0200"})
+    )
+    client = LakeConstanceApiClient("https://api.example.com/", "code", transport, partition_key="obersee")
+
+    result = await client.async_get_status()
+
+    assert result.statuses == {"west": "StormWarning", "center": "noWarning", "east": "UnknownStatus"}
+    assert result.timestamp == "2025-01-20T17:27:14+0200"
+    request = transport.requests[0]
+    assert request.url == "https://api.example.com/api/get-latest-status"
+    assert request.params == {"code": "code", "partitionKey": "obersee", "simple": "true"}
+
+
+@pytest.mark.parametrize(
+    ("response", "error"),
+    [
+        (_json_response({"error": "invalid code"}, status=401), ApiAuthError),
+        (_json_response({"error": "quota"}, status=429), ApiRateLimitedError),
+        (_json_response({}, status=500), ApiResponseError),
+        (RawResponse(status=200, headers={"Content-Type": "text/html"}, body=b"<html>"), ApiResponseError),
+        (RawResponse(status=200, headers=JSON_HEADERS, body=b"{not json"), ApiResponseError),
+        (_json_response(["west"]), ApiResponseError),
+    ],
+)
+def test_decode_errors(response: RawResponse, error: type) -> None:
+    """Test unusable responses map to typed errors."""
+    with pytest.raises(error):
+        decode_response(response)
+
+
+async def test_unexpected_transport_error_is_wrapped() -> None:
+    """Test arbitrary transport failures surface as API errors."""
+
+    class BrokenTransport:
+        async def async_fetch(self, request: ApiRequest) -> RawResponse:
+            raise RuntimeError("boom")
+
+    client = LakeConstanceApiClient("https://api.example.com", "code", BrokenTransport())
+    with pytest.raises(ApiError, match="boom"):
+        await client.async_fetch_raw()
+
+
+async def test_aiohttp_transport_against_standin(socket_enabled) -> None:
+    """Test the HTTP transport end to end with a plain aiohttp session."""
+    api = StandInApi(codes={"good"})
+    api.set_status("lakeConstance", "east", "StrongWindWarning")
+    await api.async_start()
+    try:
+        async with aiohttp.ClientSession() as session:
+            limiter = TokenBucket()
+            transport = AiohttpTransport(session, limiter)
+            result = await LakeConstanceApiClient(api.base_url, "good", transport).async_get_status()
+            assert result.statuses["east"] == "StrongWindWarning"
+
+            with pytest.raises(ApiAuthError):
+                await LakeConstanceApiClient(api.base_url, "bad", transport).async_get_status()
+
+            transport.max_body_size = 10
+            with pytest.raises(ApiResponseError):
+                await LakeConstanceApiClient(api.base_url, "good", transport).async_fetch_raw()
+    finally:
+        await api.async_stop()
+
+    async with aiohttp.ClientSession() as session:
+        with pytest.raises(ApiConnectionError):
+            await LakeConstanceApiClient(api.base_url, "good", AiohttpTransport(session)).async_fetch_raw()
@@ -0,0 +1,86 @@
+"""Tests for setting up entries without waiting for the first refresh."""
+import asyncio
+import time
+from datetime import timedelta
+
+import pytest
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import STATE_UNAVAILABLE
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import MockConfigEntry, async_fire_time_changed
+
+from custom_components.lake_constance_storm_checker.const import (
+    DOMAIN,
+    CONF_BASE_URL,
+    CONF_API_CODE,
+    CONF_BACKGROUND_REFRESH,
+    BACKGROUND_RETRY_DELAY,
+)
+
+from .standin_api import StandInApi
+
+SLOW_API_DELAY = 1.0  # seconds
+
+WEST_STATUS = "sensor.lake_constance_west_status"
+
+
+async def _timed_setup(hass: HomeAssistant, api: StandInApi, background: bool) -> tuple:
+    """Set up an entry and return it with the seconds setup took."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_BASE_URL: api.base_url, CONF_API_CODE: "code"},
+        options={CONF_BACKGROUND_REFRESH: background},
+        version=6,
+    )
+    entry.add_to_hass(hass)
+    start = time.perf_counter()
+    await hass.config_entries.async_setup(entry.entry_id)
+    return entry, time.perf_counter() - start
+
+
+async def _wait_for_requests(api: StandInApi, count: int) -> None:
+    """Wait until the stand-in API has answered ``count`` requests."""
+    while sum(api.responses_by_status.values()) < count:
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.parametrize("standin_api", [{"codes": {"code"}}], indirect=True, ids=["code"])
+async def test_setup_time_against_slow_api(hass: HomeAssistant, standin_api: StandInApi) -> None:
+    """Test background mode sets up entities without waiting for a slow API."""
+    standin_api.delay = SLOW_API_DELAY
+    standin_api.set_status("lakeConstance", "west", "StormWarning")
+
+    _, blocking_seconds = await _timed_setup(hass, standin_api, background=False)
+    entry, background_seconds = await _timed_setup(hass, standin_api, background=True)
+
+    assert blocking_seconds >= SLOW_API_DELAY
+    assert background_seconds < SLOW_API_DELAY / 2
+    assert entry.state is ConfigEntryState.LOADED
+    # Entities exist right away and are pending until the first response
+    assert hass.states.get(f"{WEST_STATUS}_2").state == STATE_UNAVAILABLE
+
+    await asyncio.wait_for(_wait_for_requests(standin_api, 2), 5)
+    await hass.async_block_till_done()
+    assert hass.states.get(f"{WEST_STATUS}_2").state == "StormWarning"
+
+
+@pytest.mark.parametrize("standin_api", [{"codes": {"code"}}], indirect=True, ids=["code"])
+async def test_unreachable_at_startup_is_retried(hass: HomeAssistant, standin_api: StandInApi) -> None:
+    """Test a failing first refresh is retried instead of raising ConfigEntryNotReady."""
+    standin_api.codes = set()
+    entry, _ = await _timed_setup(hass, standin_api, background=True)
+    await asyncio.wait_for(_wait_for_requests(standin_api, 1), 5)
+    await hass.async_block_till_done()
+
+    assert entry.state is ConfigEntryState.LOADED
+    assert standin_api.responses_by_status[401] == 1
+    assert hass.states.get(WEST_STATUS).state == STATE_UNAVAILABLE
+
+    standin_api.codes = None
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=BACKGROUND_RETRY_DELAY))
+    await asyncio.wait_for(_wait_for_requests(standin_api, 2), 5)
+    await hass.async_block_till_done()
+
+    assert standin_api.responses_by_status[200] == 1
+    assert hass.states.get(WEST_STATUS).state == "noWarning"
@@ -0,0 +1,113 @@
+"""Tests for aligning polls to the upstream publish cadence."""
+import os
+import random
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from custom_components.lake_constance_storm_checker.cadence import PublishCadence
+from custom_components.lake_constance_storm_checker.const import ALIGN_MARGIN, CONF_ALIGN_POLLS
+
+from .sim_harness import Publication, SimulationHarness, SimulationReport
+from .standin_api import StandInApi
+
+HOUR = timedelta(hours=1)
+DAY = timedelta(days=1)
+START = datetime(2025, 6, 1, tzinfo=timezone.utc)
+
+
+def _hourly(jitter: float, seed: int = 44, hours: int = 12) -> List[datetime]:
+    """Return hourly publication times, each late by up to ``jitter`` seconds."""
+    rng = random.Random(seed)
+    return [START + hour * HOUR + timedelta(seconds=rng.uniform(0, jitter)) for hour in range(hours)]
+
+
+def test_needs_enough_publications() -> None:
+    """Test no prediction is made before enough distinct publications were seen."""
+    cadence = PublishCadence()
+    times = _hourly(0, hours=4)
+    for published in times:
+        assert cadence.observe(published)
+        # Repeated polls of the same publication are not new ones
+        assert not cadence.observe(published)
+    assert cadence.next_poll() is None
+
+    assert cadence.observe(times[-1] + HOUR)
+    assert cadence.period == pytest.approx(3600)
+    assert cadence.next_poll() == pytest.approx((times[-1] + 2 * HOUR).timestamp() + ALIGN_MARGIN)
+
+
+def test_estimate_tolerates_jitter_and_outliers() -> None:
+    """Test missed and late publications do not drag the period or phase."""
+    times = _hourly(30)
+    del times[5]  # upstream skipped a publication
+    times[8] += timedelta(minutes=20)  # and published one very late
+    cadence = PublishCadence()
+    for published in times:
+        cadence.observe(published)
+
+    assert cadence.confident
+    assert cadence.period == pytest.approx(3600, abs=15)
+    # Next expected publication is 12:00 plus the typical lateness
+    next_poll = datetime.fromtimestamp(cadence.next_poll(), timezone.utc)
+    assert START + 12 * HOUR < next_poll < START + 12 * HOUR + timedelta(seconds=30 + 2 * 30 + ALIGN_MARGIN)
+
+
+def test_irregular_timestamps_are_not_trusted() -> None:
+    """Test publications without a cadence leave polling alone."""
+    rng = random.Random(4)
+    cadence = PublishCadence()
+    published = START
+    for _ in range(12):
+        published += timedelta(minutes=rng.uniform(5, 120))
+        cadence.observe(published)
+
+    assert not cadence.confident
+    assert cadence.next_poll() is None
+
+
+def _day_of_publications(seed: int) -> List[Publication]:
+    """Return a day of hourly publications that appear up to 30 s late, one hour skipped."""
+    rng = random.Random(seed)
+    return [
+        Publication(hour * HOUR + timedelta(seconds=rng.uniform(0, 30)))
+        for hour in range(24)
+        if hour != 13
+    ]
+
+
+async def _simulate(hass: HomeAssistant, freezer, api: StandInApi, align: bool) -> SimulationReport:
+    """Learn the cadence for a day, then measure a second day."""
+    harness = SimulationHarness(hass, freezer, api)
+    await harness.async_load_entry(options={CONF_ALIGN_POLLS: align})
+    try:
+        await harness.async_run(DAY, _day_of_publications(1))
+        return await harness.async_run(DAY, _day_of_publications(2))
+    finally:
+        await harness.async_unload()
+
+
+async def test_aligned_polls_fetch_fresher_data_with_fewer_requests(
+    hass: HomeAssistant, freezer, standin_api: StandInApi
+) -> None:
+    """Test polls aligned to the cadence see publications sooner and poll less."""
+    # Publications land mid-way between fixed-phase polls, the average case
+    freezer.move_to((dt_util.utcnow() + DAY).replace(hour=0, minute=2, second=30, microsecond=0))
+    wall_start = os.times().elapsed
+    fixed = await _simulate(hass, freezer, standin_api, align=False)
+    aligned = await _simulate(hass, freezer, standin_api, align=True)
+    print(f"fixed phase: {fixed.summary()}")
+    print(f"aligned: {aligned.summary()}")
+    print(f"in {os.times().elapsed - wall_start:.1f}s")
+
+    assert None not in fixed.publication_delays
+    assert None not in aligned.publication_delays
+    # Fixed phase: about half an interval, polling every 5 minutes
+    assert fixed.requests == pytest.approx(DAY / timedelta(minutes=5), abs=1)
+    assert fixed.mean_publication_delay > timedelta(minutes=2)
+    # Aligned: right after each publication, plus a few polls for the skipped one
+    assert aligned.mean_publication_delay < fixed.mean_publication_delay / 2
+    assert aligned.requests < fixed.requests / 4
@@ -0,0 +1,253 @@
+"""Tests for the Lake Constance Storm Checker config and options flows."""
+from datetime import timedelta
+from unittest.mock import patch
+
+from homeassistant import config_entries
+from homeassistant.core import HomeAssistant
+from homeassistant.data_entry_flow import FlowResultType
+from homeassistant.helpers import entity_registry as er
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.lake_constance_storm_checker.api import ApiConnectionError
+from custom_components.lake_constance_storm_checker.const import (
+    DOMAIN,
+    CONF_BASE_URL,
+    CONF_API_CODE,
+    CONF_SCAN_INTERVAL,
+    CONF_CONNECT_TIMEOUT,
+    CONF_READ_TIMEOUT,
+    CONF_TOTAL_TIMEOUT,
+    CONF_MAX_BODY_SIZE,
+    CONF_AREAS,
+    CONF_CONFIRM_COUNT,
+    CONF_CONFIRM_WINDOW,
+    CONF_PARTITION_KEY,
+    DATA_SESSION,
+    AREAS,
+    PARTITION_KEY,
+)
+
+MOCK_DATA = {
+    "partitionKey": "lakeConstance",
+    "timestamp": "2025-01-20T17:27:14+0200",
+    "west": "noWarning",
+    "center": "StrongWindWarning",
+    "east": "StormWarning",
+}
+
+OPTIONS_INPUT = {
+    CONF_SCAN_INTERVAL: 120,
+    CONF_CONNECT_TIMEOUT: 3,
+    CONF_READ_TIMEOUT: 5,
+    CONF_TOTAL_TIMEOUT: 8,
+    CONF_MAX_BODY_SIZE: 4096,
+    CONF_AREAS: ["west", "east"],
+}
+
+
+async def _setup_entry(hass: HomeAssistant) -> MockConfigEntry:
+    """Set up a config entry with mocked API data."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_BASE_URL: "https://api.example.com", CONF_API_CODE: "test-api-code"},
+        version=6,
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    return entry
+
+
+async def test_options_flow_applies_in_place(hass: HomeAssistant) -> None:
+    """Test that saving options updates the running coordinator without a reload."""
+    with patch(
+        "custom_components.lake_constance_storm_checker.LakeConstanceStormCheckerCoordinator._async_update_data",
+        return_value=MOCK_DATA,
+    ) as mock_update:
+        entry = await _setup_entry(hass)
+        coordinator = hass.data[DOMAIN][entry.entry_id]
+        refreshes = mock_update.call_count
+
+        result = await hass.config_entries.options.async_init(entry.entry_id)
+        assert result["type"] == FlowResultType.FORM
+        assert result["step_id"] == "init"
+
+        result = await hass.config_entries.options.async_configure(
+            result["flow_id"], user_input=OPTIONS_INPUT
+        )
+        await hass.async_block_till_done()
+        assert result["type"] == FlowResultType.CREATE_ENTRY
+
+        # Same coordinator, no extra blocking refresh
+        assert hass.data[DOMAIN][entry.entry_id] is coordinator
+        assert mock_update.call_count == refreshes
+
+        assert coordinator.poll_interval == timedelta(seconds=120)
+        assert coordinator.timeout.connect == 3
+        assert coordinator.timeout.sock_read == 5
+        assert coordinator.timeout.total == 8
+        assert coordinator.max_body_size == 4096
+        assert coordinator.areas == ["west", "east"]
+
+        # Entity of the disabled area turns unavailable, aggregates ignore it
+        assert hass.states.get("sensor.lake_constance_center_status").state == "unavailable"
+        assert hass.states.get("sensor.lake_constance_east_status").state == "StormWarning"
+        assert hass.states.get("binary_sensor.lake_constance_strong_wind_warning").state == "off"
+
+
+async def test_options_flow_rejects_invalid_timeouts(hass: HomeAssistant) -> None:
+    """Test that a connect timeout above the total timeout is rejected."""
+    with patch(
+        "custom_components.lake_constance_storm_checker.LakeConstanceStormCheckerCoordinator._async_update_data",
+        return_value=MOCK_DATA,
+    ):
+        entry = await _setup_entry(hass)
+
+        result = await hass.config_entries.options.async_init(entry.entry_id)
+        result = await hass.config_entries.options.async_configure(
+            result["flow_id"],
+            user_input={**OPTIONS_INPUT, CONF_CONNECT_TIMEOUT: 20, CONF_TOTAL_TIMEOUT: 10},
+        )
+        assert result["type"] == FlowResultType.FORM
+        assert result["errors"] == {"base": "invalid_timeouts"}
+
+        result = await hass.config_entries.options.async_configure(
+            result["flow_id"], user_input={**OPTIONS_INPUT, CONF_AREAS: []}
+        )
+        assert result["type"] == FlowResultType.FORM
+        assert result["errors"] == {"base": "no_areas"}
+
+        result = await hass.config_entries.options.async_configure(
+            result["flow_id"],
+            user_input={**OPTIONS_INPUT, CONF_CONFIRM_COUNT: 3, CONF_CONFIRM_WINDOW: 2},
+        )
+        assert result["type"] == FlowResultType.FORM
+        assert result["errors"] == {"base": "invalid_confirmation"}
+
+
+async def test_migrate_legacy_unique_ids(hass: HomeAssistant) -> None:
+    """Test that the domain-wide unique IDs of a version 5 entry are scoped to the entry."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_BASE_URL: "https://api.example.com", CONF_API_CODE: "test-api-code"},
+        version=5,
+    )
+    entry.add_to_hass(hass)
+    registry = er.async_get(hass)
+    # Every entity a version 5 entry registered
+    suffixes = {
+        **{f"{area}_status": "sensor" for area in AREAS},
+        "last_update": "sensor",
+        **{f"{area}_warning": "binary_sensor" for area in AREAS},
+        "storm_warning": "binary_sensor",
+        "strong_wind_warning": "binary_sensor",
+    }
+    legacy = {
+        suffix: registry.async_get_or_create(platform, DOMAIN, f"{DOMAIN}_{suffix}", config_entry=entry).entity_id
+        for suffix, platform in suffixes.items()
+    }
+
+    with patch(
+        "custom_components.lake_constance_storm_checker.LakeConstanceStormCheckerCoordinator._async_update_data",
+        return_value=MOCK_DATA,
+    ):
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+    assert entry.version == 6
+    for suffix, entity_id in legacy.items():
+        assert registry.async_get(entity_id).unique_id == f"{entry.entry_id}_{suffix}"
+        assert hass.states.get(entity_id) is not None
+    unique_ids = [entity.unique_id for entity in er.async_entries_for_config_entry(registry, entry.entry_id)]
+    assert not [unique_id for unique_id in unique_ids if unique_id.startswith(f"{DOMAIN}_")]
+    # The set-up entities took over the migrated registry entries
+    assert len(unique_ids) == len(set(unique_ids)) == len(legacy)
+
+
+async def test_migration_keeps_entities_and_partition(hass: HomeAssistant) -> None:
+    """Test that migrated entities keep their entity IDs and the default partition is fetched."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_BASE_URL: "https://api.example.com", CONF_API_CODE: "test-api-code"},
+        version=5,
+    )
+    entry.add_to_hass(hass)
+    registry = er.async_get(hass)
+    legacy = registry.async_get_or_create(
+        "binary_sensor", DOMAIN, f"{DOMAIN}_storm_warning", config_entry=entry,
+        suggested_object_id="lake_constance_storm_warning",
+    )
+    # Unique IDs of other integrations' style are left alone
+    foreign = registry.async_get_or_create("sensor", DOMAIN, "custom_id", config_entry=entry)
+
+    with patch(
+        "custom_components.lake_constance_storm_checker.LakeConstanceStormCheckerCoordinator._async_update_data",
+        return_value=MOCK_DATA,
+    ):
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+    assert entry.version == 6
+    assert CONF_PARTITION_KEY not in entry.data
+    assert hass.data[DOMAIN][entry.entry_id].partition_key == PARTITION_KEY
+    assert registry.async_get(legacy.entity_id).unique_id == f"{entry.entry_id}_storm_warning"
+    assert registry.async_get(foreign.entity_id).unique_id == "custom_id"
+    # The set-up entity took over the migrated registry entry instead of adding a second one
+    storm_warnings = [
+        entity for entity in er.async_entries_for_config_entry(registry, entry.entry_id)
+        if entity.unique_id.endswith("_storm_warning") and entity.domain == "binary_sensor"
+    ]
+    assert [entity.entity_id for entity in storm_warnings] == ["binary_sensor.lake_constance_storm_warning"]
+    assert hass.states.get("binary_sensor.lake_constance_storm_warning").state == "on"
+
+
+async def test_entries_for_two_partitions(hass: HomeAssistant) -> None:
+    """Test that entries for two partitions set up side by side without unique ID clashes."""
+    entries = []
+    for partition_key in (PARTITION_KEY, "otherLake"):
+        entry = MockConfigEntry(
+            domain=DOMAIN,
+            data={
+                CONF_BASE_URL: "https://api.example.com",
+                CONF_API_CODE: "test-api-code",
+                CONF_PARTITION_KEY: partition_key,
+            },
+            version=6,
+        )
+        entry.add_to_hass(hass)
+        entries.append(entry)
+
+    with patch(
+        "custom_components.lake_constance_storm_checker.LakeConstanceStormCheckerCoordinator._async_update_data",
+        return_value=MOCK_DATA,
+    ):
+        # Setting up the integration sets up both entries
+        assert await hass.config_entries.async_setup(entries[0].entry_id)
+        await hass.async_block_till_done()
+
+    registry = er.async_get(hass)
+    unique_ids = [
+        {entity.unique_id for entity in er.async_entries_for_config_entry(registry, entry.entry_id)}
+        for entry in entries
+    ]
+    assert unique_ids[0] and unique_ids[1]
+    assert not unique_ids[0] & unique_ids[1]
+    assert [hass.data[DOMAIN][entry.entry_id].partition_key for entry in entries] == [PARTITION_KEY, "otherLake"]
+
+
+async def test_connection_test_releases_session(hass: HomeAssistant) -> None:
+    """Test the connection test closes the shared session again when no entry uses it."""
+    result = await hass.config_entries.flow.async_init(DOMAIN, context={"source": config_entries.SOURCE_USER})
+    with patch(
+        "custom_components.lake_constance_storm_checker.api.LakeConstanceApiClient.async_get_status",
+        side_effect=ApiConnectionError("unreachable"),
+    ) as get_status:
+        result = await hass.config_entries.flow.async_configure(
+            result["flow_id"], {CONF_BASE_URL: "https://api.example.com", CONF_API_CODE: "test-api-code"}
+        )
+
+    assert get_status.call_count == 1
+    assert result["errors"] == {"base": "cannot_connect"}
+    session_manager = hass.data[DATA_SESSION]
+    assert session_manager._users == 0
+    assert session_manager._session is None or session_manager._session.closed
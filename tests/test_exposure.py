@@ -0,0 +1,121 @@
+"""Tests for the sliding-window warning exposure sensors."""
+import random
+from datetime import timedelta
+from typing import List, Tuple
+
+import pytest
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.lake_constance_storm_checker.const import (
+    DOMAIN,
+    CONF_BASE_URL,
+    CONF_API_CODE,
+    CONF_EXPOSURE,
+    ATTR_OBSERVED_HOURS,
+)
+from custom_components.lake_constance_storm_checker.exposure import SlidingShare, WarningExposure
+
+from .standin_api import StandInApi
+
+
+def _brute_force(segments: List[Tuple[float, float, bool]], window: float, now: float) -> Tuple[float, float]:
+    """Return the active and observed seconds in the window by clipping every segment."""
+    active = observed = 0.0
+    for start, end, is_active in segments:
+        overlap = max(0.0, min(end, now) - max(start, now - window))
+        observed += overlap
+        if is_active:
+            active += overlap
+    return active, observed
+
+
+def test_sliding_share_matches_brute_force() -> None:
+    """Test the incremental sums match recomputing the window from scratch."""
+    rng = random.Random(48)
+    share = SlidingShare(3600)
+    segments = []
+    now = 0.0
+    for _ in range(2000):
+        start = now + (rng.uniform(0, 3000) if rng.random() < 0.05 else 0.0)
+        now = start + rng.uniform(1, 600)
+        active = rng.random() < 0.3
+        share.add(start, now, active)
+        segments.append((start, now, active))
+        assert share.totals(now) == pytest.approx(_brute_force(segments, 3600, now), abs=1e-6)
+    # Only segments still in the window are kept
+    assert len(share.segments()) <= 3600
+
+
+async def test_gaps_are_not_observed(hass: HomeAssistant) -> None:
+    """Test long gaps without updates do not count towards any share."""
+    exposure = WarningExposure(hass, f"{DOMAIN}.exposure.test", windows={"1h": 3600}, max_gap=600)
+    exposure.async_observe(0, {"east": "StormWarning"})
+    exposure.async_observe(300, {"east": "noWarning"})
+    assert exposure.share("east", "1h") == 1.0
+    # Stopped for 25 minutes
+    exposure.async_observe(1800, {"east": "noWarning"})
+    assert exposure.share("east", "1h") == 1.0
+    assert exposure.observed("east", "1h") == 300
+    exposure.async_observe(2100, {"east": "noWarning"})
+    assert exposure.share("east", "1h") == pytest.approx(0.5)
+    assert exposure.share("west", "1h") == 0.0
+
+
+async def test_exposure_sensors_survive_restart(
+    hass: HomeAssistant, standin_api: StandInApi, freezer: FrozenDateTimeFactory, hass_storage
+) -> None:
+    """Test shares over two hours of polls, and after a restart."""
+    start = dt_util.utcnow().replace(microsecond=0)
+    freezer.move_to(start)
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_BASE_URL: standin_api.base_url, CONF_API_CODE: "code"},
+        options={CONF_EXPOSURE: True},
+        version=6,
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+
+    # Polls a minute apart keep the stand-in's keep-alive connection open;
+    # storm warning in the east from minute 90 to 105
+    for minute in range(1, 121):
+        if minute == 90:
+            standin_api.set_status("lakeConstance", "east", "StormWarning")
+        elif minute == 105:
+            standin_api.set_status("lakeConstance", "east", "noWarning")
+        freezer.move_to(start + timedelta(minutes=minute))
+        await coordinator.async_refresh()
+    await hass.async_block_till_done()
+
+    def _share(window: str) -> float:
+        return float(hass.states.get(f"sensor.lake_constance_east_warning_share_{window}").state)
+
+    assert _share("1h") == 25.0
+    assert _share("24h") == 12.5
+    assert _share("7d") == 12.5
+    assert hass.states.get("sensor.lake_constance_east_warning_share_7d").attributes[ATTR_OBSERVED_HOURS] == 2.0
+    assert hass.states.get("sensor.lake_constance_west_warning_share_24h").state == "0.0"
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    stored = hass_storage[f"{DOMAIN}.exposure.{entry.entry_id}"]["data"]
+    assert stored["segments"]["east"] == [
+        [start.timestamp(), (start + timedelta(minutes=90)).timestamp(), False],
+        [(start + timedelta(minutes=90)).timestamp(), (start + timedelta(minutes=105)).timestamp(), True],
+        [(start + timedelta(minutes=105)).timestamp(), (start + timedelta(minutes=120)).timestamp(), False],
+    ]
+
+    # Restarted five minutes later; the time in between still showed no warning
+    freezer.move_to(start + timedelta(minutes=125))
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    assert _share("1h") == 25.0
+    assert _share("24h") == 12.0
+
+    assert await hass.config_entries.async_remove(entry.entry_id)
+    await hass.async_block_till_done()
+    assert f"{DOMAIN}.exposure.{entry.entry_id}" not in hass_storage
@@ -0,0 +1,154 @@
+"""Tests for reading payloads a relay drops into a directory."""
+import asyncio
+import json
+import os
+from datetime import timedelta
+from pathlib import Path
+from typing import Optional
+from unittest.mock import patch
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import MockConfigEntry, async_fire_time_changed
+
+from custom_components.lake_constance_storm_checker.api import ApiConnectionError, ApiRequest
+from custom_components.lake_constance_storm_checker.const import (
+    DOMAIN,
+    CONF_BASE_URL,
+    CONF_API_CODE,
+    CONF_DROP_DIRECTORY,
+    DATA_RATE_LIMITERS,
+    DATA_SESSION,
+    DROP_POLL_INTERVAL,
+)
+from custom_components.lake_constance_storm_checker.filedrop import FileDropTransport
+from custom_components.lake_constance_storm_checker.scheduler import async_get_poll_scheduler
+
+EAST_STATUS = "sensor.lake_constance_east_status"
+REQUEST = ApiRequest("http://relay", "code")
+
+
+def _drop(directory: Path, name: str, east: str, mtime: Optional[int] = None) -> None:
+    """Drop a payload the way a relay does: write a hidden file, then move it into place."""
+    payload = {"partitionKey": "lakeConstance", "timestamp": dt_util.utcnow().isoformat(),
+               "west": "noWarning", "center": "noWarning", "east": east}
+    partial = directory / f".{name}.part"
+    partial.write_text(json.dumps(payload), encoding="utf-8")
+    if mtime is not None:
+        os.utime(partial, ns=(mtime, mtime))
+    partial.rename(directory / name)
+
+
+async def test_transport_reads_each_file_once(hass: HomeAssistant, tmp_path: Path) -> None:
+    """Test the newest file is read once and served again until a newer one lands."""
+    transport = FileDropTransport(hass, str(tmp_path))
+    with pytest.raises(ApiConnectionError):
+        await transport.async_fetch(REQUEST)
+
+    _drop(tmp_path, "a.json", "noWarning", mtime=1_000_000_000)
+    _drop(tmp_path, "b.json", "StormWarning", mtime=2_000_000_000)
+    # Not payloads
+    (tmp_path / "notes.txt").write_text("{}", encoding="utf-8")
+    (tmp_path / ".c.json").write_text("{}", encoding="utf-8")
+    assert await hass.async_add_executor_job(transport.has_new_file)
+
+    response = await transport.async_fetch(REQUEST)
+    assert json.loads(response.body)["east"] == "StormWarning"
+    assert transport.last_file == "b.json"
+    assert not await hass.async_add_executor_job(transport.has_new_file)
+    assert await transport.async_fetch(REQUEST) is response
+    assert transport.files_read == 1
+
+    # An older file landing late is not newer than the one read
+    _drop(tmp_path, "late.json", "noWarning", mtime=1_500_000_000)
+    assert not await hass.async_add_executor_job(transport.has_new_file)
+
+    _drop(tmp_path, "c.json", "StrongWindWarning", mtime=3_000_000_000)
+    response = await transport.async_fetch(REQUEST)
+    assert json.loads(response.body)["east"] == "StrongWindWarning"
+    assert transport.files_read == 2
+
+
+async def _setup(hass: HomeAssistant, directory: Path) -> MockConfigEntry:
+    """Set up an entry reading from a drop directory."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_BASE_URL: "http://relay", CONF_API_CODE: "code", CONF_DROP_DIRECTORY: str(directory)},
+        version=6,
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    return entry
+
+
+async def _wait_for_state(hass: HomeAssistant, entity_id: str, state: str) -> None:
+    """Wait up to five seconds of real time for an entity state."""
+    for _ in range(500):
+        if hass.states.get(entity_id).state == state:
+            return
+        await asyncio.sleep(0.01)
+    assert hass.states.get(entity_id).state == state
+
+
+async def test_inotify_feeds_new_files(hass: HomeAssistant, tmp_path: Path) -> None:
+    """Test a dropped file reaches the entities without any scheduled poll."""
+    _drop(tmp_path, "0001.json", "noWarning")
+    entry = await _setup(hass, tmp_path)
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    assert hass.states.get(EAST_STATUS).state == "noWarning"
+    assert coordinator.file_drop.mode == "inotify"
+    assert entry.entry_id not in async_get_poll_scheduler(hass).phase_offsets()
+    # Relayed entries hold neither the shared session nor a rate limiter
+    assert coordinator.session is None
+    assert coordinator.rate_limiter is None
+    assert not hass.data.get(DATA_RATE_LIMITERS)
+    assert DATA_SESSION not in hass.data or hass.data[DATA_SESSION]._users == 0
+
+    _drop(tmp_path, "0002.json", "StormWarning")
+    await _wait_for_state(hass, EAST_STATUS, "StormWarning")
+    # Files written in place are picked up once they are closed
+    payload = json.loads((tmp_path / "0002.json").read_text(encoding="utf-8"))
+    payload["east"] = "StrongWindWarning"
+    (tmp_path / "0003.json").write_text(json.dumps(payload), encoding="utf-8")
+    await _wait_for_state(hass, EAST_STATUS, "StrongWindWarning")
+    assert coordinator.file_drop.as_dict()["files_read"] == 3
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    assert coordinator.file_drop.mode == "inotify"
+    assert coordinator.file_drop._descriptor is None
+
+
+async def test_scans_without_inotify(hass: HomeAssistant, tmp_path: Path) -> None:
+    """Test the directory is scanned for newer files where inotify is not available."""
+    _drop(tmp_path, "0001.json", "noWarning")
+    with patch(
+        "custom_components.lake_constance_storm_checker.filedrop._open_inotify",
+        side_effect=OSError("inotify is only available on Linux"),
+    ):
+        entry = await _setup(hass, tmp_path)
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    assert coordinator.file_drop.mode == "polling"
+
+    refreshes = 0
+    original_refresh = coordinator.file_drop._refresh
+
+    async def _count_refresh() -> None:
+        nonlocal refreshes
+        refreshes += 1
+        await original_refresh()
+
+    coordinator.file_drop._refresh = _count_refresh
+    # Scans without a new file do not refresh
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=DROP_POLL_INTERVAL))
+    await hass.async_block_till_done()
+    assert refreshes == 0
+
+    _drop(tmp_path, "0002.json", "StormWarning")
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=2 * DROP_POLL_INTERVAL))
+    await hass.async_block_till_done()
+    assert hass.states.get(EAST_STATUS).state == "StormWarning"
+    assert refreshes == 1
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
@@ -0,0 +1,145 @@
+"""Tests for the area spatial index and tracker warning sensors."""
+import random
+from unittest.mock import patch
+
+import pytest
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.lake_constance_storm_checker.const import (
+    DOMAIN,
+    CONF_BASE_URL,
+    CONF_API_CODE,
+    CONF_TRACKERS,
+    AREAS,
+)
+from custom_components.lake_constance_storm_checker.geo import (
+    AREA_POLYGONS,
+    AreaIndex,
+    get_area_index,
+    point_in_polygon,
+)
+
+MOCK_DATA = {
+    "partitionKey": "lakeConstance",
+    "timestamp": "2025-01-20T17:27:14+0200",
+    "west": "noWarning",
+    "center": "StormWarning",
+    "east": "noWarning",
+}
+
+MEERSBURG_FERRY = {"latitude": 47.62, "longitude": 9.40}  # center
+UEBERLINGEN = {"latitude": 47.75, "longitude": 9.15}  # west
+RAVENSBURG = {"latitude": 47.78, "longitude": 9.61}  # on land
+
+
+@pytest.mark.parametrize(
+    ("latitude", "longitude", "area"),
+    [
+        (47.68, 9.00, "west"),
+        (47.75, 9.15, "west"),
+        (47.62, 9.40, "center"),
+        (47.52, 9.65, "east"),
+        # Open water along the Swiss shore and in the Zeller See
+        (47.572, 9.392, "center"),
+        (47.545, 9.415, "center"),
+        (47.525, 9.44, "center"),
+        (47.49, 9.50, "center"),
+        (47.735, 8.975, "west"),
+        (47.78, 9.61, None),
+        (48.50, 11.00, None),
+    ],
+)
+def test_lookup_known_positions(latitude: float, longitude: float, area) -> None:
+    """Test lookups of positions in each area, on land and far away."""
+    assert get_area_index().lookup(latitude, longitude) == area
+
+
+@pytest.mark.parametrize(
+    ("latitude", "longitude"),
+    [
+        (float("nan"), 9.40),
+        (47.62, float("nan")),
+        (float("inf"), 9.40),
+        (47.62, float("-inf")),
+    ],
+)
+def test_lookup_non_finite_positions(latitude: float, longitude: float) -> None:
+    """Test that positions with NaN or infinite coordinates map to no area."""
+    assert get_area_index().lookup(latitude, longitude) is None
+
+
+def test_grid_matches_brute_force() -> None:
+    """Test the grid gives the same answer as testing every polygon."""
+    index = AreaIndex(cell_size=0.01)
+    rng = random.Random(35)
+    for _ in range(20000):
+        latitude, longitude = rng.uniform(47.40, 47.90), rng.uniform(8.80, 9.80)
+        matches = [
+            area for area, polygon in AREA_POLYGONS.items() if point_in_polygon((longitude, latitude), polygon)
+        ]
+        assert len(matches) <= 1
+        assert index.lookup(latitude, longitude) == (matches[0] if matches else None)
+
+
+async def test_tracker_warning_follows_position(hass: HomeAssistant) -> None:
+    """Test the tracker sensor maps positions to live statuses, looking up only on moves."""
+    hass.states.async_set("device_tracker.boat_1", "not_home", MEERSBURG_FERRY)
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_BASE_URL: "https://api.example.com", CONF_API_CODE: "test-api-code"},
+        options={CONF_TRACKERS: ["device_tracker.boat_1"]},
+        version=6,
+    )
+    entry.add_to_hass(hass)
+    data = dict(MOCK_DATA)
+    with patch(
+        "custom_components.lake_constance_storm_checker.LakeConstanceStormCheckerCoordinator._async_update_data",
+        side_effect=lambda: data,
+    ):
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+        coordinator = hass.data[DOMAIN][entry.entry_id]
+
+        state = hass.states.get("binary_sensor.lake_constance_warning_boat_1")
+        assert state.state == "on"
+        assert state.attributes["area"] == "center"
+        assert state.attributes["status"] == "StormWarning"
+
+        with patch.object(AreaIndex, "lookup", wraps=get_area_index().lookup) as lookup:
+            # A new status does not trigger a lookup
+            data = {**MOCK_DATA, "center": "noWarning"}
+            await coordinator.async_refresh()
+            await hass.async_block_till_done()
+            assert hass.states.get("binary_sensor.lake_constance_warning_boat_1").state == "off"
+            assert lookup.call_count == 0
+
+            # Moving does, once per move
+            hass.states.async_set("device_tracker.boat_1", "not_home", UEBERLINGEN)
+            await hass.async_block_till_done()
+            assert lookup.call_count == 1
+            assert hass.states.get("binary_sensor.lake_constance_warning_boat_1").attributes["area"] == "west"
+
+            # An unrelated attribute change does not
+            hass.states.async_set("device_tracker.boat_1", "not_home", {**UEBERLINGEN, "battery": 80})
+            await hass.async_block_till_done()
+            assert lookup.call_count == 1
+
+        hass.states.async_set("device_tracker.boat_1", "home", RAVENSBURG)
+        await hass.async_block_till_done()
+        state = hass.states.get("binary_sensor.lake_constance_warning_boat_1")
+        # Outside every outline is not reported as safe
+        assert state.state == "unknown"
+        assert state.attributes["area"] is None
+
+        # In a disabled area the sensor is unavailable, like the area's own entities
+        hass.states.async_set("device_tracker.boat_1", "not_home", MEERSBURG_FERRY)
+        coordinator.areas = ["west", "east"]
+        coordinator.async_update_listeners()
+        await hass.async_block_till_done()
+        assert hass.states.get("binary_sensor.lake_constance_warning_boat_1").state == "unavailable"
+        coordinator.areas = list(AREAS)
+
+        hass.states.async_set("device_tracker.boat_1", "home", {})
+        await hass.async_block_till_done()
+        assert hass.states.get("binary_sensor.lake_constance_warning_boat_1").state == "unknown"
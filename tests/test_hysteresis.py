@@ -0,0 +1,123 @@
+"""Tests for area status hysteresis."""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.lake_constance_storm_checker.const import (
+    DOMAIN,
+    CONF_BASE_URL,
+    CONF_API_CODE,
+    CONF_CONFIRM_COUNT,
+    CONF_CONFIRM_WINDOW,
+)
+from custom_components.lake_constance_storm_checker.diagnostics import (
+    async_get_config_entry_diagnostics,
+)
+from custom_components.lake_constance_storm_checker.snapshot import (
+    STATUS_NO_WARNING as NO,
+    STATUS_STORM_WARNING as STORM,
+    STATUS_STRONG_WIND_WARNING as STRONG,
+    STATUS_UNKNOWN as UNKNOWN,
+    StatusHysteresis,
+)
+
+from .standin_api import StandInApi
+
+START = datetime(2025, 6, 1, 12, 0, tzinfo=timezone.utc)
+POLL = timedelta(minutes=5)
+
+
+def _run(hysteresis: StatusHysteresis, timeline):
+    """Feed one status per poll for the center area and return the effective ones."""
+    return [
+        hysteresis.update({"center": status}, START + index * POLL)["center"]
+        for index, status in enumerate(timeline)
+    ]
+
+
+def test_disabled_passes_statuses_through() -> None:
+    """Test the default configuration applies every change."""
+    hysteresis = StatusHysteresis()
+    timeline = [NO, STRONG, NO, STORM, NO]
+
+    assert not hysteresis.enabled
+    assert _run(hysteresis, timeline) == timeline
+    assert hysteresis.as_dict()["suppressed_total"] == 0
+
+
+def test_min_dwell_holds_de_escalations() -> None:
+    """Test a lower status waits for the dwell time while escalations apply at once."""
+    hysteresis = StatusHysteresis(min_dwell=timedelta(minutes=12))
+
+    assert _run(hysteresis, [NO, STRONG, NO, NO, STORM, STRONG, NO, NO, NO]) == [
+        NO, STRONG, STRONG, STRONG, STORM, STORM, STORM, NO, NO,
+    ]
+    assert hysteresis.suppressed["center"] == 4
+
+
+@pytest.mark.parametrize(
+    ("timeline", "expected"),
+    [
+        # A bouncing status never confirms the lower level
+        ([NO, STRONG, NO, STRONG, NO, STRONG], [NO, STRONG, STRONG, STRONG, STRONG, STRONG]),
+        # Three of the last four polls confirm it
+        ([STRONG, NO, STRONG, NO, NO], [STRONG, STRONG, STRONG, STRONG, NO]),
+        # Lower levels count as confirmations
+        ([STORM, NO, NO, STRONG], [STORM, STORM, STORM, STRONG]),
+        # Unknown statuses are never held back
+        ([STORM, UNKNOWN, NO], [STORM, UNKNOWN, NO]),
+    ],
+)
+def test_n_of_m_confirmation(timeline, expected) -> None:
+    """Test de-escalations need three confirmations within four polls."""
+    hysteresis = StatusHysteresis(confirm_count=3, confirm_window=4)
+
+    assert _run(hysteresis, timeline) == expected
+
+
+def test_configure_keeps_history() -> None:
+    """Test changing the parameters keeps statuses and confirmation history."""
+    hysteresis = StatusHysteresis(confirm_count=2, confirm_window=3)
+    _run(hysteresis, [STORM, NO])
+
+    hysteresis.configure(timedelta(0), 2, 2)
+
+    assert hysteresis.statuses == {"center": STORM}
+    assert hysteresis.update({"center": NO}, START + POLL * 2) == {"center": NO}
+
+
+async def test_flapping_upstream_status(hass: HomeAssistant, standin_api: StandInApi) -> None:
+    """Test a bouncing upstream status does not flap the entity states."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_BASE_URL: standin_api.base_url, CONF_API_CODE: "code"},
+        options={CONF_CONFIRM_COUNT: 3, CONF_CONFIRM_WINDOW: 4},
+        version=6,
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+
+    changes = []
+    hass.bus.async_listen(
+        "state_changed",
+        lambda event: changes.append(event.data["new_state"].state)
+        if event.data["entity_id"] == "binary_sensor.lake_constance_center_warning"
+        else None,
+    )
+    for status in [STRONG, NO, STRONG, NO, STRONG]:
+        standin_api.set_status("lakeConstance", "center", status)
+        await coordinator.async_refresh()
+        await hass.async_block_till_done()
+        state = hass.states.get("sensor.lake_constance_center_status")
+        assert state.state == STRONG
+        assert state.attributes["raw_status"] == status
+
+    assert changes[0] == "on"
+    assert all(state == "on" for state in changes)
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+    assert diagnostics["hysteresis"]["suppressed_transitions"] == {"center": 2}
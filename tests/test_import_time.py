@@ -0,0 +1,91 @@
+"""Import-time budget for the integration, measured with ``python -X importtime``."""
+import subprocess
+import sys
+from pathlib import Path
+from typing import Set, Tuple
+
+import pytest
+
+ROOT = Path(__file__).parent.parent
+PACKAGE = "custom_components.lake_constance_storm_checker"
+
+# Modules Home Assistant has loaded before it imports any integration
+PRELOADED = (
+    "homeassistant.core",
+    "homeassistant.config_entries",
+    "homeassistant.const",
+    "homeassistant.exceptions",
+    "homeassistant.data_entry_flow",
+)
+
+# Cumulative import time in microseconds, with generous headroom for slow CI
+# machines; a regression that pulls in the coordinator stack or NumPy is
+# caught by the module checks below long before it hits these.
+IMPORT_BUDGETS_US = {
+    PACKAGE: 50_000,
+    f"{PACKAGE}.config_flow": 50_000,
+}
+
+# Only modules the preloads above do not import; aiohttp, voluptuous and
+# the config validation helpers are loaded by Home Assistant itself
+DEFERRED_MODULES = {
+    "numpy",
+    "homeassistant.helpers.update_coordinator",
+    f"{PACKAGE}.coordinator",
+    f"{PACKAGE}.api",
+    f"{PACKAGE}.session",
+    f"{PACKAGE}.recorder",
+    f"{PACKAGE}.scheduler",
+    f"{PACKAGE}.metrics",
+    f"{PACKAGE}.services",
+    f"{PACKAGE}.profiler",
+    f"{PACKAGE}.view",
+    f"{PACKAGE}.nowcast",
+}
+
+
+def _measure_import(module: str) -> Tuple[int, Set[str], Set[str]]:
+    """Import ``module`` in a fresh interpreter.
+
+    Returns its cumulative import time, the modules loaded by the preloads
+    and the modules it newly imported.
+    """
+    code = (
+        "import sys\n"
+        f"import {', '.join(PRELOADED)}\n"
+        "before = set(sys.modules)\n"
+        "print(' '.join(sorted(before)))\n"
+        f"import {module}\n"
+        "print(' '.join(sorted(set(sys.modules) - before)))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        check=True,
+        cwd=ROOT,
+        text=True,
+    )
+    cumulative = None
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2].strip() == module:
+            cumulative = int(fields[1])
+    assert cumulative is not None, f"{module} not found in -X importtime output"
+    baseline, imported = result.stdout.splitlines()
+    return cumulative, set(baseline.split()), set(imported.split())
+
+
+@pytest.mark.parametrize("module", list(IMPORT_BUDGETS_US))
+def test_import_time_budget(module: str) -> None:
+    """Test importing the integration stays within budget and defers heavy modules."""
+    cumulative, baseline, imported = _measure_import(module)
+
+    # A deferred module the preloads already imported would never show up
+    preloaded = sorted(baseline & DEFERRED_MODULES)
+    assert not preloaded, f"{preloaded} are loaded before the integration and cannot be deferred"
+    deferred = sorted(imported & DEFERRED_MODULES)
+    assert not deferred, f"Importing {module} eagerly imported {deferred}"
+    assert cumulative <= IMPORT_BUDGETS_US[module], (
+        f"Importing {module} took {cumulative / 1000:.1f}ms, budget {IMPORT_BUDGETS_US[module] / 1000:.1f}ms"
+    )
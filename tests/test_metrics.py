@@ -0,0 +1,84 @@
+"""Tests for the Prometheus metrics endpoint."""
+import time
+from http import HTTPStatus
+
+import pytest
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.lake_constance_storm_checker.const import (
+    DOMAIN,
+    CONF_BASE_URL,
+    CONF_API_CODE,
+    METRICS_URL,
+)
+from custom_components.lake_constance_storm_checker.metrics import Histogram
+
+from .standin_api import StandInApi
+
+
+def test_histogram_buckets_are_cumulative() -> None:
+    """Test observations land in the first bucket that fits and counts accumulate."""
+    histogram = Histogram((0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value)
+
+    assert histogram.cumulative() == [("0.1", 2), ("1.0", 3), ("+Inf", 4)]
+    assert histogram.sum == pytest.approx(3.65)
+
+
+@pytest.mark.parametrize("standin_api", [{"codes": {"code"}}], indirect=True, ids=["code"])
+async def test_metrics_endpoint(hass: HomeAssistant, standin_api: StandInApi, hass_client, hass_client_no_auth) -> None:
+    """Test the endpoint renders request, write and status metrics and requires auth."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_BASE_URL: standin_api.base_url, CONF_API_CODE: "code"},
+        version=6,
+    )
+    entry.add_to_hass(hass)
+    standin_api.set_status("lakeConstance", "east", "StormWarning")
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+
+    # Unchanged data does not write the 9 entity states again
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    assert coordinator.metrics.skipped_writes == 9
+    standin_api.set_status("lakeConstance", "west", "StrongWindWarning")
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    # West status and warning, the strong wind warning and the entities showing
+    # the full payload change; the center and east entities do not
+    assert coordinator.metrics.state_writes == 5
+    assert coordinator.metrics.skipped_writes == 13
+
+    standin_api.codes = set()
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    # Held back by the rate limiter: counted, but no request duration
+    coordinator.rate_limiter.blocked_until = time.time() + 60
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    assert coordinator.metrics.as_dict()["requests_total"] == 5
+
+    client = await hass_client()
+    response = await client.get(METRICS_URL)
+    assert response.status == HTTPStatus.OK
+    assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+    body = await response.text()
+
+    labels = f'entry_id="{entry.entry_id}",partition="lakeConstance"'
+    assert f'lake_constance_requests_total{{{labels},status="200"}} 3' in body
+    assert f'lake_constance_requests_total{{{labels},status="401"}} 1' in body
+    assert f'lake_constance_requests_total{{{labels},status="rate_limited"}} 1' in body
+    assert f'lake_constance_request_duration_seconds_bucket{{{labels},le="+Inf"}} 4' in body
+    assert f"lake_constance_decode_duration_seconds_count{{{labels}}} 3" in body
+    assert f"lake_constance_skipped_writes_total{{{labels}}} 13" in body
+    assert f"lake_constance_last_update_success{{{labels}}} 0" in body
+    assert f'lake_constance_area_warning_level{{{labels},area="east"}} 2' in body
+    assert body.count("# TYPE lake_constance_requests_total counter") == 1
+
+    client = await hass_client_no_auth()
+    response = await client.get(METRICS_URL)
+    assert response.status == HTTPStatus.UNAUTHORIZED
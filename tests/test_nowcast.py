@@ -0,0 +1,206 @@
+"""Tests for the storm warning nowcast."""
+import time
+import timeit
+from datetime import timedelta
+from typing import List
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.lake_constance_storm_checker.const import (
+    DOMAIN,
+    CONF_BASE_URL,
+    CONF_API_CODE,
+    CONF_NOWCAST_HORIZON,
+    ATTR_HORIZON_MINUTES,
+    ATTR_TRANSITIONS,
+    NOWCAST_HISTORY_STEPS,
+)
+from custom_components.lake_constance_storm_checker.nowcast import (
+    LEVELS,
+    UNOBSERVED,
+    TransitionModel,
+    WarningNowcast,
+    encode,
+)
+
+from .standin_api import StandInApi
+
+EAST_PROBABILITY = "sensor.lake_constance_east_storm_probability"
+WEST_PROBABILITY = "sensor.lake_constance_west_storm_probability"
+
+
+def _joint(west: int, center: int, east: int) -> int:
+    """Return the joint state of three area levels."""
+    return encode({"west": LEVELS[west], "center": LEVELS[center], "east": LEVELS[east]})
+
+
+def _simulate(matrix: np.ndarray, steps: int, seed: int) -> List[int]:
+    """Return a synthetic timeline of west levels drawn from a known chain."""
+    rng = np.random.default_rng(seed)
+    levels = [0]
+    for _ in range(steps - 1):
+        levels.append(int(rng.choice(3, p=matrix[levels[-1]])))
+    return levels
+
+
+def test_incremental_counts_match_recount() -> None:
+    """Test counts kept while steps are added and dropped equal counting the history again."""
+    rng = np.random.default_rng(49)
+    timeline = [int(state) for state in rng.integers(0, 27, size=500)]
+    for index in rng.choice(500, size=25, replace=False):
+        timeline[index] = UNOBSERVED
+    model = TransitionModel(capacity=100)
+    for start in range(0, 500, 7):
+        model.extend(timeline[start:start + 7])
+    recounted = TransitionModel(capacity=100)
+    recounted.load(timeline)
+
+    np.testing.assert_array_equal(model.counts, recounted.counts)
+    restored = TransitionModel(capacity=100)
+    restored.load([state for state, length in model.runs() for _ in range(length)])
+    np.testing.assert_array_equal(restored.counts, model.counts)
+
+
+def test_estimates_a_known_chain() -> None:
+    """Test the area chain and storm probability converge to those of the generating chain."""
+    true_west = np.array([[0.90, 0.08, 0.02], [0.20, 0.70, 0.10], [0.10, 0.30, 0.60]])
+    model = TransitionModel(capacity=NOWCAST_HISTORY_STEPS)
+    model.extend(_joint(level, 0, 0) for level in _simulate(true_west, NOWCAST_HISTORY_STEPS, seed=49))
+
+    np.testing.assert_allclose(model.area_matrices()[0], true_west, atol=0.03)
+    # Calm areas keep their level
+    np.testing.assert_allclose(model.area_matrices()[2], np.eye(3))
+
+    # Probability of a storm within six steps, with storms absorbing
+    absorbing = true_west.copy()
+    absorbing[2] = [0, 0, 1]
+    expected = np.linalg.matrix_power(absorbing, 6)[0, 2]
+    probabilities = model.storm_probabilities(_joint(0, 0, 0), 6)
+    assert probabilities[0] == pytest.approx(expected, abs=0.03)
+    assert probabilities[1] == 0.0
+    assert probabilities[2] == 0.0
+    assert model.storm_probabilities(_joint(2, 0, 0), 6)[0] == 1.0
+
+
+def test_storm_moving_across_the_lake() -> None:
+    """Test a storm in the west raises the east probability only through the joint chain."""
+    # Storms enter in the west and reach the east one step later
+    cycle = [_joint(0, 0, 0)] * 6 + [_joint(2, 0, 0), _joint(2, 1, 2), _joint(0, 0, 2)]
+    model = TransitionModel()
+    model.extend(cycle * 100)
+
+    east_after_west = model.storm_probabilities(_joint(2, 0, 0), 1)[2]
+    east_when_calm = model.storm_probabilities(_joint(0, 0, 0), 1)[2]
+    # The east chain alone gives the same probability for both states
+    independent_east = model.area_matrices()[2][0, 2]
+    assert east_after_west > 0.95
+    assert east_when_calm < 0.01
+    assert east_when_calm < independent_east < east_after_west
+
+
+def test_update_cost_is_bounded() -> None:
+    """Test an update with a full history costs the same small, fixed amount of work."""
+    model = TransitionModel()
+    rng = np.random.default_rng(49)
+    model.load([int(state) for state in rng.integers(0, 27, size=NOWCAST_HISTORY_STEPS)])
+
+    def _update() -> None:
+        model.extend([_joint(0, 1, 2)])
+        model.storm_probabilities(_joint(0, 1, 2), 72)
+
+    seconds = min(timeit.repeat(_update, number=100, repeat=5)) / 100
+    print(f"update with {NOWCAST_HISTORY_STEPS} steps of history: {seconds * 1e6:.0f} µs")
+    assert seconds < 0.005
+
+
+async def test_recompute_stays_off_the_event_loop(hass: HomeAssistant, hass_storage) -> None:
+    """Test a slow recompute runs in the executor and updates arriving meanwhile are batched."""
+    changes = []
+    nowcast = WarningNowcast(hass, "test_nowcast", 360, on_change=lambda: changes.append(nowcast.probability("west")))
+    rng = np.random.default_rng(49)
+    nowcast.model.load([int(state) for state in rng.integers(0, 27, size=NOWCAST_HISTORY_STEPS)])
+    storm_probabilities = TransitionModel.storm_probabilities
+    runs = []
+
+    def _slow_storm_probabilities(model: TransitionModel, state: int, steps: int) -> np.ndarray:
+        runs.append(state)
+        time.sleep(0.2)
+        return storm_probabilities(model, state, steps)
+
+    statuses = [
+        {"west": "noWarning", "center": "noWarning", "east": "noWarning"},
+        {"west": "StormWarning", "center": "noWarning", "east": "noWarning"},
+        {"west": "StormWarning", "center": "StormWarning", "east": "noWarning"},
+    ]
+    with patch.object(TransitionModel, "storm_probabilities", _slow_storm_probabilities):
+        loop_seconds = 0.0
+        for step, shown in enumerate(statuses):
+            started = time.perf_counter()
+            nowcast.async_observe(step * 300.0, shown)
+            loop_seconds = max(loop_seconds, time.perf_counter() - started)
+        assert nowcast.probability("west") is None
+        await hass.async_block_till_done()
+
+    # The event loop only sampled the statuses; three updates took two runs
+    assert loop_seconds < 0.05
+    assert runs == [encode(statuses[0]), encode(statuses[2])]
+    assert len(changes) == 2
+    assert nowcast.probability("west") == 1.0
+    await nowcast.async_save()
+
+
+async def test_storm_probability_sensors(
+    hass: HomeAssistant, standin_api: StandInApi, freezer: FrozenDateTimeFactory, hass_storage
+) -> None:
+    """Test the sensors over two hours of recurring storms, and after a restart."""
+    start = dt_util.utcnow().replace(minute=0, second=0, microsecond=0)
+    freezer.move_to(start)
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_BASE_URL: standin_api.base_url, CONF_API_CODE: "code"},
+        options={CONF_NOWCAST_HORIZON: 30},
+        version=6,
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+
+    # Polls a minute apart keep the stand-in's keep-alive connection open;
+    # a five-minute storm warning in the east every twenty minutes
+    for minute in range(1, 121):
+        storm = (minute // 5) % 4 == 3
+        standin_api.set_status("lakeConstance", "east", "StormWarning" if storm else "noWarning")
+        freezer.move_to(start + timedelta(minutes=minute))
+        await coordinator.async_refresh()
+        if minute == 60:
+            await hass.async_block_till_done()
+            # Eleven transitions are not enough to go by
+            assert hass.states.get(EAST_PROBABILITY).state == "unavailable"
+    await hass.async_block_till_done()
+
+    state = hass.states.get(EAST_PROBABILITY)
+    assert 50.0 < float(state.state) < 100.0
+    assert state.attributes[ATTR_HORIZON_MINUTES] == 30
+    assert state.attributes[ATTR_TRANSITIONS] == 23
+    assert hass.states.get(WEST_PROBABILITY).state == "0.0"
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    stored = hass_storage[f"{DOMAIN}.nowcast.{entry.entry_id}"]["data"]
+    assert sum(length for _state, length in stored["steps"]) == 24
+
+    # Restarted five minutes later; the time in between counts as one more step
+    freezer.move_to(start + timedelta(minutes=125))
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    assert hass.states.get(EAST_PROBABILITY).attributes[ATTR_TRANSITIONS] == 24
+
+    assert await hass.config_entries.async_remove(entry.entry_id)
+    await hass.async_block_till_done()
+    assert f"{DOMAIN}.nowcast.{entry.entry_id}" not in hass_storage
@@ -0,0 +1,127 @@
+"""Tests for the compact lake overview mode."""
+import json
+from typing import Dict, Tuple
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.json import JSONEncoder
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.lake_constance_storm_checker.const import (
+    DOMAIN,
+    CONF_BASE_URL,
+    CONF_API_CODE,
+    CONF_COMPACT,
+)
+
+from .standin_api import StandInApi
+
+POLLS_PER_DAY = 24 * 60 * 60 // 300
+
+# (poll, area, status) changes during the simulated day
+DAY_TIMELINE = [
+    (100, "center", "StrongWindWarning"),
+    (110, "east", "StrongWindWarning"),
+    (120, "center", "StormWarning"),
+    (150, "center", "StrongWindWarning"),
+    (160, "east", "noWarning"),
+    (170, "center", "noWarning"),
+]
+
+
+async def _setup(hass: HomeAssistant, api: StandInApi, compact: bool):
+    """Set up an entry and return it with its coordinator."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_BASE_URL: api.base_url, CONF_API_CODE: "code"},
+        options={CONF_COMPACT: compact},
+        version=6,
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    return entry, hass.data[DOMAIN][entry.entry_id]
+
+
+def _size(value) -> int:
+    """Return the JSON size of a value in bytes."""
+    return len(json.dumps(value, cls=JSONEncoder))
+
+
+async def test_overview_state_and_attributes(hass: HomeAssistant, standin_api: StandInApi) -> None:
+    """Test the overview reports the worst status and disables the other entities."""
+    standin_api.set_status("lakeConstance", "center", "StrongWindWarning")
+    standin_api.set_status("lakeConstance", "east", "StormWarning")
+    entry, _ = await _setup(hass, standin_api, compact=True)
+
+    state = hass.states.get("sensor.lake_constance_overview")
+    assert state.state == "StormWarning"
+    assert state.attributes["west"] == "noWarning"
+    assert state.attributes["center"] == "StrongWindWarning"
+    assert state.attributes["east"] == "StormWarning"
+
+    registry = er.async_get(hass)
+    entities = er.async_entries_for_config_entry(registry, entry.entry_id)
+    assert len(entities) == 10
+    assert [entity.entity_id for entity in entities if not entity.disabled] == ["sensor.lake_constance_overview"]
+    assert [state.entity_id for state in hass.states.async_all() if state.domain != "device_tracker"] == [
+        "sensor.lake_constance_overview"
+    ]
+
+
+async def _simulate_day(hass: HomeAssistant, api: StandInApi, compact: bool) -> Tuple[int, int, int]:
+    """Poll through a day with hourly publications and return rows, recorded bytes and state bytes."""
+    _, coordinator = await _setup(hass, api, compact)
+    # A day of polls in a few seconds is a burst the shared rate limiter would throttle
+    coordinator.rate_limiter.burst = POLLS_PER_DAY
+    coordinator.rate_limiter.tokens = float(POLLS_PER_DAY)
+    rows = 0
+    recorded_bytes = 0
+
+    def _count(event) -> None:
+        nonlocal rows, recorded_bytes
+        new_state, old_state = event.data["new_state"], event.data["old_state"]
+        rows += 1
+        recorded_bytes += len(new_state.state)
+        # The recorder stores attributes once per distinct set
+        if old_state is None or new_state.attributes != old_state.attributes:
+            recorded_bytes += _size(dict(new_state.attributes))
+
+    hass.bus.async_listen("state_changed", _count)
+    changes: Dict[int, Tuple[str, str]] = {poll: (area, status) for poll, area, status in DAY_TIMELINE}
+    for poll in range(POLLS_PER_DAY):
+        if poll % 12 == 0:
+            api.timestamp = f"2025-06-01T{poll // 12:02d}:00:00+0200"
+        if poll in changes:
+            api.set_status("lakeConstance", *changes[poll])
+        await coordinator.async_refresh()
+        await hass.async_block_till_done()
+
+    state_bytes = sum(
+        _size(state.as_dict())
+        for state in hass.states.async_all()
+        if state.entity_id.startswith(("sensor.lake_constance", "binary_sensor.lake_constance"))
+    )
+    return rows, recorded_bytes, state_bytes
+
+
+@pytest.mark.parametrize("compact", [False, True])
+async def test_recorder_rows_per_day(hass: HomeAssistant, standin_api: StandInApi, compact: bool) -> None:
+    """Measure state rows, recorded bytes and state machine size over a day of polling.
+
+    Default mode: 4 sensors and 5 binary sensors; the timestamp and full
+    payload attributes change with every publication. Compact mode: one
+    sensor that only changes with the statuses.
+    """
+    rows, recorded_bytes, state_bytes = await _simulate_day(hass, standin_api, compact)
+    print(f"compact={compact}: {rows} rows, {recorded_bytes} recorded bytes, {state_bytes} state bytes per day")
+
+    if compact:
+        # One row per change of the worst status or the area map
+        assert rows == len(DAY_TIMELINE)
+        assert state_bytes < 500
+    else:
+        # Last update, storm and strong wind warnings change with every publication
+        assert rows >= 3 * 24 + len(DAY_TIMELINE)
+        assert state_bytes > 9 * 300
@@ -0,0 +1,140 @@
+"""Tests for the on-demand profiler services."""
+import marshal
+import os
+import pstats
+import threading
+import time
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import MockConfigEntry, async_fire_time_changed
+
+from custom_components.lake_constance_storm_checker.const import (
+    DOMAIN,
+    CONF_BASE_URL,
+    CONF_API_CODE,
+    DATA_PROFILER,
+    SERVICE_START_PROFILING,
+    SERVICE_STOP_PROFILING,
+)
+from custom_components.lake_constance_storm_checker.profiler import StackSampler
+from custom_components.lake_constance_storm_checker.services import async_setup_services
+
+from .standin_api import StandInApi
+
+
+def _inner(sampler: StackSampler) -> None:
+    """Take a sample two frames below the test."""
+    sampler.sample()
+
+
+def _outer(sampler: StackSampler) -> None:
+    """Take one sample here and one in a nested call."""
+    sampler.sample()
+    _inner(sampler)
+
+
+def test_sampler_formats(tmp_path: Path) -> None:
+    """Test samples of this module are written as collapsed stacks and as pstats."""
+    sampler = StackSampler(threading.get_ident(), 0.001, root=os.path.dirname(__file__))
+    for _ in range(3):
+        _outer(sampler)
+
+    assert sampler.samples == sampler.root_samples == 6
+    lines = sampler.collapsed()
+    assert len(lines) == 2
+    assert all(line.endswith(" 3") for line in lines)
+    inner_stack = next(line for line in lines if ";_inner (tests/test_profiler.py:" in line)
+    assert ";_outer (tests/test_profiler.py:" in inner_stack
+
+    top = {entry["function"].split(" ")[0]: entry for entry in sampler.top_functions()}
+    assert top["_outer"]["samples"] == 6
+    assert top["_inner"]["samples"] == 3
+    assert top["_inner"]["share"] == 0.5
+
+    path = tmp_path / "profile.pstats"
+    path.write_bytes(marshal.dumps(sampler.pstats()))
+    stats = pstats.Stats(str(path))
+    [inner] = [key for key in stats.stats if key[2] == "_inner"]
+    calls, _primitive, own, cumulative, callers = stats.stats[inner]
+    assert calls == 3
+    assert own == pytest.approx(0.0)
+    assert cumulative == pytest.approx(0.003)
+    assert [key[2] for key in callers] == ["_outer"]
+
+
+async def test_profiling_services(hass: HomeAssistant, standin_api: StandInApi, tmp_path: Path) -> None:
+    """Test a profile of entity state writes is written to the config directory."""
+    hass.config.config_dir = str(tmp_path)
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_BASE_URL: standin_api.base_url, CONF_API_CODE: "code"},
+        version=6,
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+
+    with pytest.raises(ServiceValidationError, match="not running"):
+        await hass.services.async_call(DOMAIN, SERVICE_STOP_PROFILING, {}, blocking=True, return_response=True)
+
+    await hass.services.async_call(DOMAIN, SERVICE_START_PROFILING, {"interval": 1}, blocking=True)
+    with pytest.raises(ServiceValidationError, match="already running"):
+        await hass.services.async_call(DOMAIN, SERVICE_START_PROFILING, {}, blocking=True)
+
+    # Keep the event loop busy in entity properties and state writes
+    deadline = time.perf_counter() + 0.3
+    while time.perf_counter() < deadline:
+        coordinator.async_update_listeners()
+    response = await hass.services.async_call(
+        DOMAIN, SERVICE_STOP_PROFILING, {}, blocking=True, return_response=True
+    )
+
+    assert DATA_PROFILER not in hass.data
+    assert response["format"] == "collapsed"
+    assert 0 < response["integration_samples"] <= response["samples"]
+    assert response["top"][0]["function"].startswith("LakeConstanceStormCheckerCoordinator.async_update_listeners")
+    path = Path(response["path"])
+    assert path.parent == tmp_path / "lake_constance_storm_checker_profiles"
+    assert "(lake_constance_storm_checker/sensor.py:" in path.read_text(encoding="utf-8")
+
+
+async def test_profiling_stops_after_duration(hass: HomeAssistant, tmp_path: Path) -> None:
+    """Test a profile is written when its duration is up."""
+    hass.config.config_dir = str(tmp_path)
+    async_setup_services(hass)
+    await hass.services.async_call(DOMAIN, SERVICE_START_PROFILING, {"duration": 1, "format": "pstats"}, blocking=True)
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=2))
+    await hass.async_block_till_done()
+
+    assert DATA_PROFILER not in hass.data
+    [profile] = (tmp_path / "lake_constance_storm_checker_profiles").iterdir()
+    assert profile.suffix == ".pstats"
+    # Nothing of the integration ran; pstats only loads profiles with samples
+    assert marshal.loads(profile.read_bytes()) == {}
+
+
+async def test_profiling_dropped_on_hass_stop(hass: HomeAssistant, tmp_path: Path) -> None:
+    """Test stopping Home Assistant drops the profiler and its timeout, without writing a profile."""
+    hass.config.config_dir = str(tmp_path)
+    async_setup_services(hass)
+    await hass.services.async_call(DOMAIN, SERVICE_START_PROFILING, {"duration": 1}, blocking=True)
+    profiler = hass.data[DATA_PROFILER]
+
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_STOP)
+    await hass.async_block_till_done()
+    assert DATA_PROFILER not in hass.data
+    assert profiler.sampler.stopped.is_set()
+
+    # The timeout no longer fires, and profiling can be started again
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=2))
+    await hass.async_block_till_done()
+    assert not (tmp_path / "lake_constance_storm_checker_profiles").exists()
+    await hass.services.async_call(DOMAIN, SERVICE_START_PROFILING, {"duration": 1}, blocking=True)
+    await hass.services.async_call(DOMAIN, SERVICE_STOP_PROFILING, {}, blocking=True, return_response=True)
@@ -0,0 +1,124 @@
+"""Tests for the shared client-side rate limiter."""
+from datetime import timedelta
+
+import pytest
+from homeassistant import config_entries
+from homeassistant.core import HomeAssistant
+from homeassistant.data_entry_flow import FlowResultType
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.lake_constance_storm_checker.const import (
+    DOMAIN,
+    CONF_BASE_URL,
+    CONF_API_CODE,
+)
+from custom_components.lake_constance_storm_checker.diagnostics import (
+    async_get_config_entry_diagnostics,
+)
+from custom_components.lake_constance_storm_checker.ratelimit import (
+    RateLimitedError,
+    TokenBucket,
+    parse_retry_after,
+)
+
+from .standin_api import StandInApi
+
+
+async def _setup_entry(hass: HomeAssistant, api: StandInApi) -> MockConfigEntry:
+    """Set up a config entry against the stand-in API."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_BASE_URL: api.base_url, CONF_API_CODE: "test-api-code"},
+        version=6,
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    return entry
+
+
+def test_parse_retry_after() -> None:
+    """Test both Retry-After formats."""
+    assert parse_retry_after("120", now=0) == 120
+    assert parse_retry_after("Thu, 01 Jan 1970 00:01:40 GMT", now=40) == 60
+    assert parse_retry_after("soon", now=0) is None
+
+
+def test_token_bucket_waits_when_empty(freezer) -> None:
+    """Test that the bucket asks callers to wait once the burst is used."""
+    bucket = TokenBucket(burst=2, rate=1.0)
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == pytest.approx(1.0)
+    freezer.tick(timedelta(seconds=3))
+    assert bucket.reserve() == 0
+
+    bucket.update_from_response(429, {"Retry-After": "30"})
+    with pytest.raises(RateLimitedError) as err:
+        bucket.reserve()
+    assert err.value.retry_after == pytest.approx(30)
+
+
+@pytest.mark.parametrize("standin_api", [{"quota": 3}], indirect=True, ids=["quota"])
+async def test_quota_headers_pause_fetching(hass: HomeAssistant, freezer, standin_api) -> None:
+    """Test that an exhausted quota pauses polling without hitting the API."""
+    entry = await _setup_entry(hass, standin_api)
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+
+    await coordinator.async_refresh()
+    await coordinator.async_refresh()
+    assert standin_api.requests == 3
+    assert coordinator.last_update_success
+
+    # Remaining is 0: the next refresh is refused client-side
+    await coordinator.async_refresh()
+    assert standin_api.requests == 3
+    assert not coordinator.last_update_success
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+    assert diagnostics["entry"]["data"][CONF_API_CODE] == "**REDACTED**"
+    assert diagnostics["rate_limit"]["blocked_for"] > 0
+    assert diagnostics["rate_limit"]["server_remaining"] == 0
+    assert diagnostics["rate_limit"]["throttled_requests"] == 1
+
+    # Config flow validation for the same URL shares the limiter
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": config_entries.SOURCE_USER}
+    )
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"],
+        {CONF_BASE_URL: standin_api.base_url, CONF_API_CODE: "other-code"},
+    )
+    assert result["type"] == FlowResultType.FORM
+    assert result["errors"] == {"base": "rate_limited"}
+    assert standin_api.requests == 3
+
+    freezer.tick(timedelta(seconds=61))
+    await coordinator.async_refresh()
+    assert coordinator.last_update_success
+    assert standin_api.requests == 4
+
+
+@pytest.mark.parametrize("standin_api", [{"quota": 3}], indirect=True, ids=["quota"])
+async def test_429_retry_after_pauses_fetching(hass: HomeAssistant, freezer, standin_api) -> None:
+    """Test that a 429 with Retry-After pauses polling until it expires."""
+    standin_api.send_rate_limit_headers = False
+    entry = await _setup_entry(hass, standin_api)
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+
+    await coordinator.async_refresh()
+    await coordinator.async_refresh()
+    await coordinator.async_refresh()
+    assert standin_api.responses_by_status[429] == 1
+    assert not coordinator.last_update_success
+
+    await coordinator.async_refresh()
+    assert standin_api.requests == 4
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+    assert diagnostics["rate_limit"]["rate_limited_responses"] == 1
+
+    freezer.tick(timedelta(seconds=61))
+    await coordinator.async_refresh()
+    assert coordinator.last_update_success
+    assert standin_api.requests == 5
@@ -0,0 +1,96 @@
+"""Tests for recording and replaying Lake Constance Storm Checker responses."""
+import json
+from unittest.mock import patch
+
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.lake_constance_storm_checker.const import (
+    DOMAIN,
+    CONF_BASE_URL,
+    CONF_API_CODE,
+)
+from custom_components.lake_constance_storm_checker.recorder import (
+    RawResponse,
+    ReplayTransport,
+    ResponseRecorder,
+    async_replay,
+    load_recording,
+)
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+def _response(received_at: float, west: str, status: int = 200) -> RawResponse:
+    """Build a raw response for the given west status."""
+    body = json.dumps(
+        {
+            "partitionKey": "lakeConstance",
+            "timestamp": "2025-01-20T17:27:14+0200",
+            "west": west,
+            "center": "noWarning",
+            "east": "noWarning",
+        }
+    ).encode()
+    return RawResponse(status=status, headers=JSON_HEADERS, body=body, received_at=received_at)
+
+
+def test_recording_round_trip(tmp_path) -> None:
+    """Test that recorded responses load back unchanged."""
+    path = str(tmp_path / "recordings" / "day.jsonl")
+    recorder = ResponseRecorder(path)
+    responses = [_response(1000.0, "noWarning"), _response(1300.0, "StormWarning", status=500)]
+    for response in responses:
+        recorder.record(response)
+
+    assert load_recording(path) == responses
+
+
+async def test_replay_counts_transitions_and_writes(hass: HomeAssistant) -> None:
+    """Test replaying a storm day through the coordinator."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_BASE_URL: "https://api.example.com", CONF_API_CODE: "test-api-code"},
+        version=6,
+    )
+    entry.add_to_hass(hass)
+    with patch(
+        "custom_components.lake_constance_storm_checker.api.AiohttpTransport.async_fetch",
+        return_value=_response(0.0, "noWarning"),
+    ):
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+
+    transport = ReplayTransport(
+        [
+            _response(1000.0, "noWarning"),
+            _response(1300.0, "StrongWindWarning"),
+            _response(1600.0, "StrongWindWarning"),
+            _response(1900.0, "StormWarning", status=500),
+            _response(2200.0, "StormWarning"),
+        ]
+    )
+    sleeps = []
+
+    async def _fake_sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+
+    report = await async_replay(
+        coordinator,
+        transport,
+        speed=60.0,
+        entity_ids=["sensor.lake_constance_west_status"],
+        sleep=_fake_sleep,
+    )
+
+    assert report.refreshes == 5
+    assert report.failures == 1
+    assert [(t["from"], t["to"]) for t in report.transitions] == [
+        ("noWarning", "StrongWindWarning"),
+        ("StrongWindWarning", "StormWarning"),
+    ]
+    assert sleeps == [5.0, 5.0, 5.0, 5.0]
+    assert report.state_writes >= 2
+    assert report.decode_seconds > 0
+    assert coordinator.transport is coordinator.http_transport
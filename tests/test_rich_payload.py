@@ -0,0 +1,124 @@
+"""Tests and benchmark for the rich (simple=false) payload mode."""
+import json
+import time
+import tracemalloc
+from typing import Any, Dict, Optional
+
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.lake_constance_storm_checker.api import (
+    RawResponse,
+    decode_response,
+)
+from custom_components.lake_constance_storm_checker.const import (
+    DOMAIN,
+    CONF_BASE_URL,
+    CONF_API_CODE,
+    CONF_RICH_PAYLOAD,
+    FIELD_WIND_SPEED,
+    FIELD_WIND_GUST,
+    PARTITION_KEY,
+)
+from custom_components.lake_constance_storm_checker.snapshot import StatusSnapshot
+
+from .standin_api import StandInApi, rich_area
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+AREAS = ("west", "center", "east")
+
+
+def _response(payload: Dict[str, Any]) -> RawResponse:
+    """Build a JSON response."""
+    return RawResponse(status=200, headers=JSON_HEADERS, body=json.dumps(payload).encode(), received_at=0.0)
+
+
+def _rich_payload(forecast_hours: int = 72) -> Dict[str, Any]:
+    """Return a rich payload with a sizeable forecast per area."""
+    return {
+        "partitionKey": PARTITION_KEY,
+        "timestamp": "2025-01-20T17:27:14+0200",
+        **{area: rich_area("StrongWindWarning", 31.0, 52.0, forecast_hours) for area in AREAS},
+    }
+
+
+def test_projection_keeps_only_requested_fields() -> None:
+    """Test rich area objects are projected and the rest is decoded on demand."""
+    result = decode_response(_response(_rich_payload()), frozenset({FIELD_WIND_SPEED}))
+
+    assert result.payload["west"] == {"status": "StrongWindWarning", "windSpeed": 31.0}
+    assert result.payload["timestamp"] == "2025-01-20T17:27:14+0200"
+    assert result.statuses["east"] == "StrongWindWarning"
+    assert len(result.full_payload()["west"]["forecast"]) == 72
+
+    widened = result.project(frozenset({FIELD_WIND_SPEED, FIELD_WIND_GUST}))
+    assert widened.payload["center"]["windGust"] == 52.0
+
+
+async def test_rich_mode_wind_sensors(hass: HomeAssistant, standin_api: StandInApi) -> None:
+    """Test rich mode requests simple=false and serves wind sensors."""
+    standin_api.set_status(PARTITION_KEY, "west", "StormWarning")
+    standin_api.set_wind(PARTITION_KEY, "west", 62.5, 88.0)
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_BASE_URL: standin_api.base_url, CONF_API_CODE: "code"},
+        options={CONF_RICH_PAYLOAD: True},
+        version=6,
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+
+    # Fields of newly added sensors are decoded from the first response, without another request
+    assert standin_api.rich_requests == standin_api.requests == 1
+    assert coordinator.projection == {FIELD_WIND_SPEED, FIELD_WIND_GUST}
+    assert hass.states.get("sensor.lake_constance_west_status").state == "StormWarning"
+    assert hass.states.get("sensor.lake_constance_west_wind_speed").state == "62.5"
+    assert hass.states.get("sensor.lake_constance_west_wind_gust").state == "88.0"
+    assert "forecast" not in coordinator.data["west"]
+
+
+def _measure(payload: Dict[str, Any], fields: Optional[frozenset], rounds: int = 200):
+    """Return (CPU seconds per update, retained bytes) for decoding plus snapshot building."""
+    response = _response(payload)
+    start = time.process_time()
+    for _ in range(rounds):
+        result = decode_response(response, fields)
+        StatusSnapshot(result.payload, AREAS)
+    cpu = (time.process_time() - start) / rounds
+
+    tracemalloc.start()
+    result = decode_response(response, fields)
+    snapshot = StatusSnapshot(result.payload, AREAS)
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result, snapshot
+    return cpu, retained
+
+
+def test_benchmark_rich_versus_simple() -> None:
+    """Benchmark CPU and memory of simple, projected rich and unprojected rich decoding."""
+    simple = {
+        "partitionKey": PARTITION_KEY,
+        "timestamp": "2025-01-20T17:27:14+0200",
+        **dict.fromkeys(AREAS, "StrongWindWarning"),
+    }
+    rich = _rich_payload()
+    fields = frozenset({FIELD_WIND_SPEED, FIELD_WIND_GUST})
+
+    results = {
+        "simple": _measure(simple, None),
+        "rich projected": _measure(rich, fields),
+        "rich unprojected": _measure(rich, None),
+    }
+    for mode, (cpu, retained) in results.items():
+        print(f"{mode:>17}: {cpu * 1e6:8.1f} us/update, {retained:8d} B retained")
+
+    # Projection keeps the retained payload close to simple mode; the raw body
+    # is kept for on-demand decoding and dominates the remainder
+    projected = results["rich projected"][1]
+    unprojected = results["rich unprojected"][1]
+    assert projected < unprojected / 2
+    # Projection costs far less than freezing the whole rich tree into the snapshot
+    assert results["rich projected"][0] < results["rich unprojected"][0]
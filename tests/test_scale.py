@@ -0,0 +1,64 @@
+"""Scale tests: many config entries in one Home Assistant instance."""
+import logging
+import os
+from datetime import timedelta
+
+import pytest
+from homeassistant.core import HomeAssistant
+
+from .scale_harness import ScaleBudget, ScaleHarness
+
+_LOGGER = logging.getLogger(__name__)
+
+# Set LCSC_SCALE_ENTRIES=1000 to include the large run
+ENTRY_COUNTS = [1, 10, 100]
+if extra := os.environ.get("LCSC_SCALE_ENTRIES"):
+    ENTRY_COUNTS.append(int(extra))
+
+BUDGET = ScaleBudget(
+    max_loop_lag=1.0,
+    max_memory_per_entry=512 * 1024,
+    max_cpu_per_refresh=0.05,
+)
+
+
+@pytest.mark.parametrize("entries", ENTRY_COUNTS)
+async def test_scale_within_budget(hass: HomeAssistant, freezer, standin_api, entries: int) -> None:
+    """Test that N entries polling for an hour stay within the budget."""
+    harness = ScaleHarness(hass, freezer, standin_api)
+    await harness.async_load_entries(entries, partitions=3)
+
+    def _flip_statuses(tick: int) -> None:
+        # Change the west status of every partition every 10 simulated minutes
+        if tick % 600 == 0:
+            status = "StormWarning" if (tick // 600) % 2 else "noWarning"
+            for partition in range(3):
+                standin_api.set_status(f"partition-{partition}", "west", status)
+
+    try:
+        report = await harness.async_run(timedelta(hours=1), on_tick=_flip_statuses)
+    finally:
+        await harness.async_unload()
+
+    _LOGGER.warning(
+        "Scale run with %s entries: %s refreshes, %.1f state writes/s, lag %.3fs, %.0f B/entry, %.2f ms CPU/refresh",
+        report.entries, report.refreshes, report.state_writes_per_second, report.max_loop_lag,
+        report.memory_per_entry, report.cpu_per_refresh * 1000,
+    )
+    # Every entry polls every 300 s
+    assert entries * 11 <= report.refreshes <= entries * 12
+    assert report.state_writes > 0
+    report.assert_within(BUDGET)
+
+
+async def test_scale_budget_violation_fails(hass: HomeAssistant, freezer, standin_api) -> None:
+    """Test that exceeding a budget fails the run."""
+    harness = ScaleHarness(hass, freezer, standin_api)
+    await harness.async_load_entries(2)
+    try:
+        report = await harness.async_run(timedelta(minutes=10))
+    finally:
+        await harness.async_unload()
+
+    with pytest.raises(AssertionError, match="CPU per refresh"):
+        report.assert_within(ScaleBudget(max_cpu_per_refresh=0.0))
@@ -0,0 +1,89 @@
+"""Tests for spreading polls of many entries across the interval."""
+from collections import Counter
+from datetime import timedelta
+from typing import Optional
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from custom_components.lake_constance_storm_checker.const import ALIGN_SPREAD
+from custom_components.lake_constance_storm_checker.scheduler import (
+    async_get_poll_scheduler,
+    phase_fraction,
+)
+
+from .scale_harness import ScaleHarness
+
+ENTRIES = 300
+
+
+def test_phase_fraction_is_deterministic() -> None:
+    """Test that phase fractions depend only on the key."""
+    assert phase_fraction("entry-a") == phase_fraction("entry-a")
+    assert phase_fraction("entry-a") != phase_fraction("entry-b")
+    assert all(0 <= phase_fraction(f"entry-{i}") < 1 for i in range(100))
+
+
+async def test_entries_started_together_poll_at_flat_rate(
+    hass: HomeAssistant, freezer, standin_api
+) -> None:
+    """Test that hundreds of entries started together spread their polls evenly."""
+    harness = ScaleHarness(hass, freezer, standin_api)
+    await harness.async_load_entries(ENTRIES)
+    # First refreshes happen during setup; only count scheduled polls
+    requests_per_second = Counter()
+    last_count = standin_api.requests
+
+    def _sample(tick: int) -> None:
+        nonlocal last_count
+        if tick:
+            requests_per_second[tick - 1] = standin_api.requests - last_count
+        last_count = standin_api.requests
+
+    try:
+        offsets = async_get_poll_scheduler(hass).phase_offsets()
+        await harness.async_run(timedelta(seconds=901), on_tick=_sample)
+    finally:
+        await harness.async_unload()
+
+    # Offsets are distinct and evenly spaced over the 300 s interval
+    assert sorted(offset.total_seconds() for offset in offsets.values()) == [
+        pytest.approx(i * 300 / ENTRIES) for i in range(ENTRIES)
+    ]
+    # After the first half interval every second carries about one poll
+    steady = [requests_per_second[second] for second in range(300, 900)]
+    assert sum(steady) == pytest.approx(2 * ENTRIES, abs=ENTRIES * 0.05)
+    assert max(steady) <= 2
+
+
+class _AlignedCoordinator:
+    """Coordinator stand-in that learned the same publish cadence as all others."""
+
+    poll_interval = timedelta(seconds=300)
+
+    def __init__(self, aligned: float) -> None:
+        """Initialize with the poll time right after the next publication."""
+        self.aligned = aligned
+
+    def aligned_poll_time(self, earliest: float) -> Optional[float]:
+        """Return the shared aligned poll time."""
+        return self.aligned if self.aligned > earliest else None
+
+
+async def test_aligned_entries_keep_their_phases(hass: HomeAssistant) -> None:
+    """Test entries aligned to the same publication are spread after it, in phase order."""
+    aligned = dt_util.utcnow().timestamp() + 1800
+    scheduler = async_get_poll_scheduler(hass)
+    unregister = [
+        scheduler.async_register(f"entry-{index}", _AlignedCoordinator(aligned)) for index in range(10)
+    ]
+    await hass.async_block_till_done()
+
+    due = {key: poll.timestamp() for key, poll in scheduler.next_polls().items()}
+    offsets = scheduler.phase_offsets()
+    assert len(set(due.values())) == 10
+    assert all(aligned <= time < aligned + ALIGN_SPREAD for time in due.values())
+    assert sorted(due, key=due.get) == sorted(offsets, key=offsets.get)
+    for callback in unregister:
+        callback()
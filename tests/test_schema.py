@@ -0,0 +1,123 @@
+"""Tests for validating payload shapes and quarantining malformed payloads."""
+import timeit
+from typing import Any, Dict
+
+import pytest
+from homeassistant.const import STATE_UNAVAILABLE
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.lake_constance_storm_checker.api import area_status
+from custom_components.lake_constance_storm_checker.const import (
+    AREAS,
+    DOMAIN,
+    CONF_BASE_URL,
+    CONF_API_CODE,
+)
+from custom_components.lake_constance_storm_checker.diagnostics import (
+    async_get_config_entry_diagnostics,
+)
+from custom_components.lake_constance_storm_checker.schema import PayloadSchema, SchemaViolation
+from custom_components.lake_constance_storm_checker.snapshot import freeze, raw_statuses
+
+from .standin_api import StandInApi, rich_area
+
+EAST_STATUS = "sensor.lake_constance_east_status"
+TIMESTAMP = "2025-01-20T17:27:14+0200"
+SIMPLE = {"partitionKey": "lakeConstance", "timestamp": TIMESTAMP,
+          "west": "noWarning", "center": "StrongWindWarning", "east": "StormWarning"}
+RICH = {"partitionKey": "lakeConstance", "timestamp": TIMESTAMP,
+        **{area: rich_area("StormWarning", 40.0, 65.0) for area in AREAS}}
+
+
+@pytest.mark.parametrize(
+    ("payload", "statuses"),
+    [
+        (SIMPLE, {"west": "noWarning", "center": "StrongWindWarning", "east": "StormWarning"}),
+        (RICH, dict.fromkeys(AREAS, "StormWarning")),
+        # Mixed shapes, a missing area, an undocumented status and the legacy timestamp key
+        (
+            {"lastUpdate": TIMESTAMP, "west": {"status": "noWarning", "windSpeed": "12.5"}, "center": "Thunder"},
+            {"west": "noWarning", "center": "Thunder", "east": "UnknownStatus"},
+        ),
+    ],
+)
+def test_accepted_shapes(payload: Dict[str, Any], statuses: Dict[str, str]) -> None:
+    """Test the simple, rich and tolerated shapes yield the area statuses."""
+    assert PayloadSchema().statuses(payload) == statuses
+
+
+@pytest.mark.parametrize(
+    ("payload", "reason"),
+    [
+        ({"timestamp": TIMESTAMP, "error": "maintenance"}, "none of the areas"),
+        ({**SIMPLE, "east": ["StormWarning"]}, "east is a list"),
+        ({**SIMPLE, "west": 2}, "west is a int"),
+        ({**SIMPLE, "center": ""}, "center has an empty status"),
+        ({**RICH, "west": {"windSpeed": 12}}, "west has no status string"),
+        ({**RICH, "east": {"status": "noWarning", "windGust": "strong"}}, "east windGust is not a number"),
+        ({**SIMPLE, "timestamp": 1737386834}, "timestamp is a int"),
+    ],
+)
+def test_malformed_shapes(payload: Dict[str, Any], reason: str) -> None:
+    """Test shapes no entity can show are violations."""
+    with pytest.raises(SchemaViolation, match=reason):
+        PayloadSchema().statuses(payload)
+
+
+def _previous_status_checks(payload: Dict[str, Any], frozen: Any) -> None:
+    """Derive the area statuses of one update the way it was done before validation.
+
+    The decoder, the flap suppression and the snapshot (from its frozen copy
+    of the payload) each derived them with ``isinstance`` checks per area.
+    """
+    {area: area_status(payload.get(area)) for area in AREAS}
+    raw_statuses(payload)
+    raw_statuses(frozen)
+
+
+@pytest.mark.parametrize(("shape", "payload"), [("simple", SIMPLE), ("rich", RICH)])
+def test_validation_costs_less_than_previous_checks(shape: str, payload: Dict[str, Any]) -> None:
+    """Benchmark validating once against the status checks it replaces."""
+    schema = PayloadSchema()
+    frozen = freeze(payload)
+    previous = min(timeit.repeat(lambda: _previous_status_checks(payload, frozen), number=2000, repeat=5))
+    validated = min(timeit.repeat(lambda: schema.statuses(payload), number=2000, repeat=5))
+    print(
+        f"{shape}: previous checks {previous / 2000 * 1e6:.2f} µs, "
+        f"validation {validated / 2000 * 1e6:.2f} µs per update"
+    )
+
+    assert raw_statuses(frozen) == schema.statuses(payload)
+    assert validated < previous
+
+
+async def test_malformed_payload_is_quarantined(hass: HomeAssistant, standin_api: StandInApi) -> None:
+    """Test a malformed payload is kept out of entity states and shown in diagnostics."""
+    standin_api.set_status("lakeConstance", "east", "StormWarning")
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_BASE_URL: standin_api.base_url, CONF_API_CODE: "code"},
+        version=6,
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    assert hass.states.get(EAST_STATUS).state == "StormWarning"
+
+    standin_api.statuses["lakeConstance"]["east"] = {"level": 2}
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    assert hass.states.get(EAST_STATUS).state == STATE_UNAVAILABLE
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+    [quarantined] = diagnostics["quarantine"]
+    assert quarantined["reason"] == "Malformed payload: east has no status string"
+    assert quarantined["payload"]["east"] == {"level": 2}
+    assert diagnostics["metrics"]["quarantined"] == 1
+    assert diagnostics["traces"][-1]["outcome"] == "ApiPayloadError"
+
+    standin_api.set_status("lakeConstance", "east", "noWarning")
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    assert hass.states.get(EAST_STATUS).state == "noWarning"
@@ -0,0 +1,85 @@
+"""Tests for the Lake Constance Storm Checker services."""
+import asyncio
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ServiceValidationError
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.lake_constance_storm_checker.const import (
+    DOMAIN,
+    CONF_BASE_URL,
+    CONF_API_CODE,
+    CONF_PARTITION_KEY,
+    SERVICE_GET_STATUS,
+)
+
+from .standin_api import StandInApi
+
+
+async def _setup_entries(hass: HomeAssistant, api: StandInApi, *partitions: str) -> None:
+    """Set up one config entry per partition."""
+    for partition in partitions:
+        entry = MockConfigEntry(
+            domain=DOMAIN,
+            data={CONF_BASE_URL: api.base_url, CONF_API_CODE: "code", CONF_PARTITION_KEY: partition},
+            version=6,
+        )
+        entry.add_to_hass(hass)
+        assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+
+async def test_get_status_returns_cached_snapshot(hass: HomeAssistant, standin_api: StandInApi) -> None:
+    """Test one call returns all requested partitions and areas without fetching."""
+    standin_api.set_status("obersee", "east", "StormWarning")
+    standin_api.set_status("untersee", "west", "StrongWindWarning")
+    await _setup_entries(hass, standin_api, "obersee", "untersee")
+    requests = standin_api.requests
+
+    response = await hass.services.async_call(DOMAIN, SERVICE_GET_STATUS, {}, blocking=True, return_response=True)
+
+    assert standin_api.requests == requests
+    assert set(response["partitions"]) == {"obersee", "untersee"}
+    obersee = response["partitions"]["obersee"]
+    assert obersee["areas"]["east"] == {"status": "StormWarning", "warning": True, "enabled": True}
+    assert obersee["storm_warning_areas"] == ["east"]
+    assert response["partitions"]["untersee"]["strong_wind_warning_areas"] == ["west"]
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_GET_STATUS,
+        {"partitions": "untersee", "areas": ["west"]},
+        blocking=True,
+        return_response=True,
+    )
+    assert list(response["partitions"]) == ["untersee"]
+    assert list(response["partitions"]["untersee"]["areas"]) == ["west"]
+
+    with pytest.raises(ServiceValidationError):
+        await hass.services.async_call(
+            DOMAIN, SERVICE_GET_STATUS, {"partitions": "rhein"}, blocking=True, return_response=True
+        )
+
+
+async def test_forced_refresh_is_coalesced(hass: HomeAssistant, standin_api: StandInApi) -> None:
+    """Test concurrent forced refreshes and a scheduled poll share one request."""
+    await _setup_entries(hass, standin_api, "obersee")
+    coordinator = next(iter(hass.data[DOMAIN].values()))
+    standin_api.delay = 0.2
+    standin_api.set_status("obersee", "center", "StormWarning")
+    requests = standin_api.requests
+
+    responses = await asyncio.gather(
+        coordinator.async_refresh(),
+        *(
+            hass.services.async_call(
+                DOMAIN, SERVICE_GET_STATUS, {"refresh": True}, blocking=True, return_response=True
+            )
+            for _ in range(3)
+        ),
+    )
+
+    assert standin_api.requests == requests + 1
+    for response in responses[1:]:
+        assert response["partitions"]["obersee"]["areas"]["center"]["status"] == "StormWarning"
@@ -0,0 +1,59 @@
+"""Tests for the integration-owned HTTP session."""
+from unittest.mock import patch
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.lake_constance_storm_checker.const import (
+    DOMAIN,
+    CONF_BASE_URL,
+    CONF_API_CODE,
+    CONF_PARTITION_KEY,
+    SESSION_CONNECTION_LIMIT_PER_HOST,
+)
+
+MOCK_DATA = {
+    "partitionKey": "lakeConstance",
+    "timestamp": "2025-01-20T17:27:14+0200",
+    "west": "noWarning",
+    "center": "noWarning",
+    "east": "noWarning",
+}
+
+
+async def test_session_shared_and_released(hass: HomeAssistant) -> None:
+    """Test that entries share one pool and only the last unload closes it."""
+    shared_ha_session = async_get_clientsession(hass)
+    entries = []
+    with patch(
+        "custom_components.lake_constance_storm_checker.LakeConstanceStormCheckerCoordinator._async_update_data",
+        return_value=MOCK_DATA,
+    ):
+        for partition in ("a", "b"):
+            entry = MockConfigEntry(
+                domain=DOMAIN,
+                data={
+                    CONF_BASE_URL: "https://api.example.com",
+                    CONF_API_CODE: "test-api-code",
+                    CONF_PARTITION_KEY: partition,
+                },
+                version=6,
+            )
+            entry.add_to_hass(hass)
+            assert await hass.config_entries.async_setup(entry.entry_id)
+            entries.append(entry)
+        await hass.async_block_till_done()
+
+    first, second = (hass.data[DOMAIN][entry.entry_id] for entry in entries)
+    session = first.session
+    assert second.session is session
+    assert session is not shared_ha_session
+    assert session.connector.limit_per_host == SESSION_CONNECTION_LIMIT_PER_HOST
+
+    await hass.config_entries.async_unload(entries[0].entry_id)
+    assert not session.closed
+
+    await hass.config_entries.async_unload(entries[1].entry_id)
+    assert session.closed
+    assert not shared_ha_session.closed
@@ -0,0 +1,64 @@
+"""A week of polling on the simulated clock."""
+import os
+import random
+from datetime import timedelta
+
+import pytest
+from homeassistant.core import HomeAssistant
+
+from custom_components.lake_constance_storm_checker.const import DEFAULT_SCAN_INTERVAL
+
+from .sim_harness import Outage, SimulationHarness, StatusChange
+from .standin_api import StandInApi
+
+WEEK = timedelta(days=7)
+POLL_INTERVAL = timedelta(seconds=DEFAULT_SCAN_INTERVAL)
+OUTAGE = Outage(at=timedelta(days=3, hours=2), end=timedelta(days=3, hours=4))
+STATUSES = ["noWarning", "StrongWindWarning", "StormWarning"]
+
+
+def _week_timeline(seed: int = 43) -> list:
+    """Return status changes every few hours, never inside the outage."""
+    rng = random.Random(seed)
+    timeline = []
+    at = timedelta(minutes=17)
+    while at < WEEK - timedelta(hours=1):
+        if not OUTAGE.at <= at < OUTAGE.end:
+            timeline.append(StatusChange(at, "lakeConstance", rng.choice(["west", "center", "east"]), rng.choice(STATUSES)))
+        at += timedelta(minutes=rng.randint(40, 480))
+    return timeline
+
+
+async def test_week_of_polling(hass: HomeAssistant, freezer, standin_api: StandInApi) -> None:
+    """Test a week of polls, status changes and an outage runs in seconds."""
+    harness = SimulationHarness(hass, freezer, standin_api)
+    await harness.async_load_entry()
+    timeline = _week_timeline()
+    # A change during the outage is only seen once the API recovers
+    during_outage = StatusChange(OUTAGE.at + timedelta(minutes=30), "lakeConstance", "west", "StormWarning")
+
+    # The freezer also stops time.perf_counter
+    wall_start = os.times().elapsed
+    try:
+        report = await harness.async_run(WEEK, [*timeline, OUTAGE, during_outage])
+    finally:
+        await harness.async_unload()
+    wall_seconds = os.times().elapsed - wall_start
+    print(f"{report.summary()} in {wall_seconds:.1f}s")
+
+    polls = WEEK / POLL_INTERVAL
+    assert polls - 1 <= report.requests <= polls + 1
+    assert report.failed_requests == pytest.approx((OUTAGE.end - OUTAGE.at) / POLL_INTERVAL, abs=1)
+    assert wall_seconds < 30
+
+    transitions = {id(transition.change): transition for transition in report.transitions}
+    outage_transition = transitions.pop(id(during_outage))
+    assert OUTAGE.end - OUTAGE.at - timedelta(minutes=30) <= outage_transition.delay
+    assert outage_transition.delay <= OUTAGE.end - OUTAGE.at - timedelta(minutes=30) + POLL_INTERVAL
+
+    # Changes that did not alter the status are seen at the next poll like the others
+    delays = [transition.delay for transition in transitions.values() if transition.delay is not None]
+    assert len(delays) >= len(timeline) - 2
+    assert max(delays) <= POLL_INTERVAL
+    # Each change writes a handful of states; unchanged polls write none
+    assert report.state_writes < 10 * len(report.transitions) + 2 * 9
@@ -0,0 +1,112 @@
+"""Tests for the shared read-only status snapshot."""
+import tracemalloc
+from unittest.mock import patch
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import async_get_platforms
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.lake_constance_storm_checker.const import (
+    DOMAIN,
+    CONF_BASE_URL,
+    CONF_API_CODE,
+)
+
+MOCK_DATA = {
+    "partitionKey": "lakeConstance",
+    "timestamp": "2025-01-20T17:27:14+0200",
+    "west": {"status": "noWarning", "details": ["calm"]},
+    "center": "StrongWindWarning",
+    "east": "StormWarning",
+}
+
+PACKAGE_FILTER = tracemalloc.Filter(True, "*lake_constance_storm_checker*")
+
+
+async def _setup_entities(hass: HomeAssistant):
+    """Set up the integration and return its coordinator and entities."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_BASE_URL: "https://api.example.com", CONF_API_CODE: "test-api-code"},
+        version=6,
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    entities = [
+        entity
+        for platform in async_get_platforms(hass, DOMAIN)
+        for entity in platform.entities.values()
+    ]
+    return hass.data[DOMAIN][entry.entry_id], entities
+
+
+async def test_attributes_are_shared_and_read_only(hass: HomeAssistant) -> None:
+    """Test that entities hand out the same immutable snapshot structures."""
+    with patch(
+        "custom_components.lake_constance_storm_checker.LakeConstanceStormCheckerCoordinator._async_update_data",
+        return_value=MOCK_DATA,
+    ):
+        coordinator, entities = await _setup_entities(hass)
+
+    assert len(entities) == 9
+    snapshot = coordinator.snapshot
+    assert coordinator.snapshot is snapshot
+
+    by_id = {entity.entity_id: entity for entity in entities}
+    west_status = by_id["sensor.lake_constance_west_status"].extra_state_attributes
+    west_warning = by_id["binary_sensor.lake_constance_west_warning"].extra_state_attributes
+    assert west_status is west_warning
+    assert west_status["details"] == ("calm",)
+
+    storm = by_id["binary_sensor.lake_constance_storm_warning"].extra_state_attributes
+    last_update = by_id["sensor.lake_constance_last_update"].extra_state_attributes
+    assert storm["full_data"] is last_update["full_data"]
+    assert storm["areas_with_storm_warning"] == ("east",)
+
+    with pytest.raises(RuntimeError):
+        west_status["status"] = "StormWarning"
+    with pytest.raises(RuntimeError):
+        storm["full_data"]["east"] = "noWarning"
+    # The coordinator's payload is untouched by consumers
+    assert coordinator.data["east"] == "StormWarning"
+
+
+async def test_attribute_access_does_not_allocate(hass: HomeAssistant) -> None:
+    """Test that per-write attribute access allocates nothing once a refresh is done."""
+    # A fresh payload per refresh, so the snapshot is rebuilt and its cost measured
+    with patch(
+        "custom_components.lake_constance_storm_checker.LakeConstanceStormCheckerCoordinator._async_update_data",
+        side_effect=lambda: dict(MOCK_DATA),
+    ):
+        coordinator, entities = await _setup_entities(hass)
+
+        tracemalloc.start()
+        try:
+            before_refresh = tracemalloc.take_snapshot().filter_traces([PACKAGE_FILTER])
+            previous_snapshot = coordinator.snapshot
+            await coordinator.async_refresh()
+            await hass.async_block_till_done()
+            after_refresh = tracemalloc.take_snapshot().filter_traces([PACKAGE_FILTER])
+            assert coordinator.snapshot is not previous_snapshot
+
+            # Hold on to every returned value, like the state machine does
+            retained = []
+            for _ in range(100):
+                for entity in entities:
+                    retained.append(entity.extra_state_attributes)
+            after_access = tracemalloc.take_snapshot().filter_traces([PACKAGE_FILTER])
+        finally:
+            tracemalloc.stop()
+
+    refresh_blocks = sum(
+        stat.count_diff for stat in after_refresh.compare_to(before_refresh, "filename") if stat.count_diff > 0
+    )
+    access_blocks = sum(
+        stat.count_diff for stat in after_access.compare_to(after_refresh, "filename") if stat.count_diff > 0
+    )
+    # One snapshot per refresh, independent of the number of entities
+    assert refresh_blocks < 100
+    assert access_blocks == 0
+    assert len(retained) == 100 * len(entities)
@@ -0,0 +1,105 @@
+"""Tests for serving the last good data through failed updates."""
+from datetime import timedelta
+
+import pytest
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.const import STATE_UNAVAILABLE
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.lake_constance_storm_checker.const import (
+    DOMAIN,
+    CONF_BASE_URL,
+    CONF_API_CODE,
+    CONF_MAX_STALENESS,
+)
+
+from .standin_api import StandInApi
+
+EAST_STATUS = "sensor.lake_constance_east_status"
+STORM_WARNING = "binary_sensor.lake_constance_storm_warning"
+
+
+async def _setup(hass: HomeAssistant, api: StandInApi, max_staleness: int):
+    """Set up an entry and return its coordinator."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_BASE_URL: api.base_url, CONF_API_CODE: "code"},
+        options={CONF_MAX_STALENESS: max_staleness},
+        version=6,
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    return hass.data[DOMAIN][entry.entry_id]
+
+
+async def _poll(hass: HomeAssistant, coordinator, freezer: FrozenDateTimeFactory, count: int) -> list:
+    """Poll once a minute and return the storm warning state after each poll."""
+    states = []
+    for _ in range(count):
+        freezer.tick(timedelta(minutes=1))
+        await coordinator.async_refresh()
+        await hass.async_block_till_done()
+        states.append(hass.states.get(STORM_WARNING).state)
+    return states
+
+
+@pytest.mark.parametrize(
+    ("max_staleness", "expected", "transitions"),
+    [
+        # All 9 entities turn unavailable and back on every failure
+        (0, [STATE_UNAVAILABLE, "on"] * 3, 9 * 6),
+        (600, ["on"] * 6, 0),
+    ],
+)
+async def test_every_other_request_dropped(
+    hass: HomeAssistant,
+    standin_api: StandInApi,
+    freezer: FrozenDateTimeFactory,
+    max_staleness: int,
+    expected: list,
+    transitions: int,
+) -> None:
+    """Test entities ride through intermittent failures instead of flapping."""
+    standin_api.set_status("lakeConstance", "east", "StormWarning")
+    coordinator = await _setup(hass, standin_api, max_staleness)
+    standin_api.fail_every = 2
+
+    changes = []
+    hass.bus.async_listen(
+        "state_changed",
+        lambda event: changes.append(event.data["entity_id"])
+        if event.data["old_state"].state != event.data["new_state"].state
+        else None,
+    )
+    assert await _poll(hass, coordinator, freezer, 6) == expected
+
+    assert standin_api.responses_by_status[503] == 3
+    assert len(changes) == transitions
+
+
+async def test_stale_attributes_until_max_staleness(
+    hass: HomeAssistant, standin_api: StandInApi, freezer: FrozenDateTimeFactory
+) -> None:
+    """Test stale data is marked with its age and dropped after the max staleness."""
+    standin_api.set_status("lakeConstance", "east", "StormWarning")
+    coordinator = await _setup(hass, standin_api, 180)
+    standin_api.fail_every = 1
+
+    await _poll(hass, coordinator, freezer, 1)
+    state = hass.states.get(EAST_STATUS)
+    assert state.state == "StormWarning"
+    assert state.attributes["stale"] is True
+    assert state.attributes["age"] == 60
+    assert hass.states.get(STORM_WARNING).attributes["age"] == 60
+
+    assert await _poll(hass, coordinator, freezer, 3) == ["on", "on", STATE_UNAVAILABLE]
+    assert hass.states.get(EAST_STATUS).state == STATE_UNAVAILABLE
+
+    standin_api.fail_every = 0
+    await _poll(hass, coordinator, freezer, 1)
+    state = hass.states.get(EAST_STATUS)
+    assert state.state == "StormWarning"
+    assert "stale" not in state.attributes
+    assert not coordinator.stale
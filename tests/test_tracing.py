@@ -0,0 +1,124 @@
+"""Tests for per-stage update latency traces."""
+import json
+from datetime import timedelta
+
+import pytest
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.lake_constance_storm_checker.const import (
+    DOMAIN,
+    CONF_BASE_URL,
+    CONF_API_CODE,
+    CONF_TRACE_FILE,
+    TRACES_DIR,
+)
+from custom_components.lake_constance_storm_checker.diagnostics import (
+    async_get_config_entry_diagnostics,
+)
+from custom_components.lake_constance_storm_checker.tracing import UpdateTrace
+
+from .standin_api import StandInApi
+
+
+def test_breakdown_splits_age_at_previous_poll() -> None:
+    """Test the time before the poll is split into upstream delay and poll wait."""
+    trace = UpdateTrace("lakeConstance", started_at=1200.0, previous_poll=1100.0)
+    trace.published = 1000.0
+    trace.new_publication = True
+    trace.durations = {"request": 0.2, "decode": 0.01, "normalize": 0.001, "snapshot": 0.002, "fan_out": 0.005}
+    trace.finished_at = 1200.25
+
+    assert trace.age == pytest.approx(200.25)
+    assert trace.breakdown() == pytest.approx(
+        {
+            "upstream": 100.0,
+            "poll_wait": 100.0,
+            "request": 0.2,
+            "decode": 0.01,
+            "normalize": 0.001,
+            "snapshot": 0.002,
+            # Without the snapshot built during fan-out
+            "fan_out": 0.003,
+        }
+    )
+
+    # Data fetched before is only aged as a whole
+    trace.new_publication = False
+    assert "upstream" not in trace.breakdown()
+    assert trace.as_dict()["age"] == pytest.approx(200.25)
+
+
+async def test_traces_of_polls(
+    hass: HomeAssistant, standin_api: StandInApi, freezer: FrozenDateTimeFactory, tmp_path
+) -> None:
+    """Test every update leaves a trace in the buffer, the diagnostics and the trace file."""
+    start = dt_util.utcnow()
+
+    def _publish(offset: int) -> None:
+        standin_api.timestamp = (start + timedelta(seconds=offset)).isoformat()
+
+    async def _poll_at(offset: int) -> None:
+        freezer.move_to(start + timedelta(seconds=offset))
+        await coordinator.async_refresh()
+        await hass.async_block_till_done()
+
+    _publish(-60)
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_BASE_URL: standin_api.base_url, CONF_API_CODE: "code"},
+        options={CONF_TRACE_FILE: True},
+        version=6,
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    assert coordinator.tracer.path == hass.config.path(TRACES_DIR, f"{entry.entry_id}.jsonl")
+    coordinator.tracer.path = str(tmp_path / "traces.jsonl")
+
+    # Polls a minute apart keep the stand-in's keep-alive connection open
+    # Published 20 s before the poll and after the previous one
+    _publish(40)
+    await _poll_at(60)
+    # Nothing new
+    await _poll_at(120)
+    # Published before the previous poll but only served now
+    _publish(100)
+    await _poll_at(180)
+    standin_api.fail_every = 1
+    await _poll_at(240)
+
+    traces = [trace.as_dict() for trace in coordinator.tracer.traces]
+    setup, published, unchanged, late, failed = traces
+    assert setup["new_publication"] and setup["age"] == 60
+    # The first refresh runs before the entities are added
+    assert setup["state_writes"] == 0
+
+    assert published["age"] == 20
+    assert published["stages"]["upstream"] == 0
+    assert published["stages"]["poll_wait"] == 20
+    assert set(published["stages"]) == {
+        "upstream", "poll_wait", "request", "decode", "normalize", "snapshot", "fan_out"
+    }
+    # The last update sensor and the two entities showing the full payload
+    assert published["state_writes"] == 3
+
+    assert not unchanged["new_publication"]
+    assert unchanged["age"] == 80
+    assert "upstream" not in unchanged["stages"]
+    assert unchanged["state_writes"] == 0
+
+    assert late["stages"]["upstream"] == 20
+    assert late["stages"]["poll_wait"] == 60
+
+    assert failed["outcome"] != "ok"
+    assert failed["age"] is None
+    assert set(failed["stages"]) == {"request"}
+
+    lines = (tmp_path / "traces.jsonl").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line) for line in lines] == traces[1:]
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+    assert diagnostics["traces"] == traces